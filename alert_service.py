@@ -0,0 +1,248 @@
+"""
+MA200 crossing alerts
+
+Polls quotes for all tracked tickers in one batched request, applies them to
+the incremental indicator state (indicator_state.IndicatorStates) and sends a
+Telegram alert when a ticker crosses its MA200, the MA200+10% band or a custom
+price threshold from config.ALERT_THRESHOLDS.
+
+Alerts are only sent on transitions: each ticker's flags are compared with the
+flags of its last alert, not with the previous poll. While a ticker is in its
+cooldown nothing is sent and the last alerted flags are kept, so a price that
+whipsaws across a line and back within the cooldown produces no alert, and a
+crossing that persists is reported once the cooldown ends.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from datetime import date, timedelta
+
+from config import ALERT_COOLDOWN_MINUTES, ALERT_STATE_PATH, ALERT_THRESHOLDS, TICKERS
+from data_providers import get_data_provider
+from indicator_state import IndicatorStates
+
+logger = logging.getLogger(__name__)
+
+# Days of daily bars requested per poll (covers weekends and missed polls)
+QUOTE_LOOKBACK_DAYS = 7
+
+
+def fetch_quotes(tickers):
+    """
+    Recent daily bars of many tickers with one batched request
+
+    The last bar of the current session is the latest quote.
+
+    Args:
+        tickers (list): Ticker symbols
+
+    Returns:
+        dict: Ticker -> OHLCV frame of the last QUOTE_LOOKBACK_DAYS
+    """
+    return get_data_provider().history_many(tickers, date.today() - timedelta(days=QUOTE_LOOKBACK_DAYS), None)
+
+
+def evaluate_flags(state, thresholds=()):
+    """
+    Above/below flags of a ticker state
+
+    Args:
+        state (IndicatorState): Ticker state
+        thresholds (iterable, optional): Custom price levels
+
+    Returns:
+        dict: Flag name -> bool (MA200 flags are left out until MA200 is available)
+    """
+    flags = {}
+    if state.ma200 is not None:
+        flags['ma200'] = state.is_above_ma200
+        flags['ma200_plus10'] = state.is_above_ma200_plus10
+    for level in thresholds:
+        flags[f"price:{float(level):g}"] = state.last_close > level
+    return flags
+
+
+def format_alert(ticker, state, transitions):
+    """
+    Telegram message for the flags that changed
+
+    Args:
+        ticker (str): Ticker symbol
+        state (IndicatorState): Ticker state
+        transitions (dict): Flag name -> new value
+
+    Returns:
+        str: HTML message
+    """
+    lines = [f"🔔 <b>{ticker} 가격 알림</b>", "", f"현재 가격: <b>${state.last_close:.2f}</b>"]
+    for flag, above in transitions.items():
+        direction = "상향 돌파 ⬆️" if above else "하향 이탈 ⬇️"
+        if flag == 'ma200':
+            lines.append(f"200일 이동평균 (${state.ma200:.2f}) {direction}")
+        elif flag == 'ma200_plus10':
+            lines.append(f"200일 이동평균 +10% (${state.ma200_plus10:.2f}) {direction}")
+        else:
+            lines.append(f"지정 가격 ${flag.split(':', 1)[1]} {direction}")
+    return "\n".join(lines)
+
+
+class AlertService:
+    """
+    Batched quote polling with transition-only, cooldown-limited alerts
+    """
+    def __init__(self, tickers=None, states=None, thresholds=None, cooldown_minutes=ALERT_COOLDOWN_MINUTES,
+                 state_path=ALERT_STATE_PATH, fetch=fetch_quotes, send=None):
+        """
+        Initialize the service
+
+        Args:
+            tickers (list, optional): Tickers to watch. Defaults to config.TICKERS.
+            states (IndicatorStates, optional): Incremental indicator states (restored from their checkpoint)
+            thresholds (dict, optional): Ticker -> custom price levels. Defaults to config.ALERT_THRESHOLDS.
+            cooldown_minutes (int, optional): Minimum time between alerts of one ticker
+            state_path (str, optional): File for the last alerted flags and times (None disables persistence)
+            fetch (callable, optional): tickers -> {ticker: recent daily bars}
+            send (callable, optional): Coroutine function sending an HTML message (defaults to telegram_sender.send_message)
+        """
+        self.tickers = [ticker.upper() for ticker in (tickers or TICKERS)]
+        self.states = states or IndicatorStates()
+        self.thresholds = {ticker.upper(): levels for ticker, levels in (thresholds or ALERT_THRESHOLDS).items()}
+        self.cooldown = cooldown_minutes * 60
+        self.state_path = state_path
+        self.fetch = fetch
+        self.send = send
+        self._lock = threading.Lock()
+        self.alerted = {}  # ticker -> {'flags': {...}, 'time': last alert timestamp}
+        self._load()
+
+    def _load(self):
+        if not self.state_path or not os.path.exists(self.state_path):
+            return
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                self.alerted = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable alert state {self.state_path}: {e}")
+
+    def _save(self):
+        if not self.state_path:
+            return
+        tmp_path = f"{self.state_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.alerted, f)
+        os.replace(tmp_path, self.state_path)
+
+    def update_states(self):
+        """
+        Fetch quotes for all tickers and apply them to the indicator states
+
+        Tickers without a state are seeded from the price store first.
+
+        Returns:
+            dict: Ticker -> IndicatorState for tickers with data
+        """
+        unseeded = [ticker for ticker in self.tickers if self.states.get(ticker) is None]
+        if unseeded:
+            self.states.refresh(unseeded)
+
+        try:
+            quotes = self.fetch(self.tickers)
+        except Exception as e:
+            logger.error(f"Quote polling failed for {', '.join(self.tickers)}: {e}")
+            quotes = {}
+
+        states = {}
+        for ticker in self.tickers:
+            history = quotes.get(ticker)
+            if history is not None and not history.empty and self.states.get(ticker) is not None:
+                for bar_date, close in zip(history.index.date, history['Close'].to_numpy()):
+                    self.states.update(ticker, bar_date, close)
+            state = self.states.get(ticker)
+            if state is not None and state.last_close is not None:
+                states[ticker] = state
+        return states
+
+    def evaluate(self, states, now=None):
+        """
+        Find the alerts due for the current states
+
+        A ticker seen for the first time only records its flags. Nothing is
+        committed for a due alert: mark_alerted() records its flags and starts
+        the cooldown once the alert has actually been sent, so a failed send is
+        retried on the next poll.
+
+        Args:
+            states (dict): Ticker -> IndicatorState
+            now (float, optional): Current timestamp
+
+        Returns:
+            list: (ticker, state, transitions) for every alert to send
+        """
+        now = now or time.time()
+        alerts = []
+        with self._lock:
+            for ticker, state in states.items():
+                flags = evaluate_flags(state, self.thresholds.get(ticker, ()))
+                previous = self.alerted.get(ticker)
+                if previous is None:
+                    self.alerted[ticker] = {'flags': flags, 'time': 0}
+                    continue
+
+                transitions = {
+                    flag: above for flag, above in flags.items()
+                    if flag in previous['flags'] and previous['flags'][flag] != above
+                }
+                # Flags that appeared since (MA200 became available, new threshold) are recorded silently
+                merged = {**flags, **{flag: value for flag, value in previous['flags'].items()
+                                      if flag in transitions}}
+                previous['flags'] = merged
+                if not transitions:
+                    continue
+                if now - previous['time'] < self.cooldown:
+                    logger.debug(f"Alert for {ticker} suppressed by cooldown: {transitions}")
+                    continue
+
+                alerts.append((ticker, state, transitions))
+        return alerts
+
+    def mark_alerted(self, ticker, state, now=None):
+        """
+        Record a sent alert: its flags become the baseline and the cooldown starts
+
+        Args:
+            ticker (str): Ticker symbol
+            state (IndicatorState): State the alert was sent for
+            now (float, optional): Current timestamp
+        """
+        flags = evaluate_flags(state, self.thresholds.get(ticker, ()))
+        with self._lock:
+            self.alerted[ticker] = {'flags': flags, 'time': now or time.time()}
+
+    async def poll(self):
+        """
+        One polling round: fetch quotes, evaluate transitions, send alerts and checkpoint
+
+        Returns:
+            int: Number of alerts sent
+        """
+        send = self.send
+        if send is None:
+            from telegram_sender import send_message
+            send = send_message
+
+        states = self.update_states()
+        sent = 0
+        for ticker, state, transitions in self.evaluate(states):
+            logger.info(f"Alert for {ticker}: {transitions}")
+            if await send(format_alert(ticker, state, transitions)):
+                self.mark_alerted(ticker, state)
+                sent += 1
+            else:
+                logger.warning(f"Failed to send alert for {ticker}, will retry on the next poll")
+
+        self.states.checkpoint()
+        with self._lock:
+            self._save()
+        return sent
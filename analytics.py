@@ -0,0 +1,422 @@
+"""
+Cross-ticker correlation, beta and relative strength
+
+Leveraged products and their underlyings (SOXL vs BRKU, BLK vs IVZ, IGV vs a
+benchmark) are compared on aligned daily returns taken from the shared price
+matrix. All pairs are computed at once with matrix operations:
+
+    window sums of returns (N) and of their cross products (N x N) give the
+    covariance matrix, from which correlation (cov_ij / sd_i sd_j) and beta
+    (cov_ij / var_j, the beta of ticker i against ticker j) follow
+
+The rolling history is built in one pass from cumulative sums of the return
+and cross-product arrays. After that, each new daily bar only pushes one
+return vector into a ring buffer that keeps the window sums (O(N^2) per day),
+like the moving averages in indicator_state, and its matrices are written into
+history arrays that grow geometrically, so the stored history is not copied on
+every bar. Relative strength is the ratio of the tickers' returns over the last
+ANALYTICS_RS_DAYS bars.
+"""
+import logging
+import threading
+
+import numpy as np
+
+from config import (
+    ANALYTICS_BENCHMARK, ANALYTICS_HISTORY_PERIOD, ANALYTICS_PAIRS, ANALYTICS_RS_DAYS, ANALYTICS_WINDOW, TICKERS
+)
+
+logger = logging.getLogger(__name__)
+
+METRICS = ('correlation', 'beta', 'relative_strength')
+
+
+def covariance_to_metrics(covariance):
+    """
+    Correlation and beta matrices from covariance matrices
+
+    Args:
+        covariance (numpy.ndarray): ... x N x N covariance matrices
+
+    Returns:
+        tuple: (correlation, beta) arrays of the same shape; beta[..., i, j] is
+            the beta of ticker i against ticker j
+    """
+    variance = np.diagonal(covariance, axis1=-2, axis2=-1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        deviation = np.sqrt(variance)
+        correlation = covariance / (deviation[..., :, None] * deviation[..., None, :])
+        beta = covariance / variance[..., None, :]
+    return correlation, beta
+
+
+def rolling_covariance(returns, window):
+    """
+    Covariance matrices of every window of daily returns, all at once
+
+    Args:
+        returns (numpy.ndarray): days x N returns (no missing values)
+        window (int): Window length in days
+
+    Returns:
+        numpy.ndarray: (days - window + 1) x N x N covariance matrices, the
+            first one for the window ending on day window - 1
+    """
+    days, size = returns.shape
+    sums = np.zeros((days + 1, size))
+    np.cumsum(returns, axis=0, out=sums[1:])
+    cross = np.zeros((days + 1, size, size))
+    np.cumsum(returns[:, :, None] * returns[:, None, :], axis=0, out=cross[1:])
+
+    window_sums = sums[window:] - sums[:-window]
+    window_cross = cross[window:] - cross[:-window]
+    return (window_cross - window_sums[:, :, None] * window_sums[:, None, :] / window) / (window - 1)
+
+
+def relative_strength(closes, days):
+    """
+    Relative strength of every ticker against every other
+
+    Args:
+        closes (numpy.ndarray): T x N aligned closes (T > days)
+        days (int): Lookback in bars
+
+    Returns:
+        numpy.ndarray: N x N, rs[i, j] = (1 + return_i) / (1 + return_j) - 1 over the lookback
+    """
+    performance = closes[-1] / closes[-1 - days]
+    return performance[:, None] / performance[None, :] - 1
+
+
+class RollingCovariance:
+    """
+    Window sums of return vectors and their cross products, updated in O(N^2)
+    """
+    def __init__(self, window, size):
+        self.window = window
+        self.returns = np.zeros((window, size))
+        self.count = 0
+        self.pos = 0  # Slot the next vector is written to
+        self.total = np.zeros(size)
+        self.cross = np.zeros((size, size))
+        self._updates = 0
+
+    @classmethod
+    def from_returns(cls, window, returns):
+        """Build from days x N returns, oldest first (only the last `window` are kept)"""
+        rolling = cls(window, returns.shape[1])
+        for vector in returns[-window:]:
+            rolling.push(vector)
+        return rolling
+
+    def push(self, vector):
+        """Add the returns of a new day, dropping the oldest day once the window is full"""
+        if self.count == self.window:
+            oldest = self.returns[self.pos]
+            self.total -= oldest
+            self.cross -= np.outer(oldest, oldest)
+        else:
+            self.count += 1
+        self.returns[self.pos] = vector
+        self.total += vector
+        self.cross += np.outer(vector, vector)
+        self.pos = (self.pos + 1) % self.window
+        self._resum()
+
+    def _resum(self):
+        # Recompute the sums once per window length so floating-point drift cannot accumulate
+        self._updates += 1
+        if self._updates >= self.window:
+            self._updates = 0
+            values = self.returns[:self.count]
+            self.total = values.sum(axis=0)
+            self.cross = values.T @ values
+
+    @property
+    def covariance(self):
+        """Sample covariance matrix of the window, or None until it is full"""
+        if self.count < self.window:
+            return None
+        return (self.cross - np.outer(self.total, self.total) / self.window) / (self.window - 1)
+
+
+class CrossAnalytics:
+    """
+    Rolling correlation and beta history of a fixed set of tickers, updated bar by bar
+    """
+    def __init__(self, tickers, window=ANALYTICS_WINDOW, rs_days=ANALYTICS_RS_DAYS):
+        self.tickers = list(tickers)
+        self.window = window
+        self.rs_days = rs_days
+        size = len(self.tickers)
+        # History arrays have spare capacity at the end; dates, closes, ... are views of the filled part
+        self._dates = np.array([], dtype='datetime64[D]')
+        self._closes = np.empty((0, size))
+        self._length = 0
+        self._series_dates = np.array([], dtype='datetime64[D]')
+        self._correlation = np.empty((0, size, size))
+        self._beta = np.empty((0, size, size))
+        self._series_length = 0
+        self.rolling = RollingCovariance(window, size)
+
+    @classmethod
+    def from_closes(cls, tickers, dates, closes, window=ANALYTICS_WINDOW, rs_days=ANALYTICS_RS_DAYS):
+        """
+        Build the rolling history from aligned closes
+
+        Args:
+            tickers (list): Ticker symbols (columns of closes)
+            dates (numpy.ndarray): Bar dates, oldest first
+            closes (numpy.ndarray): T x N closes without missing values
+
+        Returns:
+            CrossAnalytics: State as of the last bar
+        """
+        analytics = cls(tickers, window, rs_days)
+        analytics._dates = np.asarray(dates, dtype='datetime64[D]')
+        analytics._closes = np.asarray(closes, dtype=np.float64)
+        analytics._length = len(analytics._dates)
+        returns = analytics._closes[1:] / analytics._closes[:-1] - 1
+        if len(returns) >= window:
+            covariance = rolling_covariance(returns, window)
+            analytics._correlation, analytics._beta = covariance_to_metrics(covariance)
+            analytics._series_dates = analytics._dates[window:]
+            analytics._series_length = len(analytics._series_dates)
+        analytics.rolling = RollingCovariance.from_returns(window, returns)
+        return analytics
+
+    @property
+    def dates(self):
+        return self._dates[:self._length]
+
+    @property
+    def closes(self):
+        return self._closes[:self._length]
+
+    @property
+    def series_dates(self):
+        return self._series_dates[:self._series_length]
+
+    @property
+    def correlation(self):
+        return self._correlation[:self._series_length]
+
+    @property
+    def beta(self):
+        return self._beta[:self._series_length]
+
+    @property
+    def last_date(self):
+        return self.dates[-1] if len(self.dates) else None
+
+    def update(self, bar_date, closes):
+        """
+        Apply the closes of a new daily bar
+
+        Args:
+            bar_date (numpy.datetime64): Bar date (must be after last_date)
+            closes (numpy.ndarray): Close of every ticker, in ticker order
+        """
+        bar_date = np.datetime64(bar_date, 'D')
+        closes = np.asarray(closes, dtype=np.float64)
+        if self._length:
+            self.rolling.push(closes / self._closes[self._length - 1] - 1)
+        if self._length == len(self._dates):
+            self._dates, self._closes = _grow(self._dates), _grow(self._closes)
+        self._dates[self._length] = bar_date
+        self._closes[self._length] = closes
+        self._length += 1
+
+        covariance = self.rolling.covariance
+        if covariance is not None:
+            if self._series_length == len(self._series_dates):
+                self._series_dates = _grow(self._series_dates)
+                self._correlation, self._beta = _grow(self._correlation), _grow(self._beta)
+            position = self._series_length
+            self._series_dates[position] = bar_date
+            self._correlation[position], self._beta[position] = covariance_to_metrics(covariance)
+            self._series_length += 1
+
+    def matrices(self):
+        """
+        Latest correlation, beta and relative strength matrices
+
+        Returns:
+            dict: Metric -> N x N array (None until enough history)
+        """
+        return {
+            'correlation': self.correlation[-1] if len(self.correlation) else None,
+            'beta': self.beta[-1] if len(self.beta) else None,
+            'relative_strength': relative_strength(self.closes, self.rs_days) if len(self.closes) > self.rs_days else None,
+        }
+
+    def pair_series(self, first, second, days=None):
+        """
+        Rolling correlation, beta and relative strength of one pair
+
+        Args:
+            first (str): Ticker
+            second (str): Ticker it is compared against
+            days (int, optional): Keep only the last `days` values
+
+        Returns:
+            dict: dates, correlation, beta (of first against second) and relative_strength lists
+        """
+        i, j = self.tickers.index(first), self.tickers.index(second)
+        start = -days if days else 0
+        strength = np.full(len(self.closes), np.nan)
+        if len(self.closes) > self.rs_days:
+            performance = self.closes[self.rs_days:] / self.closes[:-self.rs_days]
+            strength[self.rs_days:] = performance[:, i] / performance[:, j] - 1
+        strength = strength[len(self.closes) - len(self.series_dates):]
+        return {
+            'dates': np.datetime_as_string(self.series_dates[start:]).tolist(),
+            'correlation': _rounded(self.correlation[start:, i, j]),
+            'beta': _rounded(self.beta[start:, i, j]),
+            'relative_strength': _rounded(strength[start:]),
+        }
+
+
+def _grow(values):
+    """Copy of an array with twice the rows (at least 16), the new rows left unset"""
+    grown = np.empty((max(16, len(values) * 2),) + values.shape[1:], dtype=values.dtype)
+    grown[:len(values)] = values
+    return grown
+
+
+def _rounded(values, decimals=4):
+    """JSON-safe list (NaN -> None)"""
+    values = np.round(np.asarray(values, dtype=np.float64), decimals)
+    return [None if np.isnan(value) else value for value in values.tolist()]
+
+
+def aligned_closes(matrix, tickers, start=None):
+    """
+    Closes of tickers on the days all of them traded
+
+    Args:
+        matrix (PriceMatrix): Shared price matrix
+        tickers (list): Ticker symbols (tickers missing from the matrix are dropped)
+        start (date, optional): First date to keep
+
+    Returns:
+        tuple: (tickers, dates, T x N float64 closes)
+    """
+    present = [ticker for ticker in tickers if ticker in matrix]
+    if not present:
+        return [], np.array([], dtype='datetime64[D]'), np.empty((0, 0))
+    block = matrix.block(present)
+    keep = ~np.isnan(block).any(axis=0)
+    if start is not None:
+        keep &= matrix.dates >= np.datetime64(start, 'D')
+    return present, matrix.dates[keep], block[:, keep].T.astype(np.float64)
+
+
+class AnalyticsService:
+    """
+    Cross-ticker analytics of the tracked tickers, kept up to date from the price matrix
+    """
+    def __init__(self, tickers=None, benchmark=ANALYTICS_BENCHMARK, pairs=None, window=ANALYTICS_WINDOW,
+                 rs_days=ANALYTICS_RS_DAYS, period=ANALYTICS_HISTORY_PERIOD):
+        """
+        Initialize the service
+
+        Args:
+            tickers (list, optional): Tickers to relate. Defaults to config.TICKERS.
+            benchmark (str, optional): Extra ticker analysed with them (None to skip)
+            pairs (list, optional): (ticker, ticker) pairs with rolling series. Defaults to config.ANALYTICS_PAIRS.
+            window (int, optional): Rolling window in bars
+            rs_days (int, optional): Relative strength lookback in bars
+            period (str, optional): History kept for the rolling series
+        """
+        tickers = [ticker.upper() for ticker in (tickers or TICKERS)]
+        if benchmark and benchmark.upper() not in tickers:
+            tickers.append(benchmark.upper())
+        self.tickers = tickers
+        self.pairs = [(first.upper(), second.upper()) for first, second in (pairs or ANALYTICS_PAIRS)]
+        self.window = window
+        self.rs_days = rs_days
+        self.period = period
+        self.state = None
+        self._lock = threading.Lock()
+
+    def refresh(self):
+        """
+        Bring the analytics up to date with the price matrix
+
+        New bars after the last analysed day are applied incrementally; the
+        history is rebuilt when the set of tickers changed or an analysed
+        close differs (the source re-adjusted prices).
+
+        Returns:
+            CrossAnalytics: Current state (None without enough data)
+        """
+        from price_store import period_start
+        from stock_data import history_period, load_price_matrix
+
+        matrix = load_price_matrix(self.tickers, history_period(self.period))
+        with self._lock:
+            tickers, dates, closes = aligned_closes(matrix, self.tickers, period_start(self.period))
+            if len(tickers) < 2 or len(dates) <= self.window:
+                logger.warning(f"Not enough aligned history for analytics of {', '.join(self.tickers)}")
+                return self.state
+
+            state = self.state
+            if state is not None and state.tickers == tickers and state.last_date in dates:
+                position = int(np.searchsorted(dates, state.last_date))
+                if np.allclose(closes[position], state.closes[-1], rtol=1e-6):
+                    for bar_date, bar_closes in zip(dates[position + 1:], closes[position + 1:]):
+                        state.update(bar_date, bar_closes)
+                    return state
+
+            self.state = CrossAnalytics.from_closes(tickers, dates, closes, self.window, self.rs_days)
+            logger.info(f"Built analytics for {len(tickers)} tickers over {len(dates)} days")
+            return self.state
+
+    def result(self, days=None):
+        """
+        Latest matrices and the rolling series of the configured pairs
+
+        Args:
+            days (int, optional): Length of the pair series
+
+        Returns:
+            dict: as_of, tickers, window, rs_days, metric -> N x N nested lists, pairs
+            None: Without enough data
+        """
+        state = self.refresh()
+        if state is None:
+            return None
+        with self._lock:
+            matrices = state.matrices()
+            pairs = {
+                f"{first}/{second}": state.pair_series(first, second, days)
+                for first, second in self.pairs if first in state.tickers and second in state.tickers
+            }
+            return {
+                'as_of': str(state.last_date),
+                'tickers': state.tickers,
+                'window': self.window,
+                'rs_days': self.rs_days,
+                **{metric: [_rounded(row) for row in values] if values is not None else None
+                   for metric, values in matrices.items()},
+                'pairs': pairs,
+            }
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_analytics():
+    """
+    Shared AnalyticsService for this process, created on first use
+
+    Returns:
+        AnalyticsService: Analytics of config.TICKERS and the benchmark
+    """
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = AnalyticsService()
+        return _service
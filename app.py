@@ -5,15 +5,27 @@ import os
 import logging
 import io
 import base64
+import hashlib
 from datetime import datetime
 import glob
 import json
+import threading
+import time
+from collections import OrderedDict
 
 from flask import Flask, render_template, request, redirect, url_for, jsonify, Response
 
 # Import stock data module
-from stock_data import get_stock_data, get_stock_info
-from telegram_sender import create_stock_chart
+from stock_data import get_stock_data, get_stock_data_batch, get_stock_info, prefetch_stock_info
+from analytics import METRICS, get_analytics
+from chart_renderer import render_chart_grid, render_heatmap, render_in_pool, render_stock_chart_in_pool
+from chart_cache import ChartCache
+from config import CHART_CACHE_DIR, CHART_DATA_CACHE_ITEMS, CHART_DATA_TTL, CHART_API_MAX_POINTS, CHART_MAX_TICKERS
+from data_providers import provider_path
+from downsample import downsample_chart_data
+from chart_payload import encode_compact, json_response
+from image_output import image_format, optimize_image, MIMETYPES
+from screener import filter_rows, get_screener
 
 # Setup Flask app
 app = Flask(__name__)
@@ -44,6 +56,187 @@ TICKERS = {
 }
 
 
+# 렌더링된 차트 이미지 캐시 (메모리 LRU + 디스크)
+chart_cache = ChartCache(provider_path(CHART_CACHE_DIR))
+
+# 차트 이미지용 주가 데이터 캐시: (티커, 기간) -> (조회 시각, 데이터), 최근 사용 순 (LRU)
+_chart_data_cache = OrderedDict()
+_chart_data_lock = threading.Lock()
+
+
+def _cached_chart_data(key, now):
+    """Fresh cached chart data for a key (caller holds _chart_data_lock)"""
+    cached = _chart_data_cache.get(key)
+    if cached is None:
+        return None
+    if now - cached[0] > CHART_DATA_TTL:
+        del _chart_data_cache[key]
+        return None
+    _chart_data_cache.move_to_end(key)
+    return cached[1]
+
+
+def _remember_chart_data(key, now, data):
+    """Store chart data, evicting the least recently used entries (caller holds _chart_data_lock)"""
+    _chart_data_cache[key] = (now, data)
+    _chart_data_cache.move_to_end(key)
+    while len(_chart_data_cache) > CHART_DATA_CACHE_ITEMS:
+        _chart_data_cache.popitem(last=False)
+
+
+def get_chart_data(ticker, period):
+    """
+    Get stock data for chart images, reusing recent results for CHART_DATA_TTL seconds
+    
+    Args:
+        ticker (str): Ticker symbol
+        period (str): Time period
+        
+    Returns:
+        dict: Stock data from get_stock_data
+        None: If data is not available
+    """
+    key = (ticker.upper(), period)
+    now = time.time()
+    with _chart_data_lock:
+        cached = _cached_chart_data(key, now)
+    if cached:
+        return cached
+    
+    data = get_stock_data(ticker, period=period)
+    if data:
+        with _chart_data_lock:
+            _remember_chart_data(key, now, data)
+    return data
+
+
+def requested_tickers():
+    """
+    Tickers of the 'tickers' query parameter (comma separated, default: all tracked tickers)
+    
+    Returns:
+        list: Upper-case ticker symbols
+        
+    Raises:
+        ValueError: If more than CHART_MAX_TICKERS tickers are requested
+    """
+    tickers = list(dict.fromkeys(t.strip().upper() for t in request.args.get('tickers', '').split(',') if t.strip()))
+    if len(tickers) > CHART_MAX_TICKERS:
+        raise ValueError(f"Too many tickers ({len(tickers)}), at most {CHART_MAX_TICKERS} per request")
+    return tickers or [ticker for group in TICKERS.values() for ticker in group]
+
+
+def get_chart_datas(tickers, period):
+    """
+    Get stock data of many tickers for chart images, downloading the ones not
+    cached in one batch
+    
+    Args:
+        tickers (list): Ticker symbols
+        period (str): Time period
+        
+    Returns:
+        dict: Ticker -> stock data from get_stock_data (None if not available)
+    """
+    now = time.time()
+    results = {}
+    with _chart_data_lock:
+        for ticker in tickers:
+            cached = _cached_chart_data((ticker.upper(), period), now)
+            if cached:
+                results[ticker] = cached
+    
+    missing = [ticker for ticker in tickers if ticker not in results]
+    if missing:
+        fetched = get_stock_data_batch(missing, period=period)
+        with _chart_data_lock:
+            for ticker, data in fetched.items():
+                if data:
+                    _remember_chart_data((ticker.upper(), period), now, data)
+        results.update(fetched)
+    return results
+
+
+def chart_data_version(data):
+    """
+    Version of chart data for cache keys and ETags
+    
+    The last date alone does not change while the last close moves during the
+    trading day, so a hash of the price series is included.
+    
+    Args:
+        data (dict): Stock data from get_chart_data
+        
+    Returns:
+        str: Last date and price digest
+    """
+    if not data.get('dates'):
+        return ''
+    digest = hashlib.sha1(json.dumps(data.get('prices')).encode('utf-8')).hexdigest()[:16]
+    return f"{data['dates'][-1]}:{digest}"
+
+
+def get_chart_etag(ticker, period, data, formats):
+    """
+    Cache key and ETag of the chart for ticker data
+    
+    Args:
+        ticker (str): Ticker symbol
+        period (str): Time period
+        data (dict): Stock data from get_chart_data
+        formats (tuple): Image formats the client accepts
+        
+    Returns:
+        str: ETag
+    """
+    return chart_cache.key(ticker, period, chart_data_version(data), variant=','.join(formats))
+
+
+def get_cached_chart(ticker, period, data, etag, formats):
+    """
+    Get the chart image from the cache, rendering it in the process pool and
+    encoding it for the web on a miss
+    
+    Returns:
+        bytes: Encoded image bytes (format as allowed by formats)
+        None: If rendering failed
+    """
+    def render():
+        chart_bytes = render_stock_chart_in_pool(ticker, data, period_label=period.upper())
+        return optimize_image(chart_bytes, 'web', allowed_formats=formats).data if chart_bytes else None
+    
+    return chart_cache.get_or_render(etag, render)
+
+
+def accepted_image_formats():
+    """
+    Image formats the client accepts for <img> responses (PNG always)
+    
+    Returns:
+        tuple: Format names for image_output.optimize_image
+    """
+    formats = ['png']
+    for fmt in ('webp', 'jpeg'):
+        if request.accept_mimetypes[MIMETYPES[fmt]]:
+            formats.append(fmt)
+    return tuple(formats)
+
+
+def format_chart_payload(data):
+    """
+    Chart data in the wire format requested with ?format= ('compact' or the default lists)
+    
+    Args:
+        data (dict): Stock data from get_stock_data
+        
+    Returns:
+        dict: JSON-serializable chart data
+    """
+    if request.args.get('format') == 'compact':
+        return encode_compact(data)
+    return data
+
+
 def get_available_dates():
     """
     Get all available dates from saved HTML files
@@ -183,6 +376,10 @@ def chart_data(ticker):
     """
     API endpoint to get chart data for a ticker
     
+    Query parameters: period, max_points (LTTB downsampling) and format
+    ('compact' for the columnar payload). Responses are gzip/brotli compressed
+    when the client accepts it.
+    
     Args:
         ticker (str): Ticker symbol
         
@@ -190,14 +387,15 @@ def chart_data(ticker):
         json: Chart data in JSON format
     """
     period = request.args.get('period', '1y')
-    data = get_stock_data(ticker, period=period)
+    max_points = request.args.get('max_points', CHART_API_MAX_POINTS, type=int)
+    data = get_stock_data(ticker, period=period, max_points=max_points)
     
     if data:
-        return jsonify({
+        return json_response({
             'success': True,
             'ticker': ticker,
-            'data': data
-        })
+            'data': format_chart_payload(data)
+        }, request)
     else:
         return jsonify({
             'success': False,
@@ -206,6 +404,39 @@ def chart_data(ticker):
         }), 404
 
 
+@app.route('/api/charts')
+def charts_data():
+    """
+    API endpoint to get chart data for many tickers with one batched download
+    
+    Query parameters: tickers (comma separated, default: all tracked tickers,
+    at most CHART_MAX_TICKERS), period, max_points and format, as for /api/chart.
+    
+    Returns:
+        json: Ticker -> chart data (null for tickers without data)
+    """
+    period = request.args.get('period', '1y')
+    max_points = request.args.get('max_points', CHART_API_MAX_POINTS, type=int)
+    try:
+        tickers = requested_tickers()
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    
+    datas = get_stock_data_batch(tickers, period=period, max_points=max_points)
+    if not any(datas.values()):
+        return jsonify({
+            'success': False,
+            'tickers': tickers,
+            'error': f"Failed to get data for {', '.join(tickers)}"
+        }), 404
+    
+    return json_response({
+        'success': True,
+        'tickers': tickers,
+        'data': {ticker: format_chart_payload(data) if data else None for ticker, data in datas.items()}
+    }, request)
+
+
 @app.route('/chart/<ticker>')
 def chart_view(ticker):
     """
@@ -246,22 +477,81 @@ def chart_image(ticker):
         ticker (str): Ticker symbol
         
     Returns:
-        Response: PNG image
+        Response: Chart image (PNG, or WebP when the browser accepts it and it fits the budget better)
     """
     period = request.args.get('period', '1y')
-    data = get_stock_data(ticker, period=period)
+    data = get_chart_data(ticker, period)
     
     if not data:
         return "Chart data not available", 404
+    
+    # 같은 데이터의 차트를 이미 가진 브라우저에는 렌더링 없이 304로 응답
+    formats = accepted_image_formats()
+    etag = get_chart_etag(ticker, period, data, formats)
+    if etag in request.if_none_match:
+        response = Response(status=304)
+        response.set_etag(etag)
+        return response
         
-    # 차트 이미지 생성
-    chart_bytes = create_stock_chart(ticker, data)
+    # 차트 이미지 (캐시에 없을 때만 렌더링 프로세스 풀에서 생성)
+    chart_bytes = get_cached_chart(ticker, period, data, etag, formats)
     
     if not chart_bytes:
         return "Chart generation failed", 500
         
-    # PNG 이미지로 응답
-    return Response(chart_bytes, mimetype='image/png')
+    # 이미지로 응답 (브라우저는 매번 ETag로 재검증)
+    response = Response(chart_bytes, mimetype=MIMETYPES.get(image_format(chart_bytes), 'image/png'))
+    response.vary.add('Accept')
+    response.set_etag(etag)
+    response.cache_control.no_cache = True
+    return response
+
+
+@app.route('/chart-grid')
+def chart_grid_image():
+    """
+    Serve one small-multiples image with the charts of many tickers
+    
+    Query parameters: tickers (comma separated, default: all tracked tickers,
+    at most CHART_MAX_TICKERS) and period.
+    
+    Returns:
+        Response: Chart grid image
+    """
+    period = request.args.get('period', '1y')
+    try:
+        tickers = requested_tickers()
+    except ValueError as e:
+        return str(e), 400
+    
+    datas = get_chart_datas(tickers, period)
+    items = [(ticker, datas[ticker]) for ticker in tickers]
+    items = [(ticker, data) for ticker, data in items if data and data.get('dates')]
+    if not items:
+        return "Chart data not available", 404
+    
+    formats = accepted_image_formats()
+    version = ','.join(chart_data_version(data) for _, data in items)
+    etag = chart_cache.key(','.join(ticker for ticker, _ in items), period, version,
+                           variant='grid:' + ','.join(formats))
+    if etag in request.if_none_match:
+        response = Response(status=304)
+        response.set_etag(etag)
+        return response
+    
+    def render():
+        grid_bytes = render_in_pool(render_chart_grid, items, period.upper())
+        return optimize_image(grid_bytes, 'web', allowed_formats=formats).data if grid_bytes else None
+    
+    grid_bytes = chart_cache.get_or_render(etag, render)
+    if not grid_bytes:
+        return "Chart generation failed", 500
+    
+    response = Response(grid_bytes, mimetype=MIMETYPES.get(image_format(grid_bytes), 'image/png'))
+    response.vary.add('Accept')
+    response.set_etag(etag)
+    response.cache_control.no_cache = True
+    return response
 
 
 @app.route('/chart-data-image/<ticker>')
@@ -276,7 +566,7 @@ def chart_data_image(ticker):
         json: Chart data and base64 encoded image
     """
     period = request.args.get('period', '1y')
-    data = get_stock_data(ticker, period=period)
+    data = get_chart_data(ticker, period)
     
     if not data:
         return jsonify({
@@ -285,8 +575,9 @@ def chart_data_image(ticker):
             'error': f"Failed to get data for {ticker}"
         }), 404
     
-    # 차트 이미지 생성
-    chart_bytes = create_stock_chart(ticker, data)
+    # 차트 이미지 (캐시에 없을 때만 렌더링 프로세스 풀에서 생성)
+    etag = get_chart_etag(ticker, period, data, ('png',))
+    chart_bytes = get_cached_chart(ticker, period, data, etag, ('png',))
     
     if not chart_bytes:
         return jsonify({
@@ -298,12 +589,185 @@ def chart_data_image(ticker):
     # Base64로 인코딩
     encoded_image = base64.b64encode(chart_bytes).decode('utf-8')
     
-    return jsonify({
+    # 응답 데이터는 LTTB로 다운샘플링 (이미지는 전체 데이터로 렌더링됨)
+    max_points = request.args.get('max_points', CHART_API_MAX_POINTS, type=int)
+    
+    response = json_response({
         'success': True,
         'ticker': ticker,
-        'data': data,
+        'data': format_chart_payload(downsample_chart_data(data, max_points)),
         'chart_image': encoded_image
-    })
+    }, request)
+    response.set_etag(f"{etag}-{max_points}-{request.args.get('format', 'lists')}")
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
+
+
+def get_screener_result():
+    """
+    Last screener result, never computed inside the request
+    
+    A missing or expired result only starts a background run (at most one at a
+    time); the request is served with what is already there.
+    
+    Returns:
+        dict: Screener result
+        None: If the first run has not finished yet
+    """
+    screener = get_screener()
+    if not screener.is_fresh():
+        screener.refresh_in_background()
+    return screener.last_result
+
+
+@app.route('/screener')
+def screener_view():
+    """
+    Market-wide MA200 screener page
+    
+    Query parameters: condition ('all', 'above', 'below', 'plus10',
+    'crossed_up', 'crossed_down') and limit.
+    
+    Returns:
+        html: Ranked screener results
+    """
+    condition = request.args.get('condition', 'all')
+    limit = request.args.get('limit', 100, type=int)
+    result = get_screener_result()
+    if result is None:
+        return render_template('screener.html', result=None, condition=condition, limit=limit)
+    try:
+        rows = filter_rows(result['rows'], condition)
+    except ValueError:
+        condition = 'all'
+        rows = result['rows']
+    
+    return render_template(
+        'screener.html',
+        result=result,
+        rows=rows[:limit] if limit > 0 else rows,
+        total=len(rows),
+        condition=condition,
+        limit=limit,
+        stats=result['stats'],
+        generated_at=result['generated_at'],
+        running=get_screener().running
+    )
+
+
+@app.route('/api/screener')
+def screener_data():
+    """
+    API endpoint for the market-wide MA200 screener
+    
+    Query parameters: condition and limit (0 for all rows), as for /screener.
+    
+    Returns:
+        json: Ranked rows and run statistics (including symbols per second);
+            503 while the first run is still in progress
+    """
+    condition = request.args.get('condition', 'all')
+    limit = request.args.get('limit', 100, type=int)
+    result = get_screener_result()
+    if result is None:
+        response = jsonify({'success': False, 'running': True, 'error': "Screener is running, try again shortly"})
+        response.retry_after = 60
+        return response, 503
+    try:
+        rows = filter_rows(result['rows'], condition)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    
+    return json_response({
+        'success': True,
+        'generated_at': result['generated_at'],
+        'running': get_screener().running,
+        'condition': condition,
+        'total': len(rows),
+        'rows': rows[:limit] if limit > 0 else rows,
+        'stats': result['stats']
+    }, request)
+
+
+@app.route('/api/analytics')
+def analytics_data():
+    """
+    API endpoint for cross-ticker correlation, beta and relative strength
+    
+    Query parameters: days (length of the rolling pair series, default 252).
+    
+    Returns:
+        json: Latest correlation, beta and relative strength matrices of the
+            tracked tickers and rolling series of the configured pairs
+    """
+    days = request.args.get('days', 252, type=int)
+    result = get_analytics().result(days)
+    if result is None:
+        return jsonify({
+            'success': False,
+            'error': "Not enough price history for analytics"
+        }), 404
+    
+    response = json_response({'success': True, **result}, request)
+    # 장중에는 같은 날짜에도 값이 바뀌므로 응답 내용 자체로 ETag 생성
+    digest = hashlib.sha1(json.dumps(result, sort_keys=True).encode('utf-8')).hexdigest()
+    response.set_etag(f"analytics-{digest}-{request.args.get('format', 'lists')}")
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
+
+
+# Heatmap per metric: (title, lookback key in the analytics result, color scale min, max, cell format)
+HEATMAP_SCALES = {
+    'correlation': ("Return Correlation", 'window', -1.0, 1.0, "{:.2f}"),
+    'beta': ("Beta (row vs column)", 'window', -3.0, 3.0, "{:.2f}"),
+    'relative_strength': ("Relative Strength (row vs column)", 'rs_days', -0.5, 0.5, "{:+.0%}"),
+}
+
+
+@app.route('/analytics-heatmap')
+def analytics_heatmap():
+    """
+    Serve a heatmap image of one analytics matrix
+    
+    Query parameters: metric ('correlation', 'beta' or 'relative_strength').
+    
+    Returns:
+        Response: Heatmap image
+    """
+    metric = request.args.get('metric', 'correlation')
+    if metric not in METRICS:
+        return f"Unknown metric: {metric}", 400
+    
+    result = get_analytics().result(days=1)
+    if result is None or result[metric] is None:
+        return "Analytics data not available", 404
+    
+    # 장중에는 같은 날짜에도 값이 바뀌므로 행렬 값 자체를 키에 포함
+    formats = accepted_image_formats()
+    etag = chart_cache.key(','.join(result['tickers']), metric, json.dumps(result[metric]),
+                           variant='heatmap:' + ','.join(formats))
+    if etag in request.if_none_match:
+        response = Response(status=304)
+        response.set_etag(etag)
+        return response
+    
+    title, lookback, vmin, vmax, value_format = HEATMAP_SCALES[metric]
+    title = f"{title} - {result[lookback]}d ({result['as_of']})"
+    
+    def render():
+        heatmap_bytes = render_in_pool(render_heatmap, result['tickers'], result[metric], title, vmin, vmax,
+                                       value_format)
+        return optimize_image(heatmap_bytes, 'web', allowed_formats=formats).data if heatmap_bytes else None
+    
+    heatmap_bytes = chart_cache.get_or_render(etag, render)
+    if not heatmap_bytes:
+        return "Heatmap generation failed", 500
+    
+    response = Response(heatmap_bytes, mimetype=MIMETYPES.get(image_format(heatmap_bytes), 'image/png'))
+    response.vary.add('Accept')
+    response.set_etag(etag)
+    response.cache_control.no_cache = True
+    return response
 
 
 @app.errorhandler(404)
@@ -313,4 +777,5 @@ def page_not_found(e):
 
 
 if __name__ == '__main__':
+    prefetch_stock_info([ticker for group in TICKERS.values() for ticker in group])
     app.run(host='0.0.0.0', port=5000, debug=True)
\ No newline at end of file
@@ -0,0 +1,66 @@
+"""
+차트 데이터 전송 형식 벤치마크 - 응답 크기와 인코딩 시간 비교
+
+기존 형식(병렬 리스트, 표준 json)과 compact 형식(시작일 + 일자 간격, 센트 단위 정수,
+앞쪽 결측 구간 개수)을 표준 json / orjson으로 직렬화하고 gzip, brotli(설치된 경우)로
+압축했을 때의 크기와 소요 시간을 비교함.
+
+사용 예:
+    python bench_chart_payload.py --days 252 2520
+"""
+import argparse
+import gzip
+import json
+import logging
+
+import chart_payload
+from bench_chart_template import make_chart_data
+from bench_utils import timed
+from chart_payload import decode_compact, encode_compact
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+logger = logging.getLogger(__name__)
+
+
+def bench_days(days, repeat):
+    data = make_chart_data(days, seed=days)
+    data.update({'current_price': data['prices'][-1], 'is_above_ma200': True})
+
+    # 라운드트립 확인 (센트 단위 반올림 외 손실 없음)
+    decoded = decode_compact(encode_compact(data))
+    assert decoded['dates'] == data['dates']
+    assert all((a is None and b is None) or abs(a - b) <= 0.005 + 1e-9
+               for a, b in zip(decoded['ma200'], data['ma200']))
+
+    cases = [
+        ("lists + json", lambda: json.dumps({'data': data}).encode('utf-8')),
+        ("compact + json", lambda: json.dumps({'data': encode_compact(data)}, separators=(',', ':')).encode('utf-8')),
+    ]
+    if chart_payload.orjson is not None:
+        cases += [
+            ("lists + orjson", lambda: chart_payload.orjson.dumps({'data': data})),
+            ("compact + orjson", lambda: chart_payload.orjson.dumps({'data': encode_compact(data)})),
+        ]
+
+    logger.info(f"--- {days}일 데이터 ---")
+    for label, encode in cases:
+        body, encode_ms = timed(encode, repeat)
+        gz, gzip_ms = timed(lambda: gzip.compress(body, compresslevel=6), repeat)
+        line = (f"{label:<18} 원본 {len(body) / 1024:7.1f}KB ({encode_ms:6.2f}ms)  "
+                f"gzip {len(gz) / 1024:6.1f}KB (+{gzip_ms:5.2f}ms)")
+        if chart_payload.brotli is not None:
+            br, br_ms = timed(lambda: chart_payload.brotli.compress(body, quality=5), repeat)
+            line += f"  br {len(br) / 1024:6.1f}KB (+{br_ms:5.2f}ms)"
+        logger.info(line)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="차트 데이터 전송 형식 벤치마크")
+    parser.add_argument("--days", type=int, nargs="+", default=[252, 2520])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    if chart_payload.brotli is None:
+        logger.info("brotli 미설치 - gzip 결과만 표시")
+    for days in args.days:
+        bench_days(days, args.repeat)
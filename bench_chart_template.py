@@ -0,0 +1,65 @@
+"""
+차트 템플릿 재사용 벤치마크 - 티커마다 figure를 새로 만드는 방식과 비교
+
+합성 주가 데이터로 여러 티커의 차트를 렌더링하며, 매번 ChartTemplate를 새로 만드는
+방식(figure, 축, 범례, 레이아웃 재구성)과 하나의 템플릿에서 선 데이터, 제목, 축 범위만
+바꾸는 방식의 차트당 렌더링 시간을 비교함.
+
+사용 예:
+    python bench_chart_template.py --tickers 40 --days 252
+"""
+import argparse
+import logging
+
+import numpy as np
+import pandas as pd
+
+from bench_utils import timed
+from chart_renderer import ChartTemplate
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+logging.getLogger("matplotlib").setLevel(logging.WARNING)
+logger = logging.getLogger(__name__)
+
+
+def make_chart_data(days, seed):
+    """get_stock_data와 같은 형식의 합성 차트 데이터"""
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range(end="2025-12-31", periods=days)
+    close = pd.Series(np.exp(rng.normal(0, 0.02, days).cumsum()) * rng.uniform(5, 500))
+    ma50 = close.rolling(window=50).mean()
+    ma200 = close.rolling(window=200).mean()
+
+    def to_list(series):
+        return [None if np.isnan(x) else float(x) for x in series]
+
+    return {
+        'dates': dates.strftime('%Y-%m-%d').tolist(),
+        'prices': to_list(close),
+        'ma50': to_list(ma50),
+        'ma200': to_list(ma200),
+        'ma200_plus10': to_list(ma200 * 1.1),
+    }
+
+
+def bench(label, render, items):
+    """모든 티커를 렌더링하고 차트당 시간 기록"""
+    sizes, elapsed_ms = timed(lambda: [len(render(ticker, data)) for ticker, data in items])
+    elapsed = elapsed_ms / 1000
+    logger.info(f"{label}: 총 {elapsed:.2f}s, 차트당 {elapsed / len(items) * 1000:.1f}ms, "
+                f"평균 크기 {sum(sizes) / len(sizes) / 1024:.0f}KB")
+    return elapsed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="차트 템플릿 재사용 벤치마크")
+    parser.add_argument("--tickers", type=int, default=40)
+    parser.add_argument("--days", type=int, default=252)
+    args = parser.parse_args()
+
+    items = [(f"T{i:03d}", make_chart_data(args.days, seed=i)) for i in range(args.tickers)]
+
+    fresh = bench("figure 새로 생성", lambda ticker, data: ChartTemplate().render(ticker, data), items)
+    template = ChartTemplate()
+    reused = bench("템플릿 재사용", template.render, items)
+    logger.info(f"속도 향상: {fresh / reused:.1f}배")
@@ -0,0 +1,59 @@
+"""
+오프라인 데이터 공급원 벤치마크 - 합성 데이터로 대규모 파이프라인 측정
+
+네트워크 없이 SyntheticProvider(또는 --fixture 디렉터리의 기록 데이터)로 일봉을 만들어
+가격 저장소(SQLite) 적재, 가격 행렬 생성, 지표 계산을 단계별로 측정함.
+앱 전체를 오프라인으로 띄우려면 DATA_PROVIDER=synthetic python app.py
+
+사용 예:
+    python bench_data_provider.py --tickers 5000 --years 10
+    python bench_data_provider.py --fixture fixtures
+"""
+import argparse
+import logging
+import os
+import tempfile
+
+from bench_utils import timed
+from data_providers import FixtureProvider, SyntheticProvider
+from indicators import IndicatorEngine
+from price_matrix import PriceMatrix
+from price_store import PriceStore
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+logger = logging.getLogger(__name__)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="오프라인 데이터 공급원 벤치마크")
+    parser.add_argument("--tickers", type=int, default=500)
+    parser.add_argument("--years", type=int, default=10)
+    parser.add_argument("--fixture", help="합성 데이터 대신 사용할 기록 데이터 디렉터리")
+    parser.add_argument("--batch", type=int, default=500, help="저장소 적재 배치 크기")
+    args = parser.parse_args()
+
+    if args.fixture:
+        provider = FixtureProvider(args.fixture)
+    else:
+        provider = SyntheticProvider(tickers=args.tickers, years=args.years)
+    symbols = provider.symbols()
+    logger.info(f"{provider.name}: {len(symbols)}개 티커")
+
+    histories, generate_ms = timed(lambda: provider.history_many(symbols), label="일봉 생성/읽기")
+    bars = sum(len(history) for history in histories.values())
+    logger.info(f"일봉 {bars:,}개 ({bars / generate_ms * 1000:,.0f}개/초)")
+
+    with tempfile.TemporaryDirectory() as directory:
+        store = PriceStore(os.path.join(directory, "prices.db"), fetch=provider.history,
+                           fetch_many=provider.history_many)
+        batches = [symbols[i:i + args.batch] for i in range(0, len(symbols), args.batch)]
+        _, sync_ms = timed(lambda: [store.sync_many(batch, 'max') for batch in batches], label="저장소 적재 (max)")
+        logger.info(f"저장소 적재 {len(symbols) / sync_ms * 1000:,.0f}개 티커/초")
+        timed(lambda: [store.sync_many(batch, 'max') for batch in batches], label="저장소 재동기화 (최신)")
+
+    matrix, _ = timed(lambda: PriceMatrix.from_histories(histories), label="가격 행렬 생성")
+    logger.info(f"가격 행렬 {len(matrix)}개 x {len(matrix.dates)}일, {matrix.nbytes / 1024 ** 2:.1f}MB")
+
+    engine = IndicatorEngine()
+    _, compute_ms = timed(lambda: engine.compute_rows(matrix, symbols), label="지표 계산")
+    logger.info(f"지표 계산 {len(symbols) / compute_ms * 1000:,.0f}개 티커/초")
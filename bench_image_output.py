@@ -0,0 +1,63 @@
+"""
+이미지 출력 단계 벤치마크 - 인코딩 시간 대비 절약된 용량
+
+합성 데이터로 렌더링한 주가 차트와 긴 텍스트 이미지를 전략별(zlib 레벨, 팔레트 양자화,
+WebP/JPEG 품질)로 재인코딩해 크기, 인코딩 시간, 지정한 업로드 대역폭에서의 전송 시간을
+비교하고, 목적지별 프로필(config.IMAGE_OUTPUT_PROFILES)이 고른 결과를 표시함.
+
+사용 예:
+    python bench_image_output.py --uplink-mbps 5
+"""
+import argparse
+import io
+import logging
+
+from PIL import Image
+
+from bench_chart_template import make_chart_data
+from chart_renderer import render_stock_chart
+from config import IMAGE_OUTPUT_PROFILES
+from image_output import encode_candidates, optimize_image
+from text_rasterizer import render_text_card
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+logging.getLogger("matplotlib").setLevel(logging.WARNING)
+logger = logging.getLogger(__name__)
+
+
+def bench_image(name, png, uplink_mbps):
+    """전략별 인코딩 결과 비교"""
+    original = len(png)
+    upload_ms = lambda size: size * 8 / (uplink_mbps * 1_000_000) * 1000
+    logger.info(f"--- {name}: 원본 PNG {original / 1024:.1f}KB, 업로드 {upload_ms(original):.0f}ms ---")
+
+    image = Image.open(io.BytesIO(png)).convert('RGB')
+    candidates = []
+    for level in (1, 6, 9):
+        candidates += [(f"{label} (zlib {level})", data, ms) for label, _, data, ms
+                       in encode_candidates(image, ['png', 'png-palette'], compress_level=level)]
+    candidates += [(label, data, ms) for label, _, data, ms in encode_candidates(image, ['webp', 'jpeg'])]
+
+    for label, data, encode_ms in candidates:
+        saved = original - len(data)
+        total_ms = encode_ms + upload_ms(len(data))
+        logger.info(f"{label:<24} {len(data) / 1024:7.1f}KB  절약 {saved / original * 100:5.1f}%  "
+                    f"인코딩 {encode_ms:6.1f}ms  인코딩+업로드 {total_ms:6.0f}ms")
+
+    for destination in IMAGE_OUTPUT_PROFILES:
+        result = optimize_image(png, destination)
+        logger.info(f"프로필 '{destination}': {result.strategy}, {len(result.data) / 1024:.1f}KB, "
+                    f"{result.encode_ms:.1f}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="이미지 출력 단계 벤치마크")
+    parser.add_argument("--uplink-mbps", type=float, default=10.0, help="업로드 대역폭 (Mbps)")
+    args = parser.parse_args()
+
+    chart = render_stock_chart("BENCH", make_chart_data(2520, seed=1), period_label="10Y")
+    bench_image("주가 차트 (10Y)", chart, args.uplink_mbps)
+
+    text = "\n".join(f"Line {i}: semiconductor ETF briefing text sample for the output stage" for i in range(120))
+    text_image = render_text_card("BENCH", "Daily Briefing", text)
+    bench_image("텍스트 이미지 (120줄)", text_image, args.uplink_mbps)
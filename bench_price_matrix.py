@@ -0,0 +1,74 @@
+"""
+가격 행렬 메모리 벤치마크 - 티커별 DataFrame + 리스트 대비 float32 행렬
+
+합성 일봉으로 티커마다 OHLCV DataFrame과 get_stock_data 형식의 파이썬 float 리스트 5개를
+들고 있는 방식과, 모든 티커를 하나의 float32 행렬(티커 x 거래일)에 담는 PriceMatrix의
+메모리 사용량을 비교하고, 저장 후 메모리 매핑으로 불러오는 시간과 행 조회(뷰) 시간을 측정함.
+
+사용 예:
+    python bench_price_matrix.py --tickers 1000 --days 2520
+"""
+import argparse
+import logging
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from bench_utils import timed
+from price_matrix import PriceMatrix
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+logger = logging.getLogger(__name__)
+
+
+def make_histories(tickers, days, seed=0):
+    """yfinance history와 같은 형식의 합성 일봉"""
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range(end="2025-12-31", periods=days)
+    histories = {}
+    for i in range(tickers):
+        close = np.exp(rng.normal(0, 0.02, days).cumsum()) * rng.uniform(5, 500)
+        histories[f"T{i:04d}"] = pd.DataFrame(
+            {'Open': close, 'High': close * 1.01, 'Low': close * 0.99, 'Close': close, 'Volume': 1e6}, index=index
+        )
+    return histories
+
+
+def list_bytes(values):
+    """파이썬 float 리스트 크기 (리스트 + float 객체)"""
+    return sys.getsizeof(values) + sum(sys.getsizeof(v) for v in values)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="가격 행렬 메모리 벤치마크")
+    parser.add_argument("--tickers", type=int, default=1000)
+    parser.add_argument("--days", type=int, default=2520)
+    args = parser.parse_args()
+
+    histories = make_histories(args.tickers, args.days)
+
+    # 티커 하나 기준으로 재서 티커 수만큼 곱함 (모든 티커 크기가 같음)
+    sample = next(iter(histories.values()))
+    frame_bytes = sample.memory_usage(index=True, deep=True).sum()
+    lists_bytes = 5 * list_bytes(sample['Close'].tolist()) + list_bytes(sample.index.strftime('%Y-%m-%d').tolist())
+    per_ticker = (frame_bytes + lists_bytes) * args.tickers
+
+    matrix, build_ms = timed(lambda: PriceMatrix.from_histories(histories))
+
+    logger.info(f"{args.tickers}개 티커 x {args.days}일")
+    logger.info(f"DataFrame + 리스트 5개  {per_ticker / 1024 ** 2:8.1f}MB")
+    logger.info(f"float32 행렬            {matrix.nbytes / 1024 ** 2:8.1f}MB (생성 {build_ms:.0f}ms)")
+    logger.info(f"절약: {per_ticker / matrix.nbytes:.1f}배")
+
+    with tempfile.TemporaryDirectory() as directory:
+        matrix.save(directory)
+        mapped, load_ms = timed(lambda: PriceMatrix.load(directory, mmap=True))
+
+        rows, views_ms = timed(lambda: [mapped.row(ticker) for ticker in mapped.tickers])
+        row = rows[-1]
+        view_us = views_ms / len(mapped) * 1000
+        assert np.shares_memory(row, mapped.data['close'])
+        logger.info(f"메모리 매핑 불러오기 {load_ms:.1f}ms, 행 뷰 조회 {view_us:.2f}us (복사 없음)")
+        del mapped, rows, row
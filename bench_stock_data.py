@@ -0,0 +1,90 @@
+"""
+차트 데이터 직렬화 벤치마크 - 요소별 pd.isna/float 리스트 변환과 numpy 벡터화 비교
+
+합성 일봉(기본 10년)에 이동평균을 계산한 뒤, 기존 get_stock_data의 변환 방식(strftime,
+요소마다 pd.isna와 float를 호출하는 리스트 컴프리헨션)과 stock_data.format_chart_data의
+numpy 배열 기반 변환을 반복 실행해 시간을 비교하고 결과가 같은지 확인함.
+
+사용 예:
+    python bench_stock_data.py --days 2520 --repeat 50
+"""
+import argparse
+import logging
+
+import numpy as np
+import pandas as pd
+
+from bench_utils import timed
+from indicators import compute_indicators
+from stock_data import PRICE_DECIMALS, format_chart_data
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+logger = logging.getLogger(__name__)
+
+
+def make_history(days, seed=0):
+    """yfinance history와 같은 형식의 합성 일봉"""
+    rng = np.random.default_rng(seed)
+    close = np.exp(rng.normal(0, 0.02, days).cumsum()) * 100
+    index = pd.bdate_range(end="2025-12-31", periods=days)
+    return pd.DataFrame({'Open': close, 'High': close, 'Low': close, 'Close': close, 'Volume': 1e6}, index=index)
+
+
+def format_chart_data_legacy(history):
+    """기존 get_stock_data의 요소별 변환 (비교 기준)"""
+    dates = history.index.strftime('%Y-%m-%d').tolist()
+    prices = [float(x) if not pd.isna(x) else None for x in history['Close'].tolist()]
+    ma50 = [float(x) if not pd.isna(x) else None for x in history['MA50'].tolist()]
+    ma200 = [float(x) if not pd.isna(x) else None for x in history['MA200'].tolist()]
+    ma200_plus10 = [float(x) if not pd.isna(x) else None for x in history['MA200_Plus10'].tolist()]
+
+    current_price = float(prices[-1]) if prices[-1] is not None else None
+    current_ma50 = float(ma50[-1]) if ma50[-1] is not None else None
+    current_ma200 = float(ma200[-1]) if ma200[-1] is not None else None
+    current_ma200_plus10 = float(ma200_plus10[-1]) if ma200_plus10[-1] is not None else None
+
+    is_above_ma200 = current_price > current_ma200 if current_price is not None and current_ma200 is not None else False
+    is_above_ma200_plus10 = current_price > current_ma200_plus10 if current_price is not None and current_ma200_plus10 is not None else False
+
+    return {
+        'dates': dates,
+        'prices': prices,
+        'ma50': ma50,
+        'ma200': ma200,
+        'ma200_plus10': ma200_plus10,
+        'current_price': current_price,
+        'current_ma50': current_ma50,
+        'current_ma200': current_ma200,
+        'current_ma200_plus10': current_ma200_plus10,
+        'is_above_ma200': is_above_ma200,
+        'is_above_ma200_plus10': is_above_ma200_plus10
+    }
+
+
+def to_cents(chart):
+    """요소별 변환 결과를 format_chart_data와 같이 센트 단위로 반올림"""
+    def cents(value):
+        return round(value, PRICE_DECIMALS) if isinstance(value, float) else value
+
+    return {key: [cents(x) for x in value] if key != 'dates' and isinstance(value, list) else cents(value)
+            for key, value in chart.items()}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="차트 데이터 직렬화 벤치마크")
+    parser.add_argument("--days", type=int, default=2520, help="일봉 개수 (기본 10년)")
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    history = compute_indicators({'BENCH': make_history(args.days)})['BENCH']
+
+    legacy, legacy_ms = timed(lambda: format_chart_data_legacy(history), args.repeat)
+    vectorized, vectorized_ms = timed(lambda: format_chart_data(history), args.repeat)
+    # 결과 비교는 측정 구간 밖에서: 현재 형식은 가격을 센트 단위로 반올림해서 보냄
+    vectorized_chart = {key: value for key, value in vectorized.items() if key != 'indicators'}
+    assert to_cents(legacy) == vectorized_chart, "변환 결과가 다름"
+
+    logger.info(f"일봉 {args.days}개, {args.repeat}회 반복 (결과 동일)")
+    logger.info(f"요소별 리스트 변환  {legacy_ms:7.2f}ms")
+    logger.info(f"numpy 벡터화 변환   {vectorized_ms:7.2f}ms")
+    logger.info(f"속도 향상: {legacy_ms / vectorized_ms:.1f}배")
@@ -0,0 +1,79 @@
+"""
+브리핑 텍스트 이미지 렌더링 벤치마크 - matplotlib figure 대비 PIL ImageDraw
+
+같은 브리핑 본문을 예전 matplotlib 기반 렌더러(아래 render_text_image, 비교 기준)와
+PIL 기반 render_text_card로 반복 렌더링해 이미지당 시간을 비교함. 한글 폰트(config.TEXT_IMAGE_FONTS)가 없으면
+PIL 쪽도 한글을 공백으로 바꿔 그림.
+
+사용 예:
+    python bench_text_image.py --lines 40 --repeat 20
+"""
+import argparse
+import io
+import logging
+
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from matplotlib.patches import Rectangle
+
+from bench_utils import timed
+from text_rasterizer import render_text_card, resolve_font
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+logging.getLogger("matplotlib").setLevel(logging.WARNING)
+logger = logging.getLogger(__name__)
+
+SAMPLE_LINE = ("반도체 ETF SOXL은 엔비디아와 AMD 강세에 힘입어 3.2% 상승했습니다. "
+               "Semiconductor names rallied after strong AI server demand guidance.")
+
+
+def render_text_image(ticker, title, text, width=1000, height=500):
+    """예전 matplotlib figure 기반 텍스트 카드 렌더러 (비교 기준)"""
+    background_color = (20/255, 24/255, 40/255)  # 어두운 남색
+    border_color = (100/255, 140/255, 240/255)
+    header_color = (66/255, 133/255, 244/255)
+    text_color = (240/255, 240/255, 245/255)
+
+    figure = Figure(figsize=(width/100, height/100), dpi=100, facecolor=background_color)
+    FigureCanvasAgg(figure)
+    ax = figure.add_subplot()
+    ax.set_facecolor(background_color)
+    ax.axis('off')
+
+    ax.add_patch(Rectangle((0, 0), 1, 1, linewidth=2, edgecolor=border_color, facecolor='none',
+                           transform=ax.transAxes))
+    ax.text(0.03, 0.95, ticker, fontsize=20, color=header_color, weight='bold', transform=ax.transAxes)
+    ax.text(0.97, 0.95, title, fontsize=14, color=header_color, horizontalalignment='right',
+            transform=ax.transAxes)
+    ax.axhline(y=0.92, xmin=0.03, xmax=0.97, color=header_color, linewidth=1)
+    ax.text(0.03, 0.85, text, fontsize=12, color=text_color, verticalalignment='top', linespacing=1.5,
+            transform=ax.transAxes)
+
+    figure.tight_layout()
+    buffer = io.BytesIO()
+    figure.savefig(buffer, format='png', dpi=100, facecolor=figure.get_facecolor())
+    return buffer.getvalue()
+
+
+def bench(label, render, repeat):
+    render()  # 폰트 로딩 등 첫 호출 비용 제외
+    size, elapsed_ms = timed(lambda: len(render()), repeat)
+    logger.info(f"{label:<24} 이미지당 {elapsed_ms:7.1f}ms, {size / 1024:.0f}KB")
+    return elapsed_ms
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="브리핑 텍스트 이미지 렌더링 벤치마크")
+    parser.add_argument("--lines", type=int, default=40)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    text = "\n".join(SAMPLE_LINE for _ in range(args.lines))
+    height = max(500, 100 + args.lines * 2 * 25)
+    path, cjk = resolve_font()
+    logger.info(f"폰트: {path} (한글 지원: {cjk})")
+
+    slow = bench("matplotlib figure", lambda: render_text_image("SOXL", "Daily Briefing", text, height=height),
+                 args.repeat)
+    fast = bench("PIL ImageDraw", lambda: render_text_card("SOXL", "데일리 브리핑", text), args.repeat)
+    logger.info(f"속도 향상: {slow / fast:.1f}배")
@@ -0,0 +1,28 @@
+"""
+벤치마크 공용 도구 - 실행 시간 측정
+"""
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+def timed(func, repeat=1, label=None):
+    """
+    func를 repeat번 실행하고 1회 평균 시간 측정
+
+    Args:
+        func (callable): 인자 없이 호출할 함수
+        repeat (int, optional): 반복 횟수
+        label (str, optional): 지정하면 측정 결과를 로그로 남김
+
+    Returns:
+        tuple: (마지막 결과, 1회 평균 ms)
+    """
+    started = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    elapsed_ms = (time.perf_counter() - started) / repeat * 1000
+    if label:
+        logger.info(f"{label:<24} {elapsed_ms:10.0f}ms")
+    return result, elapsed_ms
@@ -0,0 +1,66 @@
+"""
+Structured daily briefing produced by the scraper
+"""
+
+
+class Briefing:
+    """
+    Daily briefing for one ticker, as extracted by ETFScraper
+
+    Keeps the pieces the scraper already separated (main text, constituent stocks,
+    news items, news links) so that renderers do not have to parse text again.
+    """
+    def __init__(self, ticker, text="", stocks=None, news=None, links=None, notice=None):
+        """
+        Initialize the briefing
+
+        Args:
+            ticker (str): Ticker symbol
+            text (str): Main briefing text, one sentence or paragraph per line
+            stocks (list, optional): Dicts with 'name', 'price' and 'change' for constituent stocks
+            news (list, optional): Dicts with 'title', 'source' and optional 'url'
+            links (list, optional): News article URLs
+            notice (str, optional): Status message used instead of a briefing (e.g. "브리핑 없음")
+        """
+        self.ticker = ticker
+        self.text = text or ""
+        self.stocks = stocks or []
+        self.news = news or []
+        self.links = links or []
+        self.notice = notice
+
+    def to_text(self):
+        """
+        Format the briefing as the plain text "TICKER:\\n..." result used by the pipeline
+
+        Returns:
+            str: Briefing text
+        """
+        if self.notice:
+            return f"{self.ticker}: {self.notice}"
+
+        briefing = self.text
+
+        for stock in self.stocks:
+            briefing += f"\n\n\n\n━━━ {stock['name']} ━━━\n${stock['price']} ({stock['change']}%)"
+
+        if self.news:
+            briefing += "\n\n관련 뉴스:"
+            for item in self.news:
+                news = f"{item['title']} - {item['source']}"
+                if item.get('url'):
+                    news = f"{news}\n    {item['url']}"
+                briefing += f"\n\n{news}"
+
+        if self.links:
+            briefing += "\n\n뉴스 링크:" if self.news else "\n\n관련 뉴스 링크:"
+            for link in self.links:
+                briefing += f"\n{link}"
+
+        # Remove duplicate ticker header if it exists in the briefing
+        if briefing.startswith(f"{self.ticker}:"):
+            briefing = briefing.replace(f"{self.ticker}:", "", 1).strip()
+        return f"{self.ticker}:\n{briefing}"
+
+    def __str__(self):
+        return self.to_text()
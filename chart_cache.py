@@ -0,0 +1,226 @@
+"""
+Two-tier cache for rendered chart images
+
+Rendered (and output-optimized) images are kept in an in-memory LRU and mirrored to disk, so repeated
+views of the same chart cost a dictionary lookup (or one file read after a
+restart) instead of a matplotlib render. Entries are keyed by ticker, period,
+the timestamp of the last data point and a hash of the render settings, so a
+new trading day or a style change produces a new key instead of a stale image.
+The key doubles as the HTTP ETag.
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from chart_renderer import CHART_DPI, CHART_SERIES, CHART_SIZE, CHART_STYLE
+from config import (
+    CHART_CACHE_DIR, CHART_CACHE_MAX_AGE, CHART_CACHE_MAX_BYTES, CHART_CACHE_MEMORY_ITEMS, CHART_IMAGE_MAX_POINTS,
+    IMAGE_OUTPUT_PROFILES
+)
+
+logger = logging.getLogger(__name__)
+
+# Bump when the renderer output changes in a way the settings below do not capture
+RENDER_VERSION = 1
+
+
+def render_settings_hash():
+    """
+    Hash of everything that affects how a chart looks
+
+    Returns:
+        str: Short hex digest
+    """
+    settings = {
+        'version': RENDER_VERSION,
+        'style': CHART_STYLE,
+        'series': CHART_SERIES,
+        'size': CHART_SIZE,
+        'dpi': CHART_DPI,
+        'max_points': CHART_IMAGE_MAX_POINTS,
+        'output': IMAGE_OUTPUT_PROFILES.get('web'),
+    }
+    encoded = json.dumps(settings, sort_keys=True, default=str).encode('utf-8')
+    return hashlib.sha1(encoded).hexdigest()[:12]
+
+
+class ChartCache:
+    """
+    In-memory LRU in front of an on-disk image store, bounded by size and age
+    """
+    FILE_SUFFIX = '.img'
+
+    def __init__(self, cache_dir=CHART_CACHE_DIR, max_memory_items=CHART_CACHE_MEMORY_ITEMS,
+                 max_disk_bytes=CHART_CACHE_MAX_BYTES, max_age=CHART_CACHE_MAX_AGE):
+        """
+        Initialize the cache
+
+        Args:
+            cache_dir (str, optional): Directory for cached image files (None disables the disk tier)
+            max_memory_items (int, optional): Maximum number of images kept in memory
+            max_disk_bytes (int, optional): Maximum total size of cached files
+            max_age (int, optional): Seconds after which an entry is discarded
+        """
+        self.cache_dir = cache_dir
+        self.max_memory_items = max_memory_items
+        self.max_disk_bytes = max_disk_bytes
+        self.max_age = max_age
+        self.settings_hash = render_settings_hash()
+
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk_bytes = None
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def key(self, ticker, period, last_timestamp, variant=''):
+        """
+        Cache key (and ETag) for one chart
+
+        Args:
+            ticker (str): Ticker symbol
+            period (str): Data period, e.g. '1y'
+            last_timestamp (str): Date or time of the last data point
+            variant (str, optional): Output variant, e.g. the image formats the client accepts
+
+        Returns:
+            str: Hex digest
+        """
+        raw = f"{ticker.upper()}|{period}|{last_timestamp}|{variant}|{self.settings_hash}"
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}{self.FILE_SUFFIX}")
+
+    def get(self, key):
+        """
+        Look up an image, promoting disk hits into memory
+
+        Returns:
+            bytes: Encoded image bytes
+            None: On a miss or an expired entry
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                created, image = entry
+                if now - created <= self.max_age:
+                    self._memory.move_to_end(key)
+                    return image
+                del self._memory[key]
+
+        if not self.cache_dir:
+            return None
+        path = self._path(key)
+        try:
+            created = os.path.getmtime(path)
+            if now - created > self.max_age:
+                self._remove_file(path)
+                return None
+            with open(path, 'rb') as f:
+                image = f.read()
+        except OSError:
+            return None
+
+        self._remember(key, image, created)
+        return image
+
+    def put(self, key, image):
+        """
+        Store an image in both tiers
+
+        Args:
+            key (str): Cache key from key()
+            image (bytes): Encoded image bytes
+        """
+        self._remember(key, image, time.time())
+        if not self.cache_dir:
+            return
+
+        path = self._path(key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(image)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not write chart cache file {path}: {e}")
+            self._remove_file(tmp_path)
+            return
+
+        with self._lock:
+            if self._disk_bytes is not None:
+                self._disk_bytes += len(image)
+            over_budget = self._disk_bytes is None or self._disk_bytes > self.max_disk_bytes
+        if over_budget:
+            self.prune()
+
+    def get_or_render(self, key, render):
+        """
+        Return the cached image for key, rendering and storing it on a miss
+
+        Args:
+            key (str): Cache key from key()
+            render (callable): Zero-argument function returning image bytes or None
+
+        Returns:
+            bytes: Encoded image bytes
+            None: If rendering failed (failures are not cached)
+        """
+        image = self.get(key)
+        if image is None:
+            image = render()
+            if image:
+                self.put(key, image)
+        return image
+
+    def _remember(self, key, image, created):
+        with self._lock:
+            self._memory[key] = (created, image)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_memory_items:
+                self._memory.popitem(last=False)
+
+    def _remove_file(self, path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def prune(self):
+        """
+        Delete expired files, then the oldest files until the disk tier fits its size budget
+
+        Returns:
+            int: Number of files removed
+        """
+        if not self.cache_dir:
+            return 0
+
+        now = time.time()
+        files = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.is_file() and entry.name.endswith(self.FILE_SUFFIX):
+                stat = entry.stat()
+                files.append((stat.st_mtime, stat.st_size, entry.path))
+        files.sort()
+
+        removed = 0
+        total = sum(size for _, size, _ in files)
+        for mtime, size, path in files:
+            if now - mtime <= self.max_age and total <= self.max_disk_bytes:
+                break
+            self._remove_file(path)
+            total -= size
+            removed += 1
+
+        with self._lock:
+            self._disk_bytes = total
+        if removed:
+            logger.info(f"Pruned {removed} chart cache files ({total} bytes kept)")
+        return removed
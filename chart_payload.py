@@ -0,0 +1,164 @@
+"""
+Compact columnar wire format and compressed JSON responses for chart data
+
+The default chart payload is five parallel lists of full-precision floats and
+date strings. The compact format sends the same information as:
+
+- the first date plus the calendar-day gap to every following date,
+- each price series as integer cents, with the leading run of missing values
+  (the moving-average warm-up period) sent as a count instead of nulls.
+
+Responses are serialized with orjson when it is installed and compressed with
+brotli or gzip according to the client's Accept-Encoding.
+"""
+import gzip
+import json
+from datetime import date, timedelta
+
+import numpy as np
+from flask import Response
+
+try:
+    import orjson
+except ImportError:  # optional, falls back to the standard library encoder
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # optional, gzip is used instead
+    brotli = None
+
+COMPACT_FORMAT = "compact-v1"
+
+# Price series sent in cents
+PRICE_SERIES_KEYS = ('prices', 'ma50', 'ma200', 'ma200_plus10')
+
+# Responses smaller than this are not worth compressing
+MIN_COMPRESS_BYTES = 1024
+
+
+def _encode_series(values):
+    """Encode one series as {'skip': leading missing count, 'cents': [...]} with interior gaps as null"""
+    array = np.array(values, dtype=float)  # None becomes NaN
+    missing = np.isnan(array)
+    skip = int(np.argmin(missing)) if not missing.all() else len(array)
+    gaps = missing[skip:]
+    cents = np.round(np.where(gaps, 0, array[skip:]) * 100)
+    encoded = cents.astype(np.int64).tolist()
+    if gaps.any():
+        for i in np.flatnonzero(gaps):
+            encoded[i] = None
+    return {'skip': skip, 'cents': encoded}
+
+
+def _decode_series(encoded):
+    """Inverse of _encode_series: list of floats (in dollars) with None gaps"""
+    return [None] * encoded['skip'] + [None if c is None else c / 100 for c in encoded['cents']]
+
+
+def encode_compact(data):
+    """
+    Convert get_stock_data output to the compact columnar format
+
+    Args:
+        data (dict): Chart data from stock_data.get_stock_data
+
+    Returns:
+        dict: Compact payload
+    """
+    dates = data.get('dates') or []
+    days = np.array(dates, dtype='datetime64[D]').astype(np.int64)
+
+    payload = {
+        'format': COMPACT_FORMAT,
+        'start': dates[0] if dates else None,
+        'gaps': np.diff(days).tolist(),
+    }
+    for key in PRICE_SERIES_KEYS:
+        if key in data:
+            payload[key] = _encode_series(data[key])
+
+    # Scalar fields (current values, flags) are passed through, prices rounded to cents
+    for key, value in data.items():
+        if key in payload or key == 'dates':
+            continue
+        payload[key] = round(value, 2) if isinstance(value, float) else value
+    return payload
+
+
+def decode_compact(payload):
+    """
+    Convert a compact payload back to the get_stock_data layout
+
+    Args:
+        payload (dict): Output of encode_compact
+
+    Returns:
+        dict: Chart data with 'dates' strings and float series
+    """
+    data = {}
+    if payload.get('start'):
+        start = date.fromisoformat(payload['start'])
+        offsets = np.concatenate([[0], np.cumsum(payload['gaps'], dtype=np.int64)])
+        data['dates'] = [(start + timedelta(days=int(offset))).isoformat() for offset in offsets]
+    else:
+        data['dates'] = []
+
+    for key, value in payload.items():
+        if key in ('format', 'start', 'gaps'):
+            continue
+        data[key] = _decode_series(value) if key in PRICE_SERIES_KEYS else value
+    return data
+
+
+def dumps(obj):
+    """
+    Serialize to compact JSON bytes, using orjson when available
+
+    Returns:
+        bytes: UTF-8 JSON
+    """
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+def compress(body, accept_encoding):
+    """
+    Compress a response body for the client
+
+    Args:
+        body (bytes): Uncompressed body
+        accept_encoding (str): Client's Accept-Encoding header
+
+    Returns:
+        tuple: (body bytes, Content-Encoding value or None)
+    """
+    accepted = {part.split(';')[0].strip().lower() for part in (accept_encoding or '').split(',')}
+    if len(body) < MIN_COMPRESS_BYTES:
+        return body, None
+    if brotli is not None and 'br' in accepted:
+        return brotli.compress(body, quality=5), 'br'
+    if 'gzip' in accepted:
+        return gzip.compress(body, compresslevel=6), 'gzip'
+    return body, None
+
+
+def json_response(obj, request, status=200):
+    """
+    Build a compressed JSON Flask response
+
+    Args:
+        obj: JSON-serializable object
+        request (flask.Request): Current request (for Accept-Encoding)
+        status (int, optional): HTTP status code
+
+    Returns:
+        flask.Response: Response with Content-Encoding and Vary set as needed
+    """
+    body, encoding = compress(dumps(obj), request.headers.get('Accept-Encoding'))
+    response = Response(body, status=status, mimetype='application/json')
+    response.vary.add('Accept-Encoding')
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    return response
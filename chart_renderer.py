@@ -0,0 +1,434 @@
+"""
+Thread-safe chart rendering on matplotlib's object-oriented API
+
+Every figure is a standalone matplotlib.figure.Figure attached to its own Agg
+canvas, so nothing touches pyplot's global figure manager or rcParams. That
+makes the renderers safe to call from Flask worker threads and lets batches be
+spread across a process pool.
+"""
+import atexit
+import io
+import logging
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import matplotlib
+import matplotlib.dates as mdates
+import matplotlib.style
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from matplotlib.lines import Line2D
+
+from config import CHART_IMAGE_MAX_POINTS, CHART_RENDER_WORKERS
+from downsample import downsample_chart_data
+
+logger = logging.getLogger(__name__)
+
+# Dark theme colors, resolved once from matplotlib's 'dark_background' style
+_DARK = matplotlib.style.library['dark_background']
+CHART_STYLE = {
+    'background': _DARK['figure.facecolor'],
+    'text': _DARK['text.color'],
+    'edge': _DARK['axes.edgecolor'],
+    'grid': _DARK['grid.color'],
+    'tick': 'gray',
+}
+
+# Line styles for each chart series: (data key, label, line options)
+CHART_SERIES = [
+    ('prices', 'Price', {'color': '#00BFFF', 'linewidth': 2}),
+    ('ma50', '50-day MA', {'color': '#FFD700', 'linewidth': 1.5}),
+    ('ma200', '200-day MA', {'color': '#FF4500', 'linewidth': 1.5}),
+    ('ma200_plus10', '200-day MA +10%', {'color': '#FF69B4', 'linewidth': 1.5, 'linestyle': '--'}),
+]
+
+CHART_SIZE = (10, 6)
+CHART_DPI = 100
+
+# Size of one cell in the small-multiples grid, in inches
+GRID_CELL_SIZE = (5, 3.2)
+
+
+def _new_figure(figsize, dpi=CHART_DPI, facecolor=None):
+    """Create a Figure bound to its own Agg canvas (no pyplot involved)"""
+    figure = Figure(figsize=figsize, dpi=dpi, facecolor=facecolor or CHART_STYLE['background'])
+    FigureCanvasAgg(figure)
+    return figure
+
+
+def _to_png(figure, dpi=CHART_DPI):
+    """Render a Figure to PNG bytes"""
+    img_buf = io.BytesIO()
+    figure.savefig(img_buf, format='png', dpi=dpi, facecolor=figure.get_facecolor())
+    return img_buf.getvalue()
+
+
+def _series(data, key):
+    """Convert a list with None gaps into a float array with NaN gaps"""
+    return np.asarray(data.get(key) or [], dtype=float)
+
+
+def month_locator(dates, max_ticks=12):
+    """
+    Month locator that keeps about max_ticks ticks however long the period is
+
+    Args:
+        dates (numpy.ndarray): datetime64[D] dates, in order
+        max_ticks (int, optional): Target number of ticks
+
+    Returns:
+        matplotlib.dates.MonthLocator: Locator
+    """
+    months = (dates[-1] - dates[0]).astype(int) // 30 if len(dates) else 0
+    return mdates.MonthLocator(interval=max(1, -(-months // max_ticks)))
+
+
+def style_price_axes(ax):
+    """
+    Apply the dark chart theme to a price axes
+
+    Args:
+        ax (matplotlib.axes.Axes): Axes to style
+    """
+    ax.set_facecolor(CHART_STYLE['background'])
+    ax.grid(True, alpha=0.3, color=CHART_STYLE['grid'])
+
+    ax.xaxis.set_major_locator(mdates.MonthLocator())
+    ax.xaxis.set_major_formatter(mdates.DateFormatter('%Y-%m'))
+    ax.tick_params(axis='x', colors=CHART_STYLE['tick'], length=5, labelsize=10, labelrotation=45)
+    ax.tick_params(axis='y', colors=CHART_STYLE['tick'], length=5, labelsize=10)
+
+    for side in ('top', 'right'):
+        ax.spines[side].set_color(CHART_STYLE['edge'])
+    for side in ('left', 'bottom'):
+        ax.spines[side].set_visible(True)
+        ax.spines[side].set_color('gray')
+
+
+class ChartTemplate:
+    """
+    Price chart figure that is built once and reused for many tickers
+
+    Axes, locators, formatters, spines, legend and layout are set up in the
+    constructor; render() only swaps line data, the title and the axis limits
+    before saving. A template is not thread-safe, so each thread or worker
+    process keeps its own (see render_stock_chart).
+    """
+    def __init__(self, figsize=CHART_SIZE, dpi=CHART_DPI):
+        """
+        Build the figure
+
+        Args:
+            figsize (tuple, optional): Figure size in inches
+            dpi (int, optional): Output resolution
+        """
+        self.dpi = dpi
+        self.figure = _new_figure(figsize, dpi)
+        self.ax = self.figure.add_subplot()
+        style_price_axes(self.ax)
+
+        empty_dates = np.array([], dtype='datetime64[D]')
+        self.lines = {}
+        for key, label, options in CHART_SERIES:
+            self.lines[key], = self.ax.plot(empty_dates, [], label=label, **options)
+
+        self.title = self.ax.set_title("", fontsize=16, pad=10, color=CHART_STYLE['text'])
+        self.ax.set_ylabel("Price (USD)", fontsize=12, color=CHART_STYLE['text'])
+        self._legend_keys = None
+
+        # Lay out once with the widest tick labels expected (five-digit prices over a
+        # year of dates) so later charts never need tight_layout again
+        self.ax.set_xlim(np.datetime64('2000-01-01'), np.datetime64('2000-12-31'))
+        self.ax.set_ylim(0, 99999)
+        self.title.set_text("TICKER Price Chart (1Y)")
+        self._update_legend([key for key, _, _ in CHART_SERIES])
+        self.figure.tight_layout(pad=2.0)
+        # Freeze the computed margins; a live layout engine would redraw on every save
+        self.figure.set_layout_engine('none')
+
+    def _update_legend(self, keys):
+        """Rebuild the legend only when the set of visible series changes"""
+        if keys == self._legend_keys:
+            return
+        handles = [self.lines[key] for key in keys]
+        self.ax.legend(handles=handles, frameon=True, framealpha=0.8, fontsize=10,
+                       facecolor=CHART_STYLE['background'], edgecolor=CHART_STYLE['edge'],
+                       labelcolor=CHART_STYLE['text'])
+        self._legend_keys = keys
+
+    def render(self, ticker, data, period_label="1Y"):
+        """
+        Render a chart for one ticker by updating the template's artists
+
+        Args:
+            ticker (str): Ticker symbol
+            data (dict): Chart data from stock_data.get_stock_data
+            period_label (str, optional): Period shown in the title
+
+        Returns:
+            bytes: PNG image bytes
+        """
+        # Long periods are reduced to about one point per pixel column
+        data = downsample_chart_data(data, CHART_IMAGE_MAX_POINTS)
+        dates = np.asarray(data.get('dates', []), dtype='datetime64[D]')
+
+        # NaN gaps keep leading moving-average values off the chart
+        visible = []
+        low, high = np.inf, -np.inf
+        for key, _, _ in CHART_SERIES:
+            values = _series(data, key)
+            shown = len(values) == len(dates) and (key == 'prices' or not np.isnan(values).all())
+            line = self.lines[key]
+            line.set_visible(shown)
+            if not shown:
+                continue
+            line.set_data(dates, values)
+            visible.append(key)
+            if not np.isnan(values).all():
+                low, high = min(low, np.nanmin(values)), max(high, np.nanmax(values))
+
+        self._update_legend(visible)
+        self.title.set_text(f"{ticker} Price Chart ({period_label})")
+
+        # Same 5% margins matplotlib's autoscaling would add
+        if len(dates):
+            self.ax.xaxis.set_major_locator(month_locator(dates))
+            span = (dates[-1] - dates[0]).astype(float) * 0.05
+            self.ax.set_xlim(dates[0] - np.timedelta64(int(span), 'D'), dates[-1] + np.timedelta64(int(span), 'D'))
+        if np.isfinite(low):
+            margin = (high - low) * 0.05 or abs(high) * 0.05 or 1
+            self.ax.set_ylim(low - margin, high + margin)
+
+        return _to_png(self.figure, self.dpi)
+
+
+_local = threading.local()
+
+
+def render_stock_chart(ticker, data, period_label="1Y"):
+    """
+    Render a price chart with MA50, MA200 and MA200+10% lines
+
+    Reuses a ChartTemplate per thread (and so per pool worker), so only the
+    first chart in each thread pays for building the figure.
+
+    Args:
+        ticker (str): Ticker symbol
+        data (dict): Chart data from stock_data.get_stock_data
+        period_label (str, optional): Period shown in the title
+
+    Returns:
+        bytes: PNG image bytes
+        None: If rendering fails
+    """
+    try:
+        template = getattr(_local, 'template', None)
+        if template is None:
+            template = _local.template = ChartTemplate()
+        return template.render(ticker, data, period_label)
+    except Exception as e:
+        logger.error(f"Chart rendering failed for {ticker}: {e}")
+        # Start over with a fresh figure in case the failure left it half updated
+        _local.template = None
+        return None
+
+
+def grid_shape(count):
+    """
+    Columns and rows for a small-multiples grid of count charts
+
+    Returns:
+        tuple: (columns, rows)
+    """
+    columns = 1 if count <= 1 else 2 if count <= 4 else 3 if count <= 9 else 4
+    return columns, -(-count // columns)
+
+
+def render_chart_grid(items, period_label="1Y", cell_size=GRID_CELL_SIZE):
+    """
+    Render price, MA50, MA200 and MA200+10% for many tickers in one figure
+
+    The grid grows with the number of tickers (up to four columns), every cell
+    shares the chart theme, and a single legend on top explains the series.
+
+    Args:
+        items (list): (ticker, chart data) pairs
+        period_label (str, optional): Period shown in the figure title
+        cell_size (tuple, optional): Size of one cell in inches
+
+    Returns:
+        bytes: PNG image bytes
+        None: If there is nothing to draw or rendering fails
+    """
+    items = [(ticker, data) for ticker, data in items if data and data.get('dates')]
+    if not items:
+        return None
+
+    try:
+        columns, rows = grid_shape(len(items))
+        width, height = cell_size[0] * columns, cell_size[1] * rows + 0.3
+        figure = _new_figure((width, height))
+        axes = figure.subplots(rows, columns, squeeze=False).ravel()
+
+        # Each cell is about half a full chart wide, so half the points are enough
+        max_points = CHART_IMAGE_MAX_POINTS // 2
+        for ax, (ticker, data) in zip(axes, items):
+            data = downsample_chart_data(data, max_points)
+            dates = np.asarray(data['dates'], dtype='datetime64[D]')
+
+            style_price_axes(ax)
+            ax.xaxis.set_major_locator(month_locator(dates, max_ticks=6))
+            ax.tick_params(labelsize=8)
+            for key, label, options in CHART_SERIES:
+                values = _series(data, key)
+                if len(values) == len(dates) and (key == 'prices' or not np.isnan(values).all()):
+                    ax.plot(dates, values, label=label, **dict(options, linewidth=options['linewidth'] * 0.75))
+
+            title = ticker
+            if data.get('current_price') is not None:
+                title += f"  ${data['current_price']:.2f}"
+            if data.get('current_ma200') is not None:
+                title += "  ▲ MA200" if data.get('is_above_ma200') else "  ▼ MA200"
+            ax.set_title(title, fontsize=11, color=CHART_STYLE['text'])
+
+        for ax in axes[len(items):]:
+            ax.set_visible(False)
+
+        handles = [Line2D([], [], label=label, **options) for _, label, options in CHART_SERIES]
+        figure.legend(handles=handles, loc='upper right', ncol=len(handles), fontsize=9, frameon=False,
+                      labelcolor=CHART_STYLE['text'])
+        figure.suptitle(f"Price Charts ({period_label})", x=0.01, ha='left', fontsize=14,
+                        color=CHART_STYLE['text'])
+        figure.tight_layout()  # leaves room for the suptitle, which shares its row with the legend
+        return _to_png(figure)
+    except Exception as e:
+        logger.error(f"Chart grid rendering failed: {e}")
+        return None
+
+
+def render_heatmap(labels, values, title, vmin=-1.0, vmax=1.0, value_format="{:.2f}"):
+    """
+    Render a labelled matrix as a heatmap with the value in every cell
+
+    Args:
+        labels (list): Row and column labels
+        values (list): Square matrix (nested lists, None for missing values)
+        title (str): Figure title
+        vmin (float, optional): Value at the low end of the color scale
+        vmax (float, optional): Value at the high end of the color scale
+        value_format (str, optional): Format of the cell annotations
+
+    Returns:
+        bytes: PNG image bytes
+        None: If rendering fails
+    """
+    try:
+        matrix = np.array(values, dtype=float)
+        size = max(4.0, 0.9 * len(labels) + 2)
+        figure = _new_figure((size + 1.2, size))
+        ax = figure.subplots()
+        image = ax.imshow(np.ma.masked_invalid(matrix), cmap='RdYlGn', vmin=vmin, vmax=vmax)
+
+        ax.set_xticks(range(len(labels)), labels, rotation=45, ha='right')
+        ax.set_yticks(range(len(labels)), labels)
+        ax.tick_params(colors=CHART_STYLE['text'], labelsize=10, length=0)
+        for spine in ax.spines.values():
+            spine.set_visible(False)
+        for (row, column), value in np.ndenumerate(matrix):
+            if not np.isnan(value):
+                ax.text(column, row, value_format.format(value), ha='center', va='center', fontsize=9, color='black')
+
+        colorbar = figure.colorbar(image, ax=ax, fraction=0.046, pad=0.04)
+        colorbar.ax.tick_params(colors=CHART_STYLE['text'], labelsize=8)
+        ax.set_title(title, fontsize=13, color=CHART_STYLE['text'])
+        figure.tight_layout()
+        return _to_png(figure)
+    except Exception as e:
+        logger.error(f"Heatmap rendering failed: {e}")
+        return None
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_render_pool():
+    """
+    Shared process pool for chart rendering, created on first use
+
+    Workers are spawned rather than forked so that a multithreaded parent
+    (Flask, aiohttp) never hands locked state to a child process.
+
+    Returns:
+        ProcessPoolExecutor: Render pool
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=CHART_RENDER_WORKERS,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+            atexit.register(_pool.shutdown, wait=False, cancel_futures=True)
+        return _pool
+
+
+def render_in_pool(render, *args, timeout=60):
+    """
+    Run one render function in the shared process pool
+
+    Blocks the calling thread only, so concurrent web requests render in parallel.
+
+    Args:
+        render (callable): Module-level render function (must be picklable)
+        *args: Arguments for the render function
+        timeout (int, optional): Seconds to wait
+
+    Returns:
+        bytes: PNG image bytes
+        None: If rendering fails
+    """
+    try:
+        return get_render_pool().submit(render, *args).result(timeout)
+    except Exception as e:
+        logger.error(f"Pooled rendering failed ({render.__name__}): {e}")
+        return None
+
+
+def render_stock_chart_in_pool(ticker, data, period_label="1Y", timeout=60):
+    """
+    Render one chart in the shared process pool
+
+    Returns:
+        bytes: PNG image bytes
+        None: If rendering fails
+    """
+    return render_in_pool(render_stock_chart, ticker, data, period_label, timeout=timeout)
+
+
+def render_charts(items, period_label="1Y", timeout=120):
+    """
+    Render charts for many tickers in parallel
+
+    Args:
+        items (list): (ticker, chart data) pairs
+        period_label (str, optional): Period shown in each title
+        timeout (int, optional): Seconds to wait for the whole batch
+
+    Returns:
+        list: PNG bytes (or None on failure) for each item, in input order
+    """
+    if len(items) < 2:
+        return [render_stock_chart(ticker, data, period_label) for ticker, data in items]
+
+    try:
+        pool = get_render_pool()
+        futures = [pool.submit(render_stock_chart, ticker, data, period_label) for ticker, data in items]
+        deadline = time.monotonic() + timeout
+        return [future.result(max(0, deadline - time.monotonic())) for future in futures]
+    except Exception as e:
+        logger.error(f"Batch chart rendering failed, falling back to serial rendering: {e}")
+        return [render_stock_chart(ticker, data, period_label) for ticker, data in items]
@@ -11,6 +11,108 @@ TEST_TICKERS = ["BLK"]
 # Telegram 전송 설정
 SEND_TO_TELEGRAM = True  # 텔레그램으로 결과 전송 여부
 
+# 텔레그램 전송 모드: "full" (티커별 브리핑, 링크, 차트 분석, 차트) 또는
+# "digest" (전체 티커 요약 메시지 + 차트 격자 이미지 1장)
+DELIVERY_MODE = "full"
+# 채팅별 전송 모드 ({"채팅 ID": "digest"}). 여기에만 있는 채팅도 전송 대상에 추가됨
+CHAT_DELIVERY_MODES = {}
+
+# 텔레그램 전송 아웃박스 (재시작 시 미전송 메시지 이어서 전송)
+OUTBOX_DB_PATH = "outbox.db"
+OUTBOX_MAX_ATTEMPTS = 5  # 항목당 최대 전송 시도 횟수
+OUTBOX_LEASE_SECONDS = 300  # 전송 중 상태로 멈춘 항목을 다시 가져오기까지의 시간
+OUTBOX_SEND_INTERVAL = 0.5  # 메시지 간 전송 간격 (초)
+OUTBOX_RESUME_HOURS = 12  # 이 시간 안에 시작된 미완료 실행만 재개
+
+# 차트 렌더링 프로세스 풀 크기 (None이면 CPU 코어 수)
+CHART_RENDER_WORKERS = None
+
+# 차트 이미지 캐시 (메모리 LRU + 디스크 PNG)
+CHART_CACHE_DIR = "chart_cache"
+CHART_CACHE_MEMORY_ITEMS = 128  # 메모리에 보관할 최대 이미지 수
+CHART_CACHE_MAX_BYTES = 200 * 1024 * 1024  # 디스크 캐시 최대 크기
+CHART_CACHE_MAX_AGE = 24 * 60 * 60  # 캐시 항목 최대 보관 시간 (초)
+CHART_DATA_TTL = 300  # 웹 차트용 주가 데이터 재사용 시간 (초)
+CHART_DATA_CACHE_ITEMS = 256  # 메모리에 보관할 최대 (티커, 기간) 항목 수
+CHART_MAX_TICKERS = 20  # 요청 하나에 지정할 수 있는 최대 티커 수 (/api/charts, /chart-grid)
+
+# 시세/메타데이터 공급원: "yfinance" (실시간), "fixture" (FIXTURE_DIR의 기록 데이터 재생),
+# "synthetic" (합성 데이터, 네트워크 없이 성능 테스트용). 환경 변수 DATA_PROVIDER로 덮어쓸 수 있음
+DATA_PROVIDER = "yfinance"
+FIXTURE_DIR = "fixtures"
+SYNTHETIC_TICKERS = 5000  # 합성 데이터 심볼 수 (SYN0000 ~)
+SYNTHETIC_YEARS = 10  # 합성 데이터 기간 (년)
+
+# 로컬 일봉 저장소 (SQLite) - 없는 기간만 내려받고 나머지는 디스크에서 읽음
+PRICE_STORE_PATH = "prices.db"
+PRICE_STORE_REFRESH_SECONDS = 15 * 60  # 티커별 최신 일봉을 다시 받아오는 최소 간격 (초)
+
+# 차트 기간(1mo~2y)은 티커별로 이 기간의 일봉 한 벌을 잘라서 사용 (이동평균은 전체 구간에서 계산)
+CHART_HISTORY_PERIOD = "5y"
+
+# float32 가격 행렬 저장 디렉터리 (설정하면 시작 시 메모리 매핑으로 불러오고 변경 시 저장, None이면 메모리에만 유지)
+PRICE_MATRIX_DIR = None
+
+# 티커 메타데이터 캐시 (get_stock_info) - 필드 그룹별 유효 시간 (초)
+METADATA_CACHE_PATH = "metadata.db"
+METADATA_TTLS = {
+    "static": 7 * 24 * 60 * 60,  # 이름, 섹터, 산업, 설명 (Ticker.info)
+    "fundamental": 24 * 60 * 60,  # PER, 배당수익률, 베타 (Ticker.info)
+    "market": 60 * 60,  # 시가총액 (가벼운 Ticker.fast_info로만 갱신)
+}
+METADATA_PREFETCH_WORKERS = 4  # 백그라운드 갱신 / 일괄 미리 가져오기 스레드 수
+
+# 기술적 지표 계산 결과 메모이제이션 (티커 + 마지막 일봉 기준) 최대 항목 수
+INDICATOR_CACHE_ITEMS = 256
+
+# 티커별 이동평균 증분 상태 체크포인트 파일
+INDICATOR_STATE_PATH = "indicator_state.json"
+
+# MA200 돌파 알림: 주기적으로 전체 티커 시세를 한 번에 조회해 상태가 바뀔 때만 알림
+ALERT_ENABLED = False  # 켜면 5분마다 시세를 조회하고 텔레그램 알림을 보냄
+ALERT_INTERVAL_MINUTES = 5  # 시세 조회 간격 (분)
+ALERT_COOLDOWN_MINUTES = 60  # 티커별 알림 최소 간격 (분)
+ALERT_THRESHOLDS = {}  # 티커별 지정 가격 알림 ({"SOXL": [25.0, 30.0]})
+ALERT_STATE_PATH = "alert_state.json"
+
+# 시장 전체 MA200 스크리너: 대량 심볼을 배치로 동시에 내려받아 MA200 / MA200+10% 조건을 한 번에 계산
+SCREENER_ENABLED = False  # 매일 스케줄 실행 시 텔레그램으로 요약 전송
+SCREENER_SYMBOLS_FILE = "screener_symbols.txt"  # 한 줄에 심볼 하나 (없으면 오프라인 공급원의 전체 심볼, 그 다음 추적 티커)
+SCREENER_BATCH_SIZE = 200  # 요청 하나에 담을 심볼 수
+SCREENER_WORKERS = 4  # 동시 다운로드 배치 수
+SCREENER_LOOKBACK_DAYS = 400  # 내려받을 기간 (달력일, MA200 + 전일 비교에 충분하게)
+SCREENER_RESULT_TTL = 60 * 60  # 웹 페이지에서 결과를 재사용할 시간 (초)
+SCREENER_TOP_N = 10  # 텔레그램 요약에 포함할 순위 수
+
+# 추적 티커 간 상관관계 / 베타 / 상대강도 분석
+ANALYTICS_BENCHMARK = "SPY"  # 추적 티커와 함께 분석할 기준 ETF (None이면 제외)
+ANALYTICS_PAIRS = [("SOXL", "BRKU"), ("BLK", "IVZ"), ("IGV", "SPY")]  # 시계열로 제공할 비교 쌍
+ANALYTICS_WINDOW = 60  # 롤링 상관관계 / 베타 기간 (거래일)
+ANALYTICS_RS_DAYS = 63  # 상대강도 기간 (거래일, 약 3개월)
+ANALYTICS_HISTORY_PERIOD = "2y"  # 롤링 시계열에 사용할 기간
+
+# 차트 데이터 다운샘플링 (LTTB) 최대 포인트 수
+CHART_API_MAX_POINTS = 500  # /api/chart 기본값 (요청의 max_points로 변경 가능, 0이면 전체)
+CHART_IMAGE_MAX_POINTS = 800  # 차트 이미지 (플롯 영역 가로 픽셀 수 수준)
+
+# 이미지 출력 단계: 목적지별 인코딩 전략 (앞에서부터 시도해 용량 예산 안에 들어오는 첫 결과 사용)
+# 전략: "png" (zlib 압축), "png-palette" (256색 팔레트 양자화), "webp", "jpeg" (품질을 낮춰가며 시도)
+IMAGE_OUTPUT_PROFILES = {
+    "telegram": {"strategies": ["png-palette", "jpeg"], "max_bytes": 200 * 1024, "compress_level": 6},
+    "web": {"strategies": ["png-palette", "webp"], "max_bytes": 100 * 1024, "compress_level": 6},
+}
+
+# 브리핑 텍스트 이미지용 한글(CJK) 폰트 후보 - 앞에서부터 처음 읽히는 파일 사용
+TEXT_IMAGE_FONTS = [
+    "malgun.ttf",
+    "C:/Windows/Fonts/malgun.ttf",
+    "/usr/share/fonts/truetype/nanum/NanumGothic.ttf",
+    "/usr/share/fonts/opentype/noto/NotoSansCJK-Regular.ttc",
+    "/usr/share/fonts/noto-cjk/NotoSansCJK-Regular.ttc",
+    "/usr/share/fonts/truetype/noto/NotoSansKR-Regular.ttf",
+    "/System/Library/Fonts/AppleSDGothicNeo.ttc",
+]
+
 # Schedule settings (24-hour format)
 SCHEDULE_HOUR = 9
 SCHEDULE_MINUTE = 0
@@ -0,0 +1,371 @@
+"""
+Pluggable market data providers
+
+Everything that needs prices or ticker metadata (the price store, the metadata
+cache, the alert service) gets them from a DataProvider instead of calling
+yfinance directly. Three backends are available:
+
+    yfinance   live data (the default)
+    fixture    replays recorded OHLCV CSV files and metadata from a directory
+    synthetic  deterministic random-walk OHLCV for any symbol, generated on
+               demand, for offline runs and benchmarks at scale
+               (e.g. 5,000 tickers x 10 years)
+
+The backend is chosen with config.DATA_PROVIDER or the DATA_PROVIDER
+environment variable, so the web app and the pipeline can run fully offline:
+
+    DATA_PROVIDER=synthetic python app.py
+"""
+import json
+import logging
+import os
+import threading
+import zlib
+from abc import ABC, abstractmethod
+from datetime import date, timedelta
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from config import DATA_PROVIDER, FIXTURE_DIR, SYNTHETIC_TICKERS, SYNTHETIC_YEARS
+
+logger = logging.getLogger(__name__)
+
+# Columns in the layout of yfinance history frames
+OHLCV_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+# Metadata fields in the layout of get_stock_info
+INFO_FIELDS = ['name', 'sector', 'industry', 'description', 'market_cap', 'pe_ratio', 'dividend_yield', 'beta']
+
+# Fields that change with the price and can be fetched without the full info
+MARKET_FIELDS = ['market_cap']
+
+
+def normalize_history(history):
+    """Keep the OHLCV columns and make the index tz-naive dates"""
+    if history is None or history.empty:
+        return pd.DataFrame(columns=OHLCV_COLUMNS, index=pd.DatetimeIndex([]), dtype=float)
+    frame = history.reindex(columns=OHLCV_COLUMNS)
+    index = pd.DatetimeIndex(frame.index)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    frame.index = index.normalize()
+    return frame[~frame['Close'].isna()]
+
+
+def _exclusive_end(end):
+    return end or date.today() + timedelta(days=1)
+
+
+class DataProvider(ABC):
+    """
+    Source of daily bars and ticker metadata
+
+    Subclasses implement history() and info(); history_many() defaults to one
+    history() call per ticker and market_info() to a subset of info().
+    """
+    name = None
+
+    @abstractmethod
+    def history(self, ticker, start=None, end=None):
+        """
+        Daily bars of one ticker
+
+        Args:
+            ticker (str): Ticker symbol
+            start (date, optional): First date (None means the full history)
+            end (date, optional): Exclusive end date (None means up to today)
+
+        Returns:
+            pandas.DataFrame: OHLCV frame indexed by tz-naive dates
+        """
+        raise NotImplementedError
+
+    def history_many(self, tickers, start=None, end=None):
+        """
+        Daily bars of many tickers
+
+        Returns:
+            dict: Ticker -> OHLCV frame (tickers without data are left out)
+        """
+        frames = {ticker: self.history(ticker, start, end) for ticker in tickers}
+        return {ticker: frame for ticker, frame in frames.items() if not frame.empty}
+
+    @abstractmethod
+    def info(self, ticker):
+        """
+        Metadata of a ticker
+
+        Returns:
+            dict: Field -> value in the layout of get_stock_info
+        """
+        raise NotImplementedError
+
+    def market_info(self, ticker):
+        """
+        MARKET_FIELDS of a ticker, for backends with a cheaper call than info()
+
+        Returns:
+            dict: Field -> value
+        """
+        info = self.info(ticker)
+        return {field: info.get(field, 'N/A') for field in MARKET_FIELDS}
+
+
+class YFinanceProvider(DataProvider):
+    """
+    Live data from Yahoo Finance through yfinance
+    """
+    name = 'yfinance'
+
+    # Field -> yfinance info key
+    INFO_KEYS = {
+        'name': 'shortName',
+        'sector': 'sector',
+        'industry': 'industry',
+        'description': 'longBusinessSummary',
+        'market_cap': 'marketCap',
+        'pe_ratio': 'trailingPE',
+        'dividend_yield': 'dividendYield',
+        'beta': 'beta',
+    }
+
+    def history(self, ticker, start=None, end=None):
+        import yfinance as yf
+
+        stock = yf.Ticker(ticker)
+        if start is None:
+            history = stock.history(period='max')
+        else:
+            history = stock.history(start=start.isoformat(), end=_exclusive_end(end).isoformat())
+        return normalize_history(history)
+
+    def history_many(self, tickers, start=None, end=None):
+        """Daily bars of many tickers with one multi-symbol yf.download request"""
+        import yfinance as yf
+
+        if start is None:
+            window = {'period': 'max'}
+        else:
+            window = {'start': start.isoformat(), 'end': _exclusive_end(end).isoformat()}
+        data = yf.download(tickers, group_by='ticker', auto_adjust=True, threads=True, progress=False, **window)
+        if data is None or data.empty:
+            return {}
+
+        if not isinstance(data.columns, pd.MultiIndex):
+            return {tickers[0]: normalize_history(data)}
+        available = set(data.columns.get_level_values(0))
+        return {ticker: normalize_history(data[ticker]) for ticker in tickers if ticker in available}
+
+    def info(self, ticker):
+        import yfinance as yf
+
+        info = yf.Ticker(ticker).info
+        defaults = {'name': ticker}
+        return {field: info.get(key, defaults.get(field, 'N/A')) for field, key in self.INFO_KEYS.items()}
+
+    def market_info(self, ticker):
+        """Market cap from Ticker.fast_info, which skips the slow quoteSummary request of .info"""
+        import yfinance as yf
+
+        market_cap = yf.Ticker(ticker).fast_info.get('marketCap')
+        return {'market_cap': int(market_cap) if market_cap is not None else 'N/A'}
+
+
+def _window(frame, start, end):
+    """Rows of a history between start (inclusive) and end (exclusive)"""
+    if start is not None:
+        frame = frame[frame.index >= pd.Timestamp(start)]
+    if end is not None:
+        frame = frame[frame.index < pd.Timestamp(end)]
+    return frame
+
+
+class FixtureProvider(DataProvider):
+    """
+    Replays recorded data from a directory
+
+    Layout: one {TICKER}.csv per ticker with Date, Open, High, Low, Close and
+    Volume columns, plus an optional info.json mapping tickers to metadata.
+    record_fixtures() writes this layout from another provider.
+    """
+    name = 'fixture'
+
+    def __init__(self, directory=FIXTURE_DIR):
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._frames = {}
+        self._info = None
+
+    def _load(self, ticker):
+        with self._lock:
+            if ticker not in self._frames:
+                path = os.path.join(self.directory, f"{ticker}.csv")
+                if os.path.exists(path):
+                    frame = pd.read_csv(path, index_col='Date', parse_dates=['Date'])
+                    self._frames[ticker] = normalize_history(frame)
+                else:
+                    logger.warning(f"No fixture for {ticker} in {self.directory}")
+                    self._frames[ticker] = normalize_history(None)
+            return self._frames[ticker]
+
+    def history(self, ticker, start=None, end=None):
+        return _window(self._load(ticker.upper()), start, end)
+
+    def info(self, ticker):
+        with self._lock:
+            if self._info is None:
+                path = os.path.join(self.directory, "info.json")
+                self._info = {}
+                if os.path.exists(path):
+                    with open(path, 'r', encoding='utf-8') as f:
+                        self._info = json.load(f)
+        info = self._info.get(ticker.upper(), {})
+        return {field: info.get(field, ticker.upper() if field == 'name' else 'N/A') for field in INFO_FIELDS}
+
+    def symbols(self):
+        """Tickers with a recorded history"""
+        return sorted(name[:-4] for name in os.listdir(self.directory) if name.endswith('.csv'))
+
+
+class SyntheticProvider(DataProvider):
+    """
+    Deterministic random-walk OHLCV for any symbol
+
+    Each symbol gets its own seed, drift and volatility, so repeated runs see
+    the same prices. Bars cover the last `years` years of business days up to
+    today.
+    """
+    name = 'synthetic'
+
+    def __init__(self, tickers=SYNTHETIC_TICKERS, years=SYNTHETIC_YEARS):
+        """
+        Args:
+            tickers (int, optional): Size of the universe returned by symbols()
+            years (int, optional): Years of history per symbol
+        """
+        self.tickers = tickers
+        self.years = years
+
+    def symbols(self):
+        """Synthetic universe: SYN0000, SYN0001, ..."""
+        width = max(4, len(str(self.tickers - 1)))
+        return [f"SYN{i:0{width}d}" for i in range(self.tickers)]
+
+    @lru_cache(maxsize=1)
+    def _dates(self, today):
+        return pd.bdate_range(end=today, periods=self.years * 252)
+
+    def _generate(self, ticker):
+        dates = self._dates(date.today())
+        rng = np.random.default_rng(zlib.crc32(ticker.encode('utf-8')))
+        days = len(dates)
+        drift = rng.uniform(-0.0002, 0.0008)
+        volatility = rng.uniform(0.008, 0.04)
+        close = rng.uniform(5, 500) * np.exp(np.cumsum(rng.normal(drift, volatility, days)))
+        spread = np.abs(rng.normal(0, volatility / 2, days)) * close
+        open_ = np.concatenate([[close[0]], close[:-1]]) * (1 + rng.normal(0, volatility / 4, days))
+        return pd.DataFrame({
+            'Open': open_,
+            'High': np.maximum(open_, close) + spread,
+            'Low': np.minimum(open_, close) - spread,
+            'Close': close,
+            'Volume': rng.integers(100_000, 10_000_000, days).astype(float),
+        }, index=dates)
+
+    def history(self, ticker, start=None, end=None):
+        return _window(self._generate(ticker.upper()), start, end)
+
+    def info(self, ticker):
+        rng = np.random.default_rng(zlib.crc32(ticker.upper().encode('utf-8')))
+        return {
+            'name': f"{ticker.upper()} Synthetic",
+            'sector': 'Synthetic',
+            'industry': 'Random Walk',
+            'description': 'Synthetic data for offline runs',
+            'market_cap': int(rng.integers(10 ** 8, 10 ** 12)),
+            'pe_ratio': round(float(rng.uniform(5, 60)), 2),
+            'dividend_yield': round(float(rng.uniform(0, 0.05)), 4),
+            'beta': round(float(rng.uniform(0.5, 3)), 2),
+        }
+
+
+PROVIDERS = {
+    'yfinance': YFinanceProvider,
+    'fixture': FixtureProvider,
+    'synthetic': SyntheticProvider,
+}
+
+_provider = None
+_provider_lock = threading.Lock()
+
+
+def get_data_provider():
+    """
+    Data provider for this process, chosen by the DATA_PROVIDER environment
+    variable or config.DATA_PROVIDER
+
+    Returns:
+        DataProvider: Shared provider
+    """
+    global _provider
+    with _provider_lock:
+        if _provider is None:
+            name = os.environ.get("DATA_PROVIDER", DATA_PROVIDER)
+            if name not in PROVIDERS:
+                raise ValueError(f"Unknown data provider: {name} (choose from {', '.join(PROVIDERS)})")
+            _provider = PROVIDERS[name]()
+            if name != 'yfinance':
+                logger.info(f"Using offline data provider: {name}")
+        return _provider
+
+
+def set_data_provider(provider):
+    """Replace the process-wide provider (for tests and benchmarks)"""
+    global _provider
+    with _provider_lock:
+        _provider = provider
+
+
+def provider_path(path, provider=None):
+    """
+    Per-provider variant of a local database path
+
+    Offline providers get their own files, so replayed or synthetic data never
+    mixes with the live cache: prices.db -> prices-synthetic.db.
+    """
+    provider = provider or get_data_provider()
+    if provider.name == YFinanceProvider.name:
+        return path
+    root, ext = os.path.splitext(path)
+    return f"{root}-{provider.name}{ext}"
+
+
+def record_fixtures(tickers, directory=FIXTURE_DIR, provider=None, start=None):
+    """
+    Record histories and metadata from a provider into the fixture layout
+
+    Args:
+        tickers (list): Ticker symbols
+        directory (str, optional): Target directory
+        provider (DataProvider, optional): Source, defaults to live yfinance
+        start (date, optional): First date (None records the full history)
+
+    Returns:
+        int: Number of tickers recorded
+    """
+    provider = provider or YFinanceProvider()
+    os.makedirs(directory, exist_ok=True)
+    frames = provider.history_many(tickers, start)
+    info = {}
+    for ticker, frame in frames.items():
+        frame.to_csv(os.path.join(directory, f"{ticker.upper()}.csv"), index_label='Date')
+        try:
+            info[ticker.upper()] = provider.info(ticker)
+        except Exception as e:
+            logger.warning(f"Could not record info for {ticker}: {e}")
+    with open(os.path.join(directory, "info.json"), 'w', encoding='utf-8') as f:
+        json.dump(info, f, ensure_ascii=False, indent=2)
+    logger.info(f"Recorded {len(frames)} tickers to {directory}")
+    return len(frames)
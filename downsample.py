@@ -0,0 +1,99 @@
+"""
+Largest-Triangle-Three-Buckets (LTTB) downsampling for chart series
+
+LTTB keeps the points that carry the visual shape of a line (peaks, troughs,
+sharp turns) while reducing it to a fixed number of points, so long-period
+charts stay visually identical at a fraction of the payload and drawing cost.
+"""
+import numpy as np
+
+# Parallel per-point series in get_stock_data output
+CHART_SERIES_KEYS = ('dates', 'prices', 'ma50', 'ma200', 'ma200_plus10')
+
+
+def lttb_indices(y, max_points, x=None):
+    """
+    Pick the indices of the points LTTB keeps
+
+    The first and last points are always kept. Every bucket in between keeps
+    the point forming the largest triangle with the previously kept point and
+    the average of the next bucket. Buckets are processed in order because each
+    choice depends on the previous one, but the triangle areas inside a bucket
+    are computed with numpy in one step.
+
+    Args:
+        y (array-like): Values; NaN values are never chosen unless a bucket has nothing else
+        max_points (int): Number of points to keep (at least 3)
+        x (array-like, optional): Positions, defaults to 0..n-1
+
+    Returns:
+        numpy.ndarray: Sorted indices into y
+    """
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    if max_points is None or max_points >= n or max_points < 3:
+        return np.arange(n)
+    x = np.arange(n, dtype=float) if x is None else np.asarray(x, dtype=float)
+
+    # Bucket edges for the n-2 inner points
+    edges = np.linspace(1, n - 1, max_points - 1).astype(int)
+    valid = ~np.isnan(y)
+    y_filled = np.where(valid, y, 0.0)
+
+    # Average point of every bucket (used as the third triangle corner), NaN-aware
+    inner = slice(0, n - 1)
+    counts = np.add.reduceat(valid[inner].astype(int), edges[:-1])
+    sums_y = np.add.reduceat(y_filled[inner], edges[:-1])
+    sums_x = np.add.reduceat(np.where(valid, x, 0.0)[inner], edges[:-1])
+    with np.errstate(invalid='ignore', divide='ignore'):
+        avg_x = np.append(sums_x / counts, x[-1])
+        avg_y = np.append(sums_y / counts, y[-1])
+
+    selected = np.empty(max_points, dtype=int)
+    selected[0] = 0
+    selected[-1] = n - 1
+    prev_x, prev_y = x[0], y[0] if valid[0] else 0.0
+    for i in range(max_points - 2):
+        start, end = edges[i], edges[i + 1]
+        next_x, next_y = avg_x[i + 1], avg_y[i + 1]
+        if np.isnan(next_y):
+            next_x, next_y = x[end], y_filled[end]
+        areas = np.abs(
+            (prev_x - next_x) * (y[start:end] - prev_y) - (prev_x - x[start:end]) * (next_y - prev_y)
+        )
+        if valid[start:end].any():
+            chosen = start + int(np.nanargmax(areas))
+        else:
+            chosen = start
+        selected[i + 1] = chosen
+        prev_x, prev_y = x[chosen], y_filled[chosen]
+
+    return selected
+
+
+def downsample_chart_data(data, max_points):
+    """
+    Reduce the per-point series of get_stock_data output with LTTB
+
+    Points are chosen on the price series and the same indices are applied to
+    dates and the moving averages, so every series stays aligned. Scalar fields
+    (current values, flags) are copied unchanged.
+
+    Args:
+        data (dict): Chart data from stock_data.get_stock_data
+        max_points (int): Maximum number of points per series (None or 0 keeps everything)
+
+    Returns:
+        dict: Chart data with at most max_points points per series
+    """
+    prices = data.get('prices') or []
+    if not max_points or len(prices) <= max_points:
+        return data
+
+    indices = lttb_indices(np.array(prices, dtype=float), max_points)
+    reduced = dict(data)
+    for key in CHART_SERIES_KEYS:
+        series = data.get(key)
+        if series is not None and len(series) == len(prices):
+            reduced[key] = [series[i] for i in indices]
+    return reduced
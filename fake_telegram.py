@@ -0,0 +1,207 @@
+"""
+로컬 텔레그램 Bot API 대역 서버 - 부하/지연 테스트용
+
+sendMessage, sendPhoto, sendMediaGroup, getMe를 흉내 내며 응답 지연, 오류율,
+채팅별 전송 한도(429 + retry_after)를 설정할 수 있음.
+
+사용 예:
+    python fake_telegram.py --port 8081 --latency 0.05 --error-rate 0.01 --rate-limit 30
+    TELEGRAM_API_URL=http://127.0.0.1:8081 TELEGRAM_BOT_TOKEN=test TELEGRAM_CHAT_ID=1 python test_telegram.py
+"""
+import argparse
+import asyncio
+import json
+import logging
+import random
+import time
+from collections import defaultdict, deque
+
+from aiohttp import web
+
+logger = logging.getLogger(__name__)
+
+
+class FakeTelegramServer:
+    """
+    텔레그램 Bot API를 흉내 내는 aiohttp 서버
+    """
+    def __init__(self, host="127.0.0.1", port=8081, latency=0.0, jitter=0.0,
+                 error_rate=0.0, rate_limit=None, retry_after=1, seed=None):
+        """
+        서버 초기화
+
+        Args:
+            host (str): 바인딩할 주소
+            port (int): 바인딩할 포트 (0이면 임의 포트)
+            latency (float): 기본 응답 지연 (초)
+            jitter (float): 응답 지연에 더해지는 무작위 지연의 최대값 (초)
+            error_rate (float): 500 오류를 돌려줄 확률 (0~1)
+            rate_limit (int, optional): 채팅별 초당 허용 요청 수. 넘으면 429 응답
+            retry_after (int): 429 응답에 담을 retry_after 값 (초)
+            seed (int, optional): 난수 시드 (재현 가능한 테스트용)
+        """
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self.retry_after = retry_after
+        self.random = random.Random(seed)
+
+        self.stats = defaultdict(int)
+        self.messages = []
+        self._windows = defaultdict(deque)
+        self._message_id = 0
+        self._runner = None
+
+        self.app = web.Application(client_max_size=50 * 1024 * 1024)
+        self.app.router.add_route('*', '/bot{token}/{method}', self.handle)
+
+    @property
+    def url(self):
+        """클라이언트가 TELEGRAM_API_URL로 쓸 주소"""
+        return f"http://{self.host}:{self.port}"
+
+    async def start(self):
+        """서버 시작 (port=0이면 실제 포트로 갱신)"""
+        self._runner = web.AppRunner(self.app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+        logger.info(f"가짜 텔레그램 서버 시작: {self.url}")
+
+    async def stop(self):
+        """서버 종료"""
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def _rate_limited(self, chat_id):
+        """채팅별 1초 슬라이딩 윈도우로 요청 한도 확인"""
+        if not self.rate_limit:
+            return False
+        now = time.monotonic()
+        window = self._windows[chat_id]
+        while window and now - window[0] >= 1.0:
+            window.popleft()
+        if len(window) >= self.rate_limit:
+            return True
+        window.append(now)
+        return False
+
+    def _next_message(self, chat_id, **fields):
+        self._message_id += 1
+        message = {
+            "message_id": self._message_id,
+            "date": int(time.time()),
+            "chat": {"id": chat_id, "type": "private"},
+        }
+        message.update(fields)
+        self.messages.append(message)
+        return message
+
+    async def _read_params(self, request):
+        """JSON 또는 multipart 요청 본문을 dict로 읽기 (파일은 바이트 크기만 기록)"""
+        if request.content_type == 'application/json':
+            return await request.json()
+        params = {}
+        if request.content_type.startswith('multipart/'):
+            reader = await request.multipart()
+            async for part in reader:
+                if part.filename:
+                    params[part.name] = len(await part.read())
+                else:
+                    params[part.name] = await part.text()
+        else:
+            params.update(await request.post())
+        params.update(request.query)
+        return params
+
+    async def handle(self, request):
+        """모든 Bot API 요청 처리"""
+        method = request.match_info['method']
+        self.stats['requests'] += 1
+
+        params = await self._read_params(request)
+        chat_id = params.get('chat_id')
+
+        delay = self.latency + (self.random.uniform(0, self.jitter) if self.jitter else 0)
+        if delay:
+            await asyncio.sleep(delay)
+
+        if method != 'getMe' and self._rate_limited(chat_id):
+            self.stats['rate_limited'] += 1
+            return web.json_response({
+                "ok": False,
+                "error_code": 429,
+                "description": f"Too Many Requests: retry after {self.retry_after}",
+                "parameters": {"retry_after": self.retry_after},
+            }, status=429)
+
+        if self.error_rate and self.random.random() < self.error_rate:
+            self.stats['errors'] += 1
+            return web.json_response({
+                "ok": False, "error_code": 500, "description": "Internal Server Error"
+            }, status=500)
+
+        if method == 'getMe':
+            result = {"id": 1, "is_bot": True, "first_name": "FakeBot", "username": "fake_bot"}
+        elif method == 'sendMessage':
+            if not params.get('text'):
+                return self._bad_request("Bad Request: message text is empty")
+            result = self._next_message(chat_id, text=params['text'])
+        elif method == 'sendPhoto':
+            if not params.get('photo'):
+                return self._bad_request("Bad Request: there is no photo in the request")
+            result = self._next_message(chat_id, photo_size=params['photo'], caption=params.get('caption'))
+        elif method == 'sendMediaGroup':
+            media = params.get('media')
+            if isinstance(media, str):
+                media = json.loads(media)
+            if not media or not 2 <= len(media) <= 10:
+                return self._bad_request("Bad Request: wrong number of media items")
+            result = [self._next_message(chat_id, media_type=m.get('type')) for m in media]
+        else:
+            return web.json_response({
+                "ok": False, "error_code": 404, "description": "Not Found: method not found"
+            }, status=404)
+
+        self.stats[method] += 1
+        return web.json_response({"ok": True, "result": result})
+
+    def _bad_request(self, description):
+        self.stats['bad_requests'] += 1
+        return web.json_response({"ok": False, "error_code": 400, "description": description}, status=400)
+
+
+async def serve_forever(server):
+    """서버를 시작하고 중단될 때까지 대기"""
+    await server.start()
+    try:
+        while True:
+            await asyncio.sleep(3600)
+    finally:
+        await server.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="로컬 텔레그램 Bot API 대역 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--latency", type=float, default=0.0, help="기본 응답 지연 (초)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="무작위 추가 지연 최대값 (초)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="500 오류 확률 (0~1)")
+    parser.add_argument("--rate-limit", type=int, default=None, help="채팅별 초당 허용 요청 수")
+    parser.add_argument("--retry-after", type=int, default=1, help="429 응답의 retry_after (초)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    try:
+        asyncio.run(serve_forever(FakeTelegramServer(
+            host=args.host, port=args.port, latency=args.latency, jitter=args.jitter,
+            error_rate=args.error_rate, rate_limit=args.rate_limit, retry_after=args.retry_after
+        )))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,133 @@
+"""
+Output stage for rendered images
+
+Renderers produce plain PNGs. Before an image is uploaded to Telegram or served
+over HTTP, it is re-encoded for its destination: palette quantization and a
+tuned zlib level for PNG, or lossy WebP/JPEG at decreasing quality, until it fits
+the destination's byte budget. Every encode is timed so the cost of each
+strategy can be weighed against the bytes it saves.
+"""
+import io
+import logging
+import time
+from collections import namedtuple
+
+from PIL import Image
+
+from config import IMAGE_OUTPUT_PROFILES
+
+logger = logging.getLogger(__name__)
+
+# Qualities tried in order for lossy formats until the image fits the budget
+LOSSY_QUALITIES = (90, 80, 70, 60, 50)
+
+MIMETYPES = {
+    'png': 'image/png',
+    'webp': 'image/webp',
+    'jpeg': 'image/jpeg',
+}
+
+# Encoded image with its measurements
+OutputImage = namedtuple('OutputImage', 'data format mimetype strategy encode_ms original_bytes')
+
+
+def image_format(data):
+    """
+    Detect the format of encoded image bytes from their signature
+
+    Returns:
+        str: 'png', 'webp' or 'jpeg'
+        None: If the format is not recognized
+    """
+    if data[:8] == b'\x89PNG\r\n\x1a\n':
+        return 'png'
+    if data[:4] == b'RIFF' and data[8:12] == b'WEBP':
+        return 'webp'
+    if data[:3] == b'\xff\xd8\xff':
+        return 'jpeg'
+    return None
+
+
+def _encode(image, strategy, quality=None, compress_level=6):
+    """Encode a PIL image with one strategy"""
+    buf = io.BytesIO()
+    if strategy == 'png':
+        image.save(buf, format='PNG', compress_level=compress_level)
+    elif strategy == 'png-palette':
+        palette = image.quantize(colors=256, method=Image.Quantize.FASTOCTREE, dither=Image.Dither.NONE)
+        palette.save(buf, format='PNG', compress_level=compress_level)
+    elif strategy == 'webp':
+        image.save(buf, format='WEBP', quality=quality, method=4)
+    elif strategy == 'jpeg':
+        image.save(buf, format='JPEG', quality=quality, optimize=True, progressive=True)
+    else:
+        raise ValueError(f"Unknown image output strategy: {strategy}")
+    return buf.getvalue()
+
+
+def encode_candidates(image, strategies, compress_level=6):
+    """
+    Yield every encoding a list of strategies produces, in order
+
+    Lossy strategies yield one encoding per quality in LOSSY_QUALITIES.
+
+    Args:
+        image (PIL.Image.Image): RGB image
+        strategies (list): Strategy names ('png', 'png-palette', 'webp', 'jpeg')
+        compress_level (int, optional): zlib level for PNG strategies
+
+    Yields:
+        tuple: (strategy label, format, encoded bytes, encode time in ms)
+    """
+    for strategy in strategies:
+        qualities = LOSSY_QUALITIES if strategy in ('webp', 'jpeg') else (None,)
+        for quality in qualities:
+            started = time.perf_counter()
+            data = _encode(image, strategy, quality, compress_level)
+            encode_ms = (time.perf_counter() - started) * 1000
+            label = f"{strategy}:{quality}" if quality else strategy
+            yield label, 'png' if strategy.startswith('png') else strategy, data, encode_ms
+
+
+def optimize_image(data, destination, allowed_formats=None):
+    """
+    Re-encode image bytes to fit a destination's byte budget
+
+    An input that already fits the budget in an allowed format is returned
+    as it is. Otherwise strategies from the destination profile are tried in
+    order and the first encoding within the budget is returned. If none fits,
+    the smallest one is. An optimized image is never larger than the input.
+
+    Args:
+        data (bytes): Encoded image (usually PNG from a renderer)
+        destination (str): Key of config.IMAGE_OUTPUT_PROFILES, e.g. 'telegram' or 'web'
+        allowed_formats (iterable, optional): Formats the receiver accepts; others are skipped
+
+    Returns:
+        OutputImage: Chosen encoding with timing and size information
+    """
+    profile = IMAGE_OUTPUT_PROFILES[destination]
+    budget = profile['max_bytes']
+    strategies = [
+        s for s in profile['strategies']
+        if allowed_formats is None or ('png' if s.startswith('png') else s) in allowed_formats
+    ]
+
+    original_format = image_format(data)
+    best = OutputImage(data, original_format, MIMETYPES.get(original_format), 'original', 0.0, len(data))
+    original_allowed = allowed_formats is None or original_format in allowed_formats
+    if not strategies or (len(data) <= budget and original_allowed):
+        return best
+
+    started = time.perf_counter()
+    image = Image.open(io.BytesIO(data)).convert('RGB')
+    for label, fmt, encoded, _ in encode_candidates(image, strategies, profile.get('compress_level', 6)):
+        if len(encoded) < len(best.data):
+            best = OutputImage(encoded, fmt, MIMETYPES[fmt], label, 0.0, len(data))
+        if len(best.data) <= budget:
+            break
+    total_ms = (time.perf_counter() - started) * 1000
+
+    logger.debug(f"Image for {destination}: {len(data)} -> {len(best.data)} bytes "
+                 f"({best.strategy}, {total_ms:.1f}ms)")
+    return best._replace(encode_ms=total_ms)
@@ -0,0 +1,312 @@
+"""
+Incremental moving average state per ticker
+
+Instead of recomputing rolling means over the whole history for every quote,
+each ticker keeps the last N closes of each moving average in a ring buffer
+together with their running sum. A new daily bar replaces the oldest close and
+adjusts the sum, an intraday quote for the current day replaces the newest one,
+so MA50, MA200, MA200+10% and the above/below flags are updated in O(1).
+
+The state of all tickers can be checkpointed to a JSON file and restored, so a
+restarted process continues without reading the history again.
+"""
+import json
+import logging
+import os
+import threading
+from datetime import date
+
+import numpy as np
+
+from config import INDICATOR_STATE_PATH
+
+logger = logging.getLogger(__name__)
+
+# Moving average windows kept per ticker
+MA_WINDOWS = (50, 200)
+
+# MA200 + 10% band
+MA200_BAND = 1.1
+
+# Bars of history loaded to seed a new state (covers the longest window)
+SEED_PERIOD = '1y'
+
+
+class RunningMean:
+    """
+    Mean of the last `window` values, updated in O(1) with a ring buffer
+    """
+    def __init__(self, window):
+        self.window = window
+        self.values = np.zeros(window)
+        self.count = 0
+        self.pos = 0  # Slot the next value is written to
+        self.total = 0.0
+        self._updates = 0
+
+    def push(self, value):
+        """Add a new value, dropping the oldest one once the window is full"""
+        if self.count == self.window:
+            self.total -= self.values[self.pos]
+        else:
+            self.count += 1
+        self.values[self.pos] = value
+        self.total += value
+        self.pos = (self.pos + 1) % self.window
+        self._resum()
+
+    def replace_last(self, value):
+        """Replace the most recent value (an intraday quote for the same bar)"""
+        if self.count == 0:
+            self.push(value)
+            return
+        last = (self.pos - 1) % self.window
+        self.total += value - self.values[last]
+        self.values[last] = value
+        self._resum()
+
+    def _resum(self):
+        # Recompute the sum once per window length so floating-point drift cannot accumulate
+        self._updates += 1
+        if self._updates >= self.window:
+            self._updates = 0
+            self.total = float(self.values[:self.count].sum()) if self.count < self.window else float(self.values.sum())
+
+    @property
+    def value(self):
+        """Current mean, or None until the window is full"""
+        return float(self.total / self.window) if self.count == self.window else None
+
+    def to_list(self):
+        """Stored values, oldest first"""
+        if self.count < self.window:
+            return self.values[:self.count].tolist()
+        return np.roll(self.values, -self.pos).tolist()
+
+    @classmethod
+    def from_list(cls, window, values):
+        """Rebuild from values oldest first (only the last `window` are kept)"""
+        mean = cls(window)
+        for value in values[-window:]:
+            mean.push(value)
+        return mean
+
+
+class IndicatorState:
+    """
+    Moving averages and MA200 flags of one ticker, updated bar by bar
+    """
+    def __init__(self, ticker):
+        self.ticker = ticker
+        self.means = {window: RunningMean(window) for window in MA_WINDOWS}
+        self.last_date = None
+        self.last_close = None
+
+    @classmethod
+    def from_closes(cls, ticker, dates, closes):
+        """
+        Build the state from a daily close history
+
+        Args:
+            ticker (str): Ticker symbol
+            dates (list): Bar dates (date objects or 'YYYY-MM-DD'), oldest first
+            closes (list): Closing prices, oldest first
+
+        Returns:
+            IndicatorState: State as of the last bar
+        """
+        state = cls(ticker)
+        keep = max(MA_WINDOWS)
+        for bar_date, close in zip(list(dates)[-keep:], list(closes)[-keep:]):
+            state.update(bar_date, close)
+        return state
+
+    def update(self, bar_date, close):
+        """
+        Apply a close or an intraday quote
+
+        A quote dated the same day as the last bar replaces that bar; a later
+        date appends a new bar. Older dates are ignored.
+
+        Args:
+            bar_date (date or str): Date of the bar the quote belongs to
+            close (float): Price
+
+        Returns:
+            bool: Whether the state changed
+        """
+        if isinstance(bar_date, str):
+            bar_date = date.fromisoformat(bar_date[:10])
+        if close is None or np.isnan(close):
+            return False
+        if self.last_date is not None and bar_date < self.last_date:
+            return False
+
+        if bar_date == self.last_date:
+            for mean in self.means.values():
+                mean.replace_last(close)
+        else:
+            for mean in self.means.values():
+                mean.push(close)
+        self.last_date = bar_date
+        self.last_close = float(close)
+        return True
+
+    @property
+    def ma50(self):
+        return self.means[50].value
+
+    @property
+    def ma200(self):
+        return self.means[200].value
+
+    @property
+    def ma200_plus10(self):
+        return self.ma200 * MA200_BAND if self.ma200 is not None else None
+
+    @property
+    def is_above_ma200(self):
+        return self.last_close is not None and self.ma200 is not None and self.last_close > self.ma200
+
+    @property
+    def is_above_ma200_plus10(self):
+        return self.last_close is not None and self.ma200 is not None and self.last_close > self.ma200_plus10
+
+    def snapshot(self):
+        """
+        Current values with the keys of get_stock_data
+
+        Returns:
+            dict: current_price, current_ma50, current_ma200, current_ma200_plus10 and the flags
+        """
+        return {
+            'date': self.last_date.isoformat() if self.last_date else None,
+            'current_price': self.last_close,
+            'current_ma50': self.ma50,
+            'current_ma200': self.ma200,
+            'current_ma200_plus10': self.ma200_plus10,
+            'is_above_ma200': self.is_above_ma200,
+            'is_above_ma200_plus10': self.is_above_ma200_plus10,
+        }
+
+    def to_dict(self):
+        """Checkpoint of the state (the longest window's closes are enough to rebuild it)"""
+        return {
+            'ticker': self.ticker,
+            'last_date': self.last_date.isoformat() if self.last_date else None,
+            'closes': self.means[max(MA_WINDOWS)].to_list(),
+        }
+
+    @classmethod
+    def from_dict(cls, checkpoint):
+        """Restore a state saved with to_dict"""
+        state = cls(checkpoint['ticker'])
+        closes = checkpoint['closes']
+        for window in MA_WINDOWS:
+            state.means[window] = RunningMean.from_list(window, closes)
+        if checkpoint['last_date']:
+            state.last_date = date.fromisoformat(checkpoint['last_date'])
+        state.last_close = closes[-1] if closes else None
+        return state
+
+
+class IndicatorStates:
+    """
+    Indicator states of many tickers with checkpoint/restore
+    """
+    def __init__(self, path=INDICATOR_STATE_PATH):
+        """
+        Initialize and restore the last checkpoint if there is one
+
+        Args:
+            path (str, optional): Checkpoint file (None disables persistence)
+        """
+        self.path = path
+        self.states = {}
+        self._lock = threading.Lock()
+        self.restore()
+
+    def restore(self):
+        """Load states from the checkpoint file"""
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                checkpoints = json.load(f)
+            with self._lock:
+                self.states = {item['ticker']: IndicatorState.from_dict(item) for item in checkpoints}
+            logger.info(f"Restored indicator state for {len(self.states)} tickers")
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Ignoring unreadable indicator checkpoint {self.path}: {e}")
+
+    def checkpoint(self):
+        """Write all states to the checkpoint file (atomically)"""
+        if not self.path:
+            return
+        with self._lock:
+            checkpoints = [state.to_dict() for state in self.states.values()]
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(checkpoints, f)
+        os.replace(tmp_path, self.path)
+
+    def get(self, ticker):
+        """State of a ticker, or None if it has not been seeded"""
+        with self._lock:
+            return self.states.get(ticker.upper())
+
+    def seed(self, ticker, dates, closes):
+        """Replace a ticker's state with one built from its close history"""
+        state = IndicatorState.from_closes(ticker.upper(), dates, closes)
+        with self._lock:
+            self.states[state.ticker] = state
+        return state
+
+    def update(self, ticker, bar_date, close):
+        """
+        Apply a quote to a seeded ticker
+
+        Returns:
+            IndicatorState: Updated state
+            None: If the ticker has not been seeded
+        """
+        with self._lock:
+            state = self.states.get(ticker.upper())
+            if state is not None:
+                state.update(bar_date, close)
+            return state
+
+    def refresh(self, tickers, store=None):
+        """
+        Bring the states of many tickers up to date from the price store
+
+        Tickers without a state are seeded from SEED_PERIOD of history; the
+        others only apply the bars newer than (or equal to) their last date.
+        Missing bars of all tickers are fetched in one batch.
+
+        Args:
+            tickers (list): Ticker symbols
+            store (PriceStore, optional): Price store, defaults to the shared one
+
+        Returns:
+            dict: Ticker -> IndicatorState (tickers without data are left out)
+        """
+        if store is None:
+            from price_store import get_price_store
+            store = get_price_store()
+
+        histories = store.history_many(tickers, SEED_PERIOD)
+        states = {}
+        for ticker, history in histories.items():
+            if history.empty:
+                continue
+            state = self.get(ticker)
+            if state is None or state.last_date is None:
+                state = self.seed(ticker, history.index.date, history['Close'].to_numpy())
+            else:
+                newer = history[history.index.date >= state.last_date]
+                with self._lock:
+                    for bar_date, close in zip(newer.index.date, newer['Close'].to_numpy()):
+                        state.update(bar_date, close)
+            states[ticker] = state
+        return states
@@ -0,0 +1,279 @@
+"""
+Vectorized technical indicator engine
+
+Indicators are computed on blocks of the float32 price matrix
+(price_matrix.PriceMatrix), so a run over many tickers is one pandas/numpy pass
+per indicator instead of one per ticker. Results are memoized per ticker and bar range (first bar, last bar and last
+close), so the chart image, the Telegram analysis and the chart API all read
+the same computed frame and an unchanged history is never computed twice.
+
+Columns of a computed frame:
+    Close, MA50, MA200, MA200_Plus10, EMA12, EMA26, MACD, MACD_Signal,
+    MACD_Hist, RSI14, BB_Middle, BB_Upper, BB_Lower, ATR14, High52w, Low52w,
+    Dist52wHigh, Dist52wLow (distances in percent of the 52-week high/low)
+"""
+import logging
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from config import INDICATOR_CACHE_ITEMS
+from price_matrix import PriceMatrix
+
+logger = logging.getLogger(__name__)
+
+# Indicator parameters
+MA_WINDOWS = (50, 200)
+MA200_BAND = 1.1
+EMA_SPANS = (12, 26)
+MACD_SIGNAL_SPAN = 9
+RSI_PERIOD = 14
+BOLLINGER_WINDOW = 20
+BOLLINGER_STDDEV = 2.0
+ATR_PERIOD = 14
+WEEKS52_BARS = 252
+
+INDICATOR_COLUMNS = [
+    'Close', 'MA50', 'MA200', 'MA200_Plus10', 'EMA12', 'EMA26', 'MACD', 'MACD_Signal', 'MACD_Hist', 'RSI14',
+    'BB_Middle', 'BB_Upper', 'BB_Lower', 'ATR14', 'High52w', 'Low52w', 'Dist52wHigh', 'Dist52wLow'
+]
+
+
+def ema(prices, span):
+    """Exponential moving average of each column (recursive form, like most charting tools)"""
+    return prices.ewm(span=span, adjust=False, min_periods=span).mean()
+
+
+def wilder(values, period):
+    """Wilder's smoothing (an EMA with alpha = 1/period) of each column"""
+    return values.ewm(alpha=1.0 / period, adjust=False, min_periods=period).mean()
+
+
+def rsi(close, period=RSI_PERIOD):
+    """Relative strength index of each column"""
+    delta = close.diff()
+    gain = wilder(delta.clip(lower=0), period)
+    loss = wilder(-delta.clip(upper=0), period)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        result = 100 - 100 / (1 + gain / loss)
+    # No losses in the window: RSI is 100
+    return result.where(loss != 0, 100.0).where(gain.notna())
+
+
+def macd(close, fast=EMA_SPANS[0], slow=EMA_SPANS[1], signal=MACD_SIGNAL_SPAN):
+    """MACD line, signal line and histogram of each column"""
+    line = ema(close, fast) - ema(close, slow)
+    signal_line = line.ewm(span=signal, adjust=False, min_periods=signal).mean()
+    return line, signal_line, line - signal_line
+
+
+def bollinger(close, window=BOLLINGER_WINDOW, stddev=BOLLINGER_STDDEV):
+    """Middle, upper and lower Bollinger bands of each column (population standard deviation)"""
+    middle = close.rolling(window=window).mean()
+    deviation = close.rolling(window=window).std(ddof=0) * stddev
+    return middle, middle + deviation, middle - deviation
+
+
+def atr(high, low, close, period=ATR_PERIOD):
+    """Average true range of each column"""
+    previous = close.shift(1)
+    true_range = np.maximum(high - low, np.maximum((high - previous).abs(), (low - previous).abs()))
+    # The first bar has no previous close: its range is high - low
+    true_range = true_range.fillna(high - low)
+    return wilder(true_range, period)
+
+
+def compute_matrix(close, high=None, low=None):
+    """
+    Compute all indicators for a matrix of tickers in one pass
+
+    Args:
+        close (pandas.DataFrame): Closing prices, dates x tickers
+        high (pandas.DataFrame, optional): Highs with the same shape (defaults to close)
+        low (pandas.DataFrame, optional): Lows with the same shape (defaults to close)
+
+    Returns:
+        dict: Column name (see INDICATOR_COLUMNS) -> dates x tickers frame
+    """
+    high = close if high is None else high
+    low = close if low is None else low
+
+    result = {'Close': close}
+    for window in MA_WINDOWS:
+        result[f'MA{window}'] = close.rolling(window=window).mean()
+    result['MA200_Plus10'] = result['MA200'] * MA200_BAND
+    for span in EMA_SPANS:
+        result[f'EMA{span}'] = ema(close, span)
+    result['MACD'], result['MACD_Signal'], result['MACD_Hist'] = macd(close)
+    result['RSI14'] = rsi(close)
+    result['BB_Middle'], result['BB_Upper'], result['BB_Lower'] = bollinger(close)
+    result['ATR14'] = atr(high, low, close)
+
+    # 52-week range from closes, over what is available until a full year has passed
+    result['High52w'] = close.rolling(window=WEEKS52_BARS, min_periods=1).max()
+    result['Low52w'] = close.rolling(window=WEEKS52_BARS, min_periods=1).min()
+    result['Dist52wHigh'] = (close / result['High52w'] - 1) * 100
+    result['Dist52wLow'] = (close / result['Low52w'] - 1) * 100
+    return result
+
+
+def _memo_key(matrix, ticker):
+    first, end = matrix.span(ticker)
+    return (ticker, matrix.dates[first], matrix.dates[end - 1], float(matrix.row(ticker)[-1]))
+
+
+class IndicatorEngine:
+    """
+    Computes indicator frames for many tickers at once and memoizes them
+    """
+    def __init__(self, max_items=INDICATOR_CACHE_ITEMS):
+        """
+        Initialize the engine
+
+        Args:
+            max_items (int, optional): Maximum number of memoized ticker frames
+        """
+        self.max_items = max_items
+        self._memo = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _remember(self, key, frame):
+        with self._lock:
+            self._memo[key] = frame
+            self._memo.move_to_end(key)
+            while len(self._memo) > self.max_items:
+                self._memo.popitem(last=False)
+
+    def compute_rows(self, matrix, tickers):
+        """
+        Indicator frames for tickers of a price matrix
+
+        Tickers without missing days inside their history are computed
+        together on one block of the matrix (leading missing days do not
+        disturb any window). A ticker with gaps (another exchange calendar)
+        is computed on its own valid days, so rolling windows never span
+        missing days.
+
+        Args:
+            matrix (PriceMatrix): Aligned price arrays
+            tickers (list): Tickers of the matrix to compute
+
+        Returns:
+            dict: Ticker -> frame with INDICATOR_COLUMNS, indexed by date (tickers not in the matrix are left out)
+        """
+        results = {}
+        pending = {}
+        groups = []
+        # Keys and price blocks are read under the matrix lock, so a concurrent
+        # upsert cannot pair new arrays with old spans or dates
+        with matrix.lock:
+            with self._lock:
+                for ticker in tickers:
+                    if ticker not in matrix:
+                        continue
+                    key = _memo_key(matrix, ticker)
+                    cached = self._memo.get(key)
+                    if cached is not None:
+                        self._memo.move_to_end(key)
+                        results[ticker] = cached
+                    else:
+                        pending[ticker] = key
+            if not pending:
+                return results
+
+            shared = [ticker for ticker in pending if not matrix.has_gaps(ticker)]
+            selections = []
+            if shared:
+                spans = [matrix.span(ticker) for ticker in shared]
+                selections.append((shared, slice(min(first for first, _ in spans), max(end for _, end in spans))))
+            for ticker in pending:
+                if ticker not in shared:
+                    first, end = matrix.span(ticker)
+                    valid = first + np.flatnonzero(~np.isnan(matrix.row(ticker)))
+                    selections.append(([ticker], valid))
+
+            for group, columns in selections:
+                # float32 storage, float64 arithmetic (astype copies out of the matrix)
+                blocks = {field: matrix.block(group, field)[:, columns].T.astype(np.float64)
+                          for field in ('close', 'high', 'low')}
+                if isinstance(columns, slice):
+                    offsets = [tuple(column - columns.start for column in matrix.span(ticker)) for ticker in group]
+                else:
+                    offsets = None
+                groups.append((group, pd.DatetimeIndex(matrix.dates[columns]), blocks, offsets))
+
+        for group, index, blocks, offsets in groups:
+            prices = {field: pd.DataFrame(values, index=index, columns=group) for field, values in blocks.items()}
+            computed = compute_matrix(prices['close'], prices['high'], prices['low'])
+            stacked = np.stack([computed[column].to_numpy() for column in INDICATOR_COLUMNS], axis=2)
+            for j, ticker in enumerate(group):
+                if offsets is not None:
+                    first, end = offsets[j]
+                    rows, dates = stacked[first:end, j, :], index[first:end]
+                else:
+                    rows, dates = stacked[:, j, :], index
+                frame = pd.DataFrame(rows, index=dates, columns=INDICATOR_COLUMNS)
+                self._remember(pending[ticker], frame)
+                results[ticker] = frame
+        logger.debug(f"Computed indicators for {len(pending)} tickers in {len(groups)} matrices")
+        return results
+
+    def compute(self, histories):
+        """
+        Indicator frames for many tickers from OHLCV frames
+
+        Args:
+            histories (dict): Ticker -> OHLCV frame
+
+        Returns:
+            dict: Ticker -> frame with INDICATOR_COLUMNS (empty histories are left out)
+        """
+        return self.compute_rows(PriceMatrix.from_histories(histories), list(histories))
+
+
+_engine = IndicatorEngine()
+
+
+def compute_indicators(histories):
+    """
+    Indicator frames for many tickers from the shared memoizing engine
+
+    Args:
+        histories (dict): Ticker -> OHLCV frame
+
+    Returns:
+        dict: Ticker -> frame with INDICATOR_COLUMNS
+    """
+    return _engine.compute(histories)
+
+
+def compute_indicators_for(matrix, tickers):
+    """
+    Indicator frames for tickers of a price matrix from the shared memoizing engine
+
+    Args:
+        matrix (PriceMatrix): Aligned price arrays
+        tickers (list): Tickers of the matrix
+
+    Returns:
+        dict: Ticker -> frame with INDICATOR_COLUMNS
+    """
+    return _engine.compute_rows(matrix, tickers)
+
+
+def latest_values(frame):
+    """
+    Last row of an indicator frame as JSON-ready values
+
+    Values are rounded so float32 storage noise does not reach the API.
+
+    Returns:
+        dict: Lower-case indicator name -> float or None
+    """
+    row = frame.iloc[-1]
+    return {
+        column.lower(): round(float(row[column]), 4) if not np.isnan(row[column]) else None
+        for column in INDICATOR_COLUMNS if column not in ('Close', 'MA50', 'MA200', 'MA200_Plus10')
+    }
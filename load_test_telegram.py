@@ -0,0 +1,146 @@
+"""
+텔레그램 전송 모듈 부하 테스트 - 로컬 가짜 Bot API 서버 대상
+
+실제 봇 토큰이나 네트워크 없이 telegram_sender의 처리량, 지연 시간(p50/p99),
+429 처리 동작을 측정함.
+
+사용 예:
+    python load_test_telegram.py --messages 500 --concurrency 20 --latency 0.05 --rate-limit 30
+    python load_test_telegram.py --mode outbox --messages 200
+"""
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import tempfile
+import time
+
+import telegram_sender
+from fake_telegram import FakeTelegramServer
+from outbox import Outbox, OutboxSender
+
+# 로깅 설정 (전송 모듈의 메시지별 로그는 숨김)
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s] %(message)s"
+)
+logging.getLogger("telegram_sender").setLevel(logging.ERROR)
+logging.getLogger("outbox").setLevel(logging.ERROR)
+logging.getLogger("aiohttp.access").setLevel(logging.WARNING)
+logger = logging.getLogger(__name__)
+
+SAMPLE_MESSAGE = "📈 <b>LOAD 데일리 브리핑</b>\n\n" + "부하 테스트용 본문입니다. " * 40
+SAMPLE_PHOTO = b"\x89PNG\r\n\x1a\n" + b"\0" * 50_000
+
+
+def percentile(values, pct):
+    """정렬된 값 목록의 백분위수"""
+    if not values:
+        return 0.0
+    index = min(len(values) - 1, max(0, round(pct / 100 * (len(values) - 1))))
+    return values[index]
+
+
+async def run_direct(count, concurrency, photo_ratio):
+    """send_message / send_photo를 동시에 호출하며 건별 지연 측정"""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    failures = 0
+
+    async def one(i):
+        nonlocal failures
+        async with semaphore:
+            started = time.perf_counter()
+            if photo_ratio and i % max(1, round(1 / photo_ratio)) == 0:
+                ok = await telegram_sender.send_photo(SAMPLE_PHOTO, caption=f"chart {i}")
+            else:
+                ok = await telegram_sender.send_message(SAMPLE_MESSAGE)
+            latencies.append(time.perf_counter() - started)
+            if not ok:
+                failures += 1
+
+    await asyncio.gather(*(one(i) for i in range(count)))
+    return latencies, failures
+
+
+async def run_outbox(count, photo_ratio):
+    """아웃박스에 쌓은 뒤 OutboxSender로 순차 전송하며 건별 지연 측정"""
+    db_path = os.path.join(tempfile.mkdtemp(), "load_outbox.db")
+    outbox = Outbox(db_path)
+    items = []
+    for i in range(count):
+        if photo_ratio and i % max(1, round(1 / photo_ratio)) == 0:
+            items.append({'key': f"load:{i}", 'kind': 'photo', 'payload': SAMPLE_PHOTO, 'text': f"chart {i}"})
+        else:
+            items.append({'key': f"load:{i}", 'kind': 'message', 'text': SAMPLE_MESSAGE, 'parse_mode': 'HTML'})
+    outbox.enqueue_run("load", items)
+
+    latencies = []
+
+    async def timed(func, *args, **kwargs):
+        started = time.perf_counter()
+        ok = await func(*args, **kwargs)
+        latencies.append(time.perf_counter() - started)
+        return ok
+
+    async def timed_message(*args, **kwargs):
+        return await timed(telegram_sender.send_message, *args, **kwargs)
+
+    async def timed_photo(*args, **kwargs):
+        return await timed(telegram_sender.send_photo, *args, **kwargs)
+
+    sender = OutboxSender(outbox, timed_message, timed_photo, interval=0)
+    while not await sender.drain("load"):
+        pass
+    failures = outbox.stats("load").get("failed", 0)
+    return latencies, failures
+
+
+async def load_test(args):
+    """가짜 서버를 띄우고 부하 테스트 실행"""
+    server = FakeTelegramServer(
+        port=0, latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+        rate_limit=args.rate_limit, retry_after=args.retry_after, seed=42
+    )
+    await server.start()
+
+    # 전송 모듈이 가짜 서버를 보도록 설정
+    telegram_sender.TELEGRAM_API_URL = server.url
+    telegram_sender.BOT_TOKEN = "load-test-token"
+    telegram_sender.CHAT_ID = "1"
+
+    try:
+        started = time.perf_counter()
+        if args.mode == "outbox":
+            latencies, failures = await run_outbox(args.messages, args.photo_ratio)
+        else:
+            latencies, failures = await run_direct(args.messages, args.concurrency, args.photo_ratio)
+        elapsed = time.perf_counter() - started
+    finally:
+        await server.stop()
+
+    latencies.sort()
+    logger.info("=" * 50)
+    logger.info(f"모드: {args.mode}, 메시지: {args.messages}, 동시성: {args.concurrency if args.mode == 'direct' else 1}")
+    logger.info(f"총 소요 시간: {elapsed:.2f}s, 처리량: {len(latencies) / elapsed:.1f} msg/s")
+    logger.info(f"지연 p50: {percentile(latencies, 50) * 1000:.1f}ms, "
+                f"p99: {percentile(latencies, 99) * 1000:.1f}ms, "
+                f"평균: {statistics.mean(latencies) * 1000 if latencies else 0:.1f}ms")
+    logger.info(f"실패: {failures}, 서버 통계: {dict(server.stats)}")
+    logger.info("=" * 50)
+    return failures == 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="텔레그램 전송 모듈 부하 테스트")
+    parser.add_argument("--mode", choices=["direct", "outbox"], default="direct")
+    parser.add_argument("--messages", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--photo-ratio", type=float, default=0.2, help="전체 중 사진 전송 비율")
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--jitter", type=float, default=0.02)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit", type=int, default=None)
+    parser.add_argument("--retry-after", type=int, default=1)
+    asyncio.run(load_test(parser.parse_args()))
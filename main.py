@@ -8,10 +8,11 @@ import os
 from datetime import datetime
 
 from flask import Flask, jsonify
-from config import LOG_LEVEL, LOG_FORMAT, LOG_FILE, TICKERS, TEST_TICKERS
+from config import LOG_LEVEL, LOG_FORMAT, LOG_FILE, TICKERS, TEST_TICKERS, OUTBOX_RESUME_HOURS
 from scraper import ETFScraper
-from telegram_sender import send_message, send_html_content, send_chart_analysis
-from stock_data import get_stock_data
+from outbox import Outbox, new_run_id
+from telegram_sender import send_message, build_run_items, deliver_outbox
+from stock_data import get_stock_data_batch, prefetch_stock_info
 
 # Initialize Flask app
 app = Flask(__name__)
@@ -50,41 +51,45 @@ async def run_scraper(tickers=None, logger=None):
         # 입력된 티커들을 지정된 순서대로 정렬
         tickers = sorted(tickers, key=lambda x: default_order.index(x) if x in default_order else len(default_order))
     
+    # 이전 실행에서 전송하지 못한 메시지가 있으면 먼저 이어서 전송 (실패해도 오늘 브리핑은 계속 진행)
+    outbox = Outbox()
+    resumed = True
+    pending_run = outbox.find_resumable_run(max_age_hours=OUTBOX_RESUME_HOURS)
+    if pending_run:
+        logger.info(f"미전송 메시지가 남은 실행 재개: {pending_run}")
+        resumed = await deliver_outbox(outbox, pending_run)
+        if not resumed:
+            logger.warning(f"이전 실행의 메시지가 아웃박스에 남아 있습니다: {outbox.stats(pending_run)}")
+
     logger.info(f"Running scrape for tickers: {', '.join(tickers)}")
+    prefetch_stock_info(tickers)  # 만료된 메타데이터를 백그라운드에서 일괄 갱신
 
     scraper = None
     try:
         scraper = ETFScraper()
         results = await asyncio.wait_for(
-            scraper.scrape_all_tickers(tickers),
+            scraper.scrape_all_briefings(tickers),
             timeout=120
         )
 
-        # Send to Telegram
+        # Render everything into the outbox, then send to Telegram
         try:
             logger.info("텔레그램으로 메시지 전송 시작")
-            today_date = datetime.now().strftime("%Y년 %m월 %d일")
-
-            header_message = f"📊 <b>ETF 데일리 브리핑 ({today_date})</b>\n\n"
-            await send_message(header_message)
-
-            for result in results:
-                ticker = result.split(':')[0].strip()
-                html_content = result.replace(f"{ticker}:", "")
-
-                await send_html_content(ticker, html_content)
+            run_id = new_run_id()
 
-                try:
-                    chart_data = get_stock_data(ticker)
-                    if chart_data:
-                        await send_chart_analysis(ticker, chart_data)
-                except Exception as e:
-                    logger.error(f"차트 데이터 전송 실패 ({ticker}): {e}")
+            # 모든 티커의 주가를 한 번에 받아 지표 계산
+            chart_datas = get_stock_data_batch([briefing.ticker for briefing in results])
 
-                await asyncio.sleep(1)
+            # 채팅별 전송 모드(full/digest)에 맞춰 렌더링
+            items = build_run_items(results, chart_datas)
+            outbox.enqueue_run(run_id, items)
+            success = await deliver_outbox(outbox, run_id)
 
-            logger.info("텔레그램 메시지 전송 완료")
-            return True
+            if success:
+                logger.info("텔레그램 메시지 전송 완료")
+            else:
+                logger.warning(f"일부 메시지가 아웃박스에 남아 있습니다: {outbox.stats(run_id)}")
+            return success and resumed
 
         except Exception as e:
             logger.error(f"텔레그램 메시지 전송 중 오류 발생: {e}")
@@ -148,4 +153,5 @@ def health_check():
 if __name__ == "__main__":
     logger = setup_logging()
     logger.info("Starting ETF Daily Briefing Scraper")
+    prefetch_stock_info(TICKERS)
     app.run(host='0.0.0.0', port=5000)
\ No newline at end of file
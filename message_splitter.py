@@ -0,0 +1,209 @@
+"""
+텔레그램 메시지 분할 모듈 - HTML 태그를 깨뜨리지 않고 메시지 한도까지 채워서 분할
+"""
+import html
+import re
+
+# 텔레그램 메시지 최대 길이 (엔티티 파싱 후 UTF-16 코드 유닛 기준)
+TELEGRAM_MESSAGE_LIMIT = 4096
+# 사진 캡션 최대 길이
+TELEGRAM_CAPTION_LIMIT = 1024
+
+# HTML 토큰: 태그, 엔티티, 일반 텍스트
+_TOKEN_RE = re.compile(r'<[^<>]*>|&#?[0-9A-Za-z]+;|[^<&]+|[<&]')
+_TAG_RE = re.compile(r'<\s*(/?)\s*([A-Za-z][A-Za-z0-9-]*)[^>]*>')
+
+# 분할 우선순위: 문단 > 줄 > 문장 > 단어
+_SPLIT_PATTERNS = [
+    re.compile(r'\n\s*\n'),
+    re.compile(r'\n'),
+    re.compile(r'(?<=[.!?。])\s+|(?<=다\.)'),
+    re.compile(r'\s+'),
+]
+
+
+def utf16_len(text):
+    """
+    텔레그램이 길이를 세는 방식(UTF-16 코드 유닛)으로 문자열 길이 계산
+
+    Args:
+        text (str): 문자열
+
+    Returns:
+        int: UTF-16 코드 유닛 수
+    """
+    return len(text.encode('utf-16-le')) // 2
+
+
+def _is_markup(token):
+    """태그나 엔티티 토큰인지 확인"""
+    return (token.startswith('<') and token.endswith('>') and len(token) > 1) or \
+        (token.startswith('&') and token.endswith(';') and len(token) > 1)
+
+
+def _token_len(token, parse_mode):
+    """토큰 하나가 텔레그램에서 차지하는 길이"""
+    if parse_mode != 'HTML':
+        return utf16_len(token)
+    if token.startswith('<') and token.endswith('>') and len(token) > 1:
+        return 0
+    if token.startswith('&') and token.endswith(';') and len(token) > 1:
+        return utf16_len(html.unescape(token))
+    return utf16_len(token)
+
+
+def visible_len(text, parse_mode='HTML'):
+    """
+    엔티티 파싱 후 실제로 표시되는 텍스트 길이 계산
+
+    Args:
+        text (str): 메시지 텍스트
+        parse_mode (str, optional): 'HTML'이면 태그는 0, 엔티티는 디코딩된 길이로 계산
+
+    Returns:
+        int: UTF-16 코드 유닛 수
+    """
+    if parse_mode != 'HTML':
+        return utf16_len(text)
+    return sum(_token_len(token, parse_mode) for token in _TOKEN_RE.findall(text))
+
+
+def _segments(text, pattern, parse_mode):
+    """
+    태그와 엔티티 내부는 건드리지 않고 텍스트 부분에서만 구분자 기준으로 분할
+    (구분자는 앞 조각에 붙여서 유지)
+    """
+    segments = []
+    current = []
+    for token in _TOKEN_RE.findall(text):
+        if parse_mode == 'HTML' and _is_markup(token):
+            current.append(token)
+            continue
+        pos = 0
+        for match in pattern.finditer(token):
+            if match.end() == 0:
+                continue
+            current.append(token[pos:match.end()])
+            segments.append(''.join(current))
+            current = []
+            pos = match.end()
+        current.append(token[pos:])
+    if current:
+        segments.append(''.join(current))
+    return [segment for segment in segments if segment]
+
+
+def _hard_split(text, limit, parse_mode):
+    """
+    구분자가 없는 긴 텍스트를 글자 단위로 분할 (태그/엔티티는 쪼개지 않음)
+    """
+    pieces = []
+    current = []
+    current_len = 0
+    tokens = _TOKEN_RE.findall(text) if parse_mode == 'HTML' else list(text)
+    for token in tokens:
+        units = [token] if parse_mode == 'HTML' and _is_markup(token) else list(token)
+        for unit in units:
+            unit_len = _token_len(unit, parse_mode)
+            if current and current_len + unit_len > limit:
+                pieces.append(''.join(current))
+                current = []
+                current_len = 0
+            current.append(unit)
+            current_len += unit_len
+    if current:
+        pieces.append(''.join(current))
+    return pieces
+
+
+def _split_to_fit(text, limit, parse_mode, level=0):
+    """
+    한도를 넘는 조각만 다음 단계 구분자로 재귀 분할
+    """
+    if visible_len(text, parse_mode) <= limit:
+        return [text]
+    if level >= len(_SPLIT_PATTERNS):
+        return _hard_split(text, limit, parse_mode)
+
+    pieces = []
+    for segment in _segments(text, _SPLIT_PATTERNS[level], parse_mode):
+        pieces.extend(_split_to_fit(segment, limit, parse_mode, level + 1))
+    return pieces
+
+
+def _balance_tags(chunks):
+    """
+    청크 경계에서 열려 있는 태그를 닫고, 다음 청크 시작에서 다시 열어줌
+    """
+    balanced = []
+    open_tags = []  # (태그 이름, 원본 여는 태그)
+    for chunk in chunks:
+        prefix = ''.join(tag for _, tag in open_tags)
+        for token in _TOKEN_RE.findall(chunk):
+            match = _TAG_RE.fullmatch(token)
+            if not match:
+                continue
+            closing, name = match.group(1), match.group(2).lower()
+            if not closing:
+                open_tags.append((name, token))
+                continue
+            # 짝이 맞는 여는 태그까지 스택에서 제거
+            for i in range(len(open_tags) - 1, -1, -1):
+                if open_tags[i][0] == name:
+                    del open_tags[i:]
+                    break
+        suffix = ''.join(f"</{name}>" for name, _ in reversed(open_tags))
+        balanced.append(prefix + chunk + suffix)
+    return balanced
+
+
+def split_message(text, limit=TELEGRAM_MESSAGE_LIMIT, parse_mode='HTML', continuation_prefix=''):
+    """
+    메시지를 텔레그램 한도 안에서 최소 개수의 청크로 분할
+
+    문단 단위로 최대한 채우고, 문단 하나가 한도를 넘으면 줄, 문장, 단어,
+    글자 순서로 더 잘게 나눔. HTML 모드에서는 태그가 청크 사이에서 깨지지 않도록
+    닫고 다시 열어줌.
+
+    Args:
+        text (str): 전송할 메시지 텍스트
+        limit (int, optional): 청크당 최대 길이 (UTF-16 기준). 기본값: 4096
+        parse_mode (str, optional): 'HTML' 또는 None
+        continuation_prefix (str, optional): 두 번째 청크부터 앞에 붙일 문자열 (예: "(계속) ")
+
+    Returns:
+        list: 분할된 메시지 목록
+    """
+    if not text or not text.strip():
+        return []
+
+    budget = limit - visible_len(continuation_prefix, parse_mode)
+    pieces = _split_to_fit(text, budget, parse_mode)
+
+    # 조각들을 한도까지 순서대로 채워 넣기
+    chunks = []
+    current = []
+    current_len = 0
+    for piece in pieces:
+        piece_len = visible_len(piece, parse_mode)
+        if current and current_len + piece_len > budget:
+            chunks.append(''.join(current))
+            current = []
+            current_len = 0
+        current.append(piece)
+        current_len += piece_len
+    if current:
+        chunks.append(''.join(current))
+
+    if parse_mode == 'HTML':
+        chunks = _balance_tags(chunks)
+
+    messages = []
+    for chunk in chunks:
+        chunk = chunk.strip()
+        if not visible_len(chunk, parse_mode):
+            continue
+        if messages and continuation_prefix:
+            chunk = continuation_prefix + chunk
+        messages.append(chunk)
+    return messages
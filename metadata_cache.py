@@ -0,0 +1,228 @@
+"""
+Persistent cache of ticker metadata with per-field TTLs
+
+yfinance's Ticker.info is one of its slowest calls, while most of what
+get_stock_info returns (name, sector, industry, description) almost never
+changes. Fields are stored in SQLite with the time they were fetched and each
+group of fields has its own TTL: static fields are kept for days, fundamentals
+(PE, dividend yield, beta) for a day and the market cap for about an hour.
+Only the stale groups are refreshed: when just the market cap expired it comes
+from the provider's market_info() (Ticker.fast_info for yfinance), and the full
+info() request is made only when static fields or fundamentals expired.
+
+A lookup with stale fields returns the cached values at once and refreshes the
+ticker in a background thread; only a ticker that was never fetched blocks.
+prefetch() refreshes every stale ticker of a list concurrently, which is done
+for the whole registry at startup and before runs.
+"""
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from config import METADATA_CACHE_PATH, METADATA_PREFETCH_WORKERS, METADATA_TTLS
+from data_providers import get_data_provider, provider_path
+
+logger = logging.getLogger(__name__)
+
+# Field -> TTL group in config.METADATA_TTLS
+FIELDS = {
+    'name': 'static',
+    'sector': 'static',
+    'industry': 'static',
+    'description': 'static',
+    'market_cap': 'market',
+    'pe_ratio': 'fundamental',
+    'dividend_yield': 'fundamental',
+    'beta': 'fundamental',
+}
+
+# Fields served by the provider's market_info() (data_providers.MARKET_FIELDS)
+MARKET_FIELDS = [field for field, group in FIELDS.items() if group == 'market']
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS ticker_metadata (
+    ticker TEXT NOT NULL,
+    field TEXT NOT NULL,
+    value TEXT,
+    fetched_at REAL NOT NULL,
+    PRIMARY KEY (ticker, field)
+) WITHOUT ROWID;
+"""
+
+
+class MetadataCache:
+    """
+    SQLite-backed metadata cache with background refresh
+    """
+    def __init__(self, db_path=METADATA_CACHE_PATH, fetch=None, ttls=None, workers=METADATA_PREFETCH_WORKERS,
+                 fetch_market=None):
+        """
+        Initialize the cache
+
+        Args:
+            db_path (str, optional): SQLite database path
+            fetch (callable, optional): ticker -> {field: value}; defaults to the data provider's info
+            ttls (dict, optional): TTL group -> seconds. Defaults to config.METADATA_TTLS.
+            workers (int, optional): Threads for background refresh and prefetch
+            fetch_market (callable, optional): ticker -> {market field: value}; defaults to the
+                data provider's market_info, or to fetch when only fetch is given
+        """
+        self.db_path = db_path
+        if fetch is None:
+            provider = get_data_provider()
+            fetch, fetch_market = provider.info, fetch_market or provider.market_info
+        self.fetch = fetch
+        self.fetch_market = fetch_market or fetch
+        self.ttls = ttls or METADATA_TTLS
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="metadata")
+        self._refreshing = {}
+        self._lock = threading.Lock()
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _read(self, ticker):
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT field, value, fetched_at FROM ticker_metadata WHERE ticker = ?", (ticker,)
+            ).fetchall()
+        return {field: (json.loads(value), fetched_at) for field, value, fetched_at in rows if field in FIELDS}
+
+    def _stale_groups(self, cached, now):
+        return {
+            group for field, group in FIELDS.items()
+            if field not in cached or now - cached[field][1] > self.ttls[group]
+        }
+
+    def refresh(self, ticker):
+        """
+        Fetch the stale field groups of a ticker and store them
+
+        Only the market fields are fetched when nothing else expired; any other
+        stale group triggers one full fetch of every field.
+
+        Returns:
+            dict: Fresh metadata
+        """
+        ticker = ticker.upper()
+        cached = self._read(ticker)
+        stale = self._stale_groups(cached, time.time())
+        if stale == {'market'}:
+            values = self.fetch_market(ticker)
+            fields = MARKET_FIELDS
+        else:
+            values = self.fetch(ticker)
+            fields = list(FIELDS)
+        now = time.time()
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO ticker_metadata (ticker, field, value, fetched_at) VALUES (?, ?, ?, ?)",
+                [(ticker, field, json.dumps(values.get(field, 'N/A')), now) for field in fields]
+            )
+        result = {field: cached[field][0] if field in cached else 'N/A' for field in FIELDS}
+        result.update({field: values.get(field, 'N/A') for field in fields})
+        return result
+
+    def refresh_in_background(self, ticker):
+        """
+        Refresh a ticker in the worker pool unless a refresh is already running
+
+        Returns:
+            concurrent.futures.Future: Refresh result
+        """
+        ticker = ticker.upper()
+        with self._lock:
+            future = self._refreshing.get(ticker)
+            if future is not None:
+                return future
+            future = self._executor.submit(self.refresh, ticker)
+            self._refreshing[ticker] = future
+
+        def done(f):
+            with self._lock:
+                self._refreshing.pop(ticker, None)
+            if f.exception():
+                logger.warning(f"Metadata refresh failed for {ticker}: {f.exception()}")
+        future.add_done_callback(done)
+        return future
+
+    def get(self, ticker):
+        """
+        Metadata of a ticker, served from the cache
+
+        Stale fields are returned as they are while the ticker refreshes in the
+        background. A ticker without cached metadata is fetched synchronously.
+
+        Args:
+            ticker (str): Ticker symbol
+
+        Returns:
+            dict: Metadata in the layout of get_stock_info
+        """
+        ticker = ticker.upper()
+        cached = self._read(ticker)
+        if not cached:
+            return self.refresh_in_background(ticker).result()
+
+        if self._stale_groups(cached, time.time()):
+            self.refresh_in_background(ticker)
+        return {field: cached[field][0] if field in cached else 'N/A' for field in FIELDS}
+
+    def prefetch(self, tickers, wait=True):
+        """
+        Refresh every ticker whose metadata is missing or stale, concurrently
+
+        Args:
+            tickers (list): Ticker symbols
+            wait (bool, optional): Block until all refreshes are done
+
+        Returns:
+            int: Number of tickers refreshed
+        """
+        now = time.time()
+        stale = [ticker.upper() for ticker in tickers if self._stale_groups(self._read(ticker.upper()), now)]
+        futures = [self.refresh_in_background(ticker) for ticker in stale]
+        if wait:
+            for future in futures:
+                try:
+                    future.result()
+                except Exception:
+                    pass  # Logged by the done callback
+        if stale:
+            logger.info(f"Prefetching metadata for {len(stale)} tickers")
+        return len(stale)
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_metadata_cache():
+    """
+    Shared MetadataCache for this process, created on first use
+
+    Returns:
+        MetadataCache: Cache at config.METADATA_CACHE_PATH
+    """
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = MetadataCache(provider_path(METADATA_CACHE_PATH))
+        return _cache
@@ -0,0 +1,322 @@
+"""
+Durable SQLite outbox for Telegram delivery
+
+Rendered messages and images are stored with a delivery state so that a crash
+or a Telegram outage in the middle of a run can be resumed without scraping or
+rendering again. Delivery is at-least-once: an item is only marked as sent after
+Telegram confirms it, and every item carries a unique idempotency key so it is
+never enqueued or delivered twice under normal operation.
+"""
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from config import OUTBOX_DB_PATH, OUTBOX_MAX_ATTEMPTS, OUTBOX_LEASE_SECONDS, OUTBOX_SEND_INTERVAL
+
+logger = logging.getLogger(__name__)
+
+# Delivery states
+PENDING = "pending"
+SENDING = "sending"
+SENT = "sent"
+FAILED = "failed"
+
+# claim_next result when the next item in order is still leased by another sender
+BLOCKED = "blocked"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox_runs (
+    run_id TEXT PRIMARY KEY,
+    created_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS outbox_items (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id TEXT NOT NULL,
+    idempotency_key TEXT NOT NULL UNIQUE,
+    kind TEXT NOT NULL,
+    chat_id TEXT,
+    text TEXT,
+    parse_mode TEXT,
+    payload BLOB,
+    state TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    claimed_by TEXT,
+    claimed_at REAL,
+    last_error TEXT,
+    created_at TEXT NOT NULL,
+    sent_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_outbox_items_run_state ON outbox_items (run_id, state, id);
+"""
+
+
+def new_run_id():
+    """
+    Identifier for a new run: timestamp plus a random suffix
+
+    The timestamp keeps ids sortable for humans; the suffix keeps two runs
+    started in the same second (a manual run and the scheduler) apart, since
+    enqueue_run silently ignores items whose keys already exist.
+
+    Returns:
+        str: Run identifier, e.g. '20250102070000-1a2b3c4d'
+    """
+    return f"{datetime.now().strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:8]}"
+
+
+class Outbox:
+    """
+    Persistent queue of rendered Telegram messages and photos
+    """
+    def __init__(self, db_path=OUTBOX_DB_PATH):
+        """
+        Initialize the outbox
+
+        Args:
+            db_path (str, optional): SQLite database path. Defaults to config.OUTBOX_DB_PATH.
+        """
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def enqueue_run(self, run_id, items):
+        """
+        Store all items of a run in a single transaction
+
+        Either the whole run is enqueued or nothing is, so a crash while enqueueing
+        never leaves a half-queued run behind. Items whose idempotency key already
+        exists are ignored.
+
+        Args:
+            run_id (str): Run identifier
+            items (list): Dicts with 'key', 'kind' ('message' or 'photo') and
+                'text', 'parse_mode', 'payload', 'chat_id' as needed
+
+        Returns:
+            int: Number of newly enqueued items
+        """
+        now = datetime.now().isoformat()
+        added = 0
+        with self._lock, self._connect() as conn:
+            for item in items:
+                cursor = conn.execute(
+                    "INSERT OR IGNORE INTO outbox_items "
+                    "(run_id, idempotency_key, kind, chat_id, text, parse_mode, payload, created_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        run_id,
+                        f"{run_id}:{item['key']}",
+                        item['kind'],
+                        item.get('chat_id'),
+                        item.get('text'),
+                        item.get('parse_mode'),
+                        item.get('payload'),
+                        now,
+                    )
+                )
+                added += cursor.rowcount
+            conn.execute(
+                "INSERT OR IGNORE INTO outbox_runs (run_id, created_at) VALUES (?, ?)",
+                (run_id, now)
+            )
+        logger.info(f"Enqueued {added} outbox items for run {run_id}")
+        return added
+
+    def find_resumable_run(self, max_age_hours=12):
+        """
+        Find the most recent run that still has undelivered items
+
+        Args:
+            max_age_hours (int, optional): Ignore runs older than this
+
+        Returns:
+            str: Run identifier
+            None: If every recent run is fully delivered
+        """
+        cutoff = (datetime.now() - timedelta(hours=max_age_hours)).isoformat()
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT r.run_id FROM outbox_runs r "
+                "WHERE r.created_at >= ? AND EXISTS ("
+                "  SELECT 1 FROM outbox_items i WHERE i.run_id = r.run_id AND i.state IN (?, ?)"
+                ") ORDER BY r.created_at DESC LIMIT 1",
+                (cutoff, PENDING, SENDING)
+            ).fetchone()
+        return row['run_id'] if row else None
+
+    def claim_next(self, run_id=None, worker_id=None):
+        """
+        Claim the oldest undelivered item
+
+        Only the lowest undelivered id is ever claimed, so items are delivered
+        strictly in order. Items left in the 'sending' state by a crashed
+        sender are reclaimed once their lease expires, which is what makes
+        delivery at-least-once; while the lease is still live, later items
+        wait.
+
+        Args:
+            run_id (str, optional): Restrict to one run
+            worker_id (str, optional): Identifier of the claiming sender
+
+        Returns:
+            sqlite3.Row: Claimed item
+            str: BLOCKED if the oldest undelivered item is leased by another sender
+            None: If nothing is deliverable
+        """
+        worker_id = worker_id or uuid.uuid4().hex
+        lease_cutoff = time.time() - OUTBOX_LEASE_SECONDS
+        query = "SELECT id, state, claimed_at FROM outbox_items WHERE state IN (?, ?)"
+        params = [PENDING, SENDING]
+        if run_id:
+            query += " AND run_id = ?"
+            params.append(run_id)
+        query += " ORDER BY id LIMIT 1"
+
+        with self._lock, self._connect() as conn:
+            row = conn.execute(query, params).fetchone()
+            if not row:
+                return None
+            if row['state'] == SENDING:
+                if row['claimed_at'] is not None and row['claimed_at'] >= lease_cutoff:
+                    return BLOCKED
+                logger.warning(f"Reclaiming outbox item {row['id']} after expired lease (may be delivered twice)")
+            cursor = conn.execute(
+                "UPDATE outbox_items SET state = ?, claimed_by = ?, claimed_at = ?, attempts = attempts + 1 "
+                "WHERE id = ? AND (state = ? OR (state = ? AND claimed_at < ?))",
+                (SENDING, worker_id, time.time(), row['id'], PENDING, SENDING, lease_cutoff)
+            )
+            if cursor.rowcount != 1:
+                return BLOCKED
+            return conn.execute("SELECT * FROM outbox_items WHERE id = ?", (row['id'],)).fetchone()
+
+    def mark_sent(self, item_id):
+        """Mark an item as delivered"""
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "UPDATE outbox_items SET state = ?, sent_at = ?, last_error = NULL WHERE id = ?",
+                (SENT, datetime.now().isoformat(), item_id)
+            )
+
+    def mark_failed(self, item_id, error, max_attempts=OUTBOX_MAX_ATTEMPTS):
+        """
+        Record a failed delivery attempt
+
+        The item goes back to 'pending' until it has used up its attempts.
+
+        Returns:
+            bool: True if the item was given up on
+        """
+        with self._lock, self._connect() as conn:
+            row = conn.execute("SELECT attempts FROM outbox_items WHERE id = ?", (item_id,)).fetchone()
+            exhausted = row is not None and row['attempts'] >= max_attempts
+            conn.execute(
+                "UPDATE outbox_items SET state = ?, last_error = ?, claimed_by = NULL WHERE id = ?",
+                (FAILED if exhausted else PENDING, str(error), item_id)
+            )
+        return exhausted
+
+    def stats(self, run_id=None):
+        """
+        Count items per delivery state
+
+        Returns:
+            dict: State name to item count
+        """
+        query = "SELECT state, COUNT(*) AS n FROM outbox_items"
+        params = []
+        if run_id:
+            query += " WHERE run_id = ?"
+            params.append(run_id)
+        query += " GROUP BY state"
+        with self._connect() as conn:
+            return {row['state']: row['n'] for row in conn.execute(query, params)}
+
+
+class OutboxSender:
+    """
+    Drains the outbox through the Telegram sender functions
+    """
+    def __init__(self, outbox, send_message, send_photo, interval=OUTBOX_SEND_INTERVAL):
+        """
+        Initialize the sender
+
+        Args:
+            outbox (Outbox): Outbox to drain
+            send_message (callable): Coroutine (text, parse_mode, chat_id) -> bool
+            send_photo (callable): Coroutine (photo_bytes, caption, parse_mode, chat_id) -> bool
+            interval (float, optional): Delay between deliveries in seconds
+        """
+        self.outbox = outbox
+        self.send_message = send_message
+        self.send_photo = send_photo
+        self.interval = interval
+        self.worker_id = uuid.uuid4().hex
+
+    async def _deliver(self, item):
+        if item['kind'] == 'photo':
+            return await self.send_photo(
+                item['payload'], caption=item['text'], parse_mode=item['parse_mode'], chat_id=item['chat_id']
+            )
+        return await self.send_message(item['text'], parse_mode=item['parse_mode'], chat_id=item['chat_id'])
+
+    async def drain(self, run_id=None):
+        """
+        Deliver items in order until the outbox is empty or delivery fails
+
+        Delivery stops at the first failure so that messages are never reordered;
+        the failed item stays pending for the next drain. It also stops when
+        the next item is still leased by another (possibly crashed) sender.
+
+        Args:
+            run_id (str, optional): Restrict to one run
+
+        Returns:
+            bool: True if everything was sent
+        """
+        while True:
+            item = self.outbox.claim_next(run_id=run_id, worker_id=self.worker_id)
+            if item is None:
+                return True
+            if item is BLOCKED:
+                logger.warning("Next outbox item is leased by another sender; waiting for its lease to expire")
+                return False
+
+            try:
+                success = await self._deliver(item)
+                error = None if success else "Telegram API returned failure"
+            except Exception as e:
+                success = False
+                error = e
+
+            if success:
+                self.outbox.mark_sent(item['id'])
+            else:
+                exhausted = self.outbox.mark_failed(item['id'], error)
+                if exhausted:
+                    logger.error(f"Giving up on outbox item {item['idempotency_key']}: {error}")
+                    continue
+                logger.warning(f"Outbox delivery failed for {item['idempotency_key']}, will retry: {error}")
+                return False
+
+            await asyncio.sleep(self.interval)
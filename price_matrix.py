@@ -0,0 +1,260 @@
+"""
+Compact in-memory price matrix
+
+Daily OHLCV for all loaded tickers is kept in one contiguous array per field
+(float32 prices, float64 volume), shaped tickers x trading days and aligned on
+a shared date index. Missing days are NaN. A ticker's row is a zero-copy view, so indicator
+computations and chart data read straight from the matrix instead of from one
+DataFrame plus several Python lists per ticker. The matrix can be saved as .npy
+files and memory-mapped back, so a large universe does not have to fit in RAM.
+"""
+import json
+import logging
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+FIELDS = ('open', 'high', 'low', 'close', 'volume')
+
+# Column names of the OHLCV frames the matrix is filled from
+FRAME_COLUMNS = {'open': 'Open', 'high': 'High', 'low': 'Low', 'close': 'Close', 'volume': 'Volume'}
+
+DTYPE = np.float32
+
+# Volume stays float64: float32 cannot represent integers above 2**24 exactly
+FIELD_DTYPES = {field: np.float64 if field == 'volume' else DTYPE for field in FIELDS}
+
+# Relative difference on the first overlapping close that means the source re-adjusted the history
+ADJUSTMENT_TOLERANCE = 1e-3
+
+
+class PriceMatrix:
+    """
+    tickers x days arrays on a shared date index
+    """
+    def __init__(self):
+        self.dates = np.array([], dtype='datetime64[D]')
+        self.tickers = []
+        self._rows = {}
+        self._spans = {}  # ticker -> (first, last + 1) column of its valid closes
+        self.data = {field: np.empty((0, 0), dtype=FIELD_DTYPES[field]) for field in FIELDS}
+        self._lock = threading.RLock()
+
+    @classmethod
+    def from_histories(cls, histories):
+        """
+        Build a matrix from OHLCV frames
+
+        Args:
+            histories (dict): Ticker -> OHLCV frame indexed by date
+
+        Returns:
+            PriceMatrix: Matrix holding all non-empty histories
+        """
+        matrix = cls()
+        matrix.upsert(histories)
+        return matrix
+
+    def __len__(self):
+        return len(self.tickers)
+
+    def __contains__(self, ticker):
+        return ticker in self._rows
+
+    @property
+    def lock(self):
+        """
+        Lock held by upsert() while it replaces arrays, spans and dates
+
+        Hold it while reading several of them together so they stay consistent.
+        """
+        return self._lock
+
+    @property
+    def nbytes(self):
+        """Bytes used by the value arrays"""
+        return sum(values.nbytes for values in self.data.values()) + self.dates.nbytes
+
+    def _reindex_dates(self, new_dates):
+        """Move all rows onto a larger date index"""
+        positions = np.searchsorted(new_dates, self.dates)
+        capacity = self.data['close'].shape[0]
+        for field in FIELDS:
+            values = np.full((capacity, len(new_dates)), np.nan, dtype=FIELD_DTYPES[field])
+            values[:, positions] = self.data[field]
+            self.data[field] = values
+        self._spans = {
+            ticker: (int(positions[first]), int(positions[end - 1]) + 1) for ticker, (first, end) in self._spans.items()
+        }
+        self.dates = new_dates
+
+    def _add_row(self, ticker):
+        """Append an empty row, growing the arrays geometrically"""
+        row = len(self.tickers)
+        capacity = self.data['close'].shape[0]
+        if row >= capacity:
+            new_capacity = max(16, capacity * 2)
+            for field in FIELDS:
+                values = np.full((new_capacity, len(self.dates)), np.nan, dtype=FIELD_DTYPES[field])
+                values[:capacity] = self.data[field]
+                self.data[field] = values
+        self.tickers.append(ticker)
+        self._rows[ticker] = row
+        return row
+
+    def upsert(self, histories):
+        """
+        Merge OHLCV frames into the matrix
+
+        Bars are written at their dates and existing bars outside the frame's
+        range are kept, so a shorter period never truncates a longer one that
+        is already loaded. If the first overlapping close differs (the source
+        re-adjusted prices for a split or dividend), the row is replaced.
+
+        Args:
+            histories (dict): Ticker -> OHLCV frame indexed by date
+
+        Returns:
+            int: Number of tickers whose row changed
+        """
+        histories = {ticker: history for ticker, history in histories.items() if not history.empty}
+        if not histories:
+            return 0
+
+        with self._lock:
+            incoming = {ticker: history.index.values.astype('datetime64[D]') for ticker, history in histories.items()}
+            new_dates = np.union1d(self.dates, np.concatenate(list(incoming.values())))
+            if len(new_dates) != len(self.dates):
+                self._reindex_dates(new_dates)
+
+            changed = 0
+            for ticker, history in histories.items():
+                positions = np.searchsorted(self.dates, incoming[ticker])
+                closes = history['Close'].to_numpy(dtype=DTYPE)
+                row = self._rows.get(ticker)
+                if row is None:
+                    row = self._add_row(ticker)
+                else:
+                    current = self.data['close'][row, positions]
+                    if np.array_equal(current, closes, equal_nan=True):
+                        continue
+                    first = current[0]
+                    if not np.isnan(first) and abs(closes[0] / first - 1) > ADJUSTMENT_TOLERANCE:
+                        for field in FIELDS:
+                            self.data[field][row] = np.nan
+
+                for field in FIELDS:
+                    column = FRAME_COLUMNS[field]
+                    if column in history:
+                        self.data[field][row, positions] = history[column].to_numpy(dtype=FIELD_DTYPES[field])
+                valid = np.flatnonzero(~np.isnan(self.data['close'][row]))
+                self._spans[ticker] = (int(valid[0]), int(valid[-1]) + 1)
+                changed += 1
+            return changed
+
+    def span(self, ticker):
+        """
+        Columns of a ticker's valid history
+
+        Returns:
+            tuple: (first column, last column + 1)
+        """
+        return self._spans[ticker]
+
+    def row(self, ticker, field='close'):
+        """
+        Zero-copy view of a ticker's values over its valid history
+
+        Args:
+            ticker (str): Ticker symbol
+            field (str, optional): One of FIELDS
+
+        Returns:
+            numpy.ndarray: View into the matrix
+        """
+        first, end = self._spans[ticker]
+        return self.data[field][self._rows[ticker], first:end]
+
+    def row_dates(self, ticker):
+        """Date index view matching row()"""
+        first, end = self._spans[ticker]
+        return self.dates[first:end]
+
+    def block(self, tickers, field='close'):
+        """
+        Values of several tickers over the whole date index
+
+        Args:
+            tickers (list): Ticker symbols
+            field (str, optional): One of FIELDS
+
+        Returns:
+            numpy.ndarray: len(tickers) x days array (a view when the rows are consecutive)
+        """
+        rows = [self._rows[ticker] for ticker in tickers]
+        if rows and rows == list(range(rows[0], rows[0] + len(rows))):
+            return self.data[field][rows[0]:rows[-1] + 1]
+        return self.data[field][rows]
+
+    def has_gaps(self, ticker):
+        """Whether a ticker has missing days inside its history (another exchange calendar)"""
+        return bool(np.isnan(self.row(ticker)).any())
+
+    def frame(self, ticker):
+        """
+        OHLCV DataFrame of a ticker (copies; for code that needs pandas)
+
+        Returns:
+            pandas.DataFrame: Frame in the layout of yfinance history without missing days
+        """
+        values = {FRAME_COLUMNS[field]: self.row(ticker, field) for field in FIELDS}
+        frame = pd.DataFrame(values, index=pd.DatetimeIndex(self.row_dates(ticker)))
+        return frame[frame['Close'].notna()]
+
+    def save(self, directory):
+        """
+        Write the matrix as .npy files that load() can memory-map
+
+        Args:
+            directory (str): Target directory
+        """
+        with self._lock:
+            os.makedirs(directory, exist_ok=True)
+            count = len(self.tickers)
+            for field in FIELDS:
+                np.save(os.path.join(directory, f"{field}.npy"), np.ascontiguousarray(self.data[field][:count]))
+            np.save(os.path.join(directory, "dates.npy"), self.dates)
+            with open(os.path.join(directory, "tickers.json"), 'w', encoding='utf-8') as f:
+                json.dump({'tickers': self.tickers, 'spans': self._spans}, f)
+
+    @classmethod
+    def load(cls, directory, mmap=True):
+        """
+        Load a matrix written by save()
+
+        Args:
+            directory (str): Directory written by save()
+            mmap (bool, optional): Memory-map the arrays copy-on-write instead of reading them
+
+        Returns:
+            PriceMatrix: Loaded matrix
+        """
+        matrix = cls()
+        mode = 'c' if mmap else None
+        with open(os.path.join(directory, "tickers.json"), 'r', encoding='utf-8') as f:
+            index = json.load(f)
+        matrix.tickers = index['tickers']
+        matrix._rows = {ticker: row for row, ticker in enumerate(matrix.tickers)}
+        matrix._spans = {ticker: tuple(span) for ticker, span in index['spans'].items()}
+        matrix.dates = np.load(os.path.join(directory, "dates.npy"))
+        for field in FIELDS:
+            values = np.load(os.path.join(directory, f"{field}.npy"), mmap_mode=mode)
+            if values.dtype != FIELD_DTYPES[field]:
+                values = values.astype(FIELD_DTYPES[field])  # saved before the dtype changed
+            matrix.data[field] = values
+        logger.info(f"Loaded price matrix with {len(matrix)} tickers x {len(matrix.dates)} days from {directory}")
+        return matrix
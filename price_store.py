@@ -0,0 +1,356 @@
+"""
+Local store of daily OHLCV bars with incremental history fetch
+
+Daily bars are kept per ticker in SQLite (WAL mode, so the web app and the
+scheduler can read while one of them writes). A history request only goes to
+the network for the part of the date range the store does not cover yet: older
+bars when a longer period is asked for the first time, and the bars since the
+last stored day once the refresh interval has passed. Everything else is read
+from disk. Tickers that are missing the same range are downloaded together in
+one multi-symbol request.
+
+Prices are split/dividend adjusted by the data source, so when a refresh finds
+that the last stored close no longer matches the source, the ticker's whole
+covered range is fetched again.
+
+A ticker the source has no bars for (unknown or delisted) gets a coverage row
+without bars, so it is asked for again only after the refresh interval instead
+of on every request.
+"""
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from contextlib import ExitStack, contextmanager
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+from config import PRICE_STORE_PATH, PRICE_STORE_REFRESH_SECONDS
+from data_providers import OHLCV_COLUMNS, get_data_provider, normalize_history, provider_path
+
+logger = logging.getLogger(__name__)
+
+# Relative close difference on the overlapping day that signals a price adjustment
+ADJUSTMENT_TOLERANCE = 0.005
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS daily_bars (
+    ticker TEXT NOT NULL,
+    date TEXT NOT NULL,
+    open REAL,
+    high REAL,
+    low REAL,
+    close REAL NOT NULL,
+    volume REAL,
+    PRIMARY KEY (ticker, date)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS coverage (
+    ticker TEXT PRIMARY KEY,
+    start_date TEXT,
+    is_max INTEGER NOT NULL DEFAULT 0,
+    fetched_at REAL NOT NULL
+);
+"""
+
+_PERIOD_OFFSETS = {
+    'mo': lambda n: pd.DateOffset(months=n),
+    'y': lambda n: pd.DateOffset(years=n),
+}
+
+
+def period_start(period, today=None):
+    """
+    First calendar date covered by a yfinance-style period
+
+    Args:
+        period (str): '5d', '1mo', '6mo', '1y', '10y', 'ytd' or 'max'
+        today (date, optional): Reference date, defaults to today
+
+    Returns:
+        date: Start date
+        None: For 'max'
+    """
+    today = today or date.today()
+    if period == 'max':
+        return None
+    if period == 'ytd':
+        return date(today.year, 1, 1)
+    if period.endswith('d'):
+        # Trading days: look back far enough to cover weekends and holidays
+        days = int(period[:-1])
+        return today - timedelta(days=days * 7 // 5 + 7)
+    for suffix, offset in _PERIOD_OFFSETS.items():
+        if period.endswith(suffix) and period[:-len(suffix)].isdigit():
+            return (pd.Timestamp(today) - offset(int(period[:-len(suffix)]))).date()
+    raise ValueError(f"Unsupported period: {period}")
+
+
+class PriceStore:
+    """
+    SQLite store of daily bars that fills gaps from a fetch function
+    """
+    def __init__(self, db_path=PRICE_STORE_PATH, fetch=None, fetch_many=None, refresh_seconds=PRICE_STORE_REFRESH_SECONDS):
+        """
+        Initialize the store
+
+        Args:
+            db_path (str, optional): SQLite database path
+            fetch (callable, optional): (ticker, start, end) -> OHLCV frame; defaults to the data provider
+            fetch_many (callable, optional): (tickers, start, end) -> {ticker: OHLCV frame}; defaults to the data provider
+            refresh_seconds (int, optional): Minimum time between fetches of new bars per ticker
+        """
+        self.db_path = db_path
+        provider = get_data_provider() if fetch is None or fetch_many is None else None
+        self.fetch = fetch or provider.history
+        self.fetch_many = fetch_many or provider.history_many
+        self.refresh_seconds = refresh_seconds
+        self._write_lock = threading.Lock()
+        self._ticker_locks = defaultdict(threading.Lock)
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _coverage(self, conn, ticker):
+        row = conn.execute(
+            "SELECT start_date, is_max, fetched_at FROM coverage WHERE ticker = ?", (ticker,)
+        ).fetchone()
+        if row is None:
+            return None
+        return {
+            'start': date.fromisoformat(row[0]) if row[0] else None,
+            'is_max': bool(row[1]),
+            'fetched_at': row[2],
+        }
+
+    def _write(self, ticker, frame, start, is_max, replace=False):
+        """Store bars and update the ticker's coverage in one transaction"""
+        rows = list(zip(
+            [ticker] * len(frame),
+            frame.index.strftime('%Y-%m-%d'),
+            *(frame[column].astype(float).where(frame[column].notna(), None) for column in OHLCV_COLUMNS)
+        ))
+        with self._write_lock, self._connect() as conn:
+            if replace:
+                conn.execute("DELETE FROM daily_bars WHERE ticker = ?", (ticker,))
+            conn.executemany(
+                "INSERT OR REPLACE INTO daily_bars (ticker, date, open, high, low, close, volume) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO coverage (ticker, start_date, is_max, fetched_at) VALUES (?, ?, ?, ?)",
+                (ticker, start.isoformat() if start else None, int(is_max), time.time())
+            )
+
+    def _last_bar(self, conn, ticker):
+        return conn.execute(
+            "SELECT date, close FROM daily_bars WHERE ticker = ? ORDER BY date DESC LIMIT 1", (ticker,)
+        ).fetchone()
+
+    def _plan(self, ticker, start):
+        """
+        Date ranges a ticker is missing for a period starting at start
+
+        Returns:
+            list: (kind, start, end) requests, kind is 'full', 'older' or 'newer'
+        """
+        with self._connect() as conn:
+            coverage = self._coverage(conn, ticker)
+            last_bar = self._last_bar(conn, ticker)
+        if coverage is None:
+            return [('full', start, None)]
+        if last_bar is None:
+            # The source had no bars last time: ask again after the refresh interval or for a longer period
+            stale = time.time() - coverage['fetched_at'] >= self.refresh_seconds
+            longer = not coverage['is_max'] and (start is None or start < coverage['start'])
+            return [('full', start, None)] if stale or longer else []
+
+        requests = []
+        # Older bars than the store has
+        if not coverage['is_max'] and (start is None or start < coverage['start']):
+            requests.append(('older', start, coverage['start']))
+        # New bars since the last stored day (the last day is fetched again, it may have been partial)
+        if time.time() - coverage['fetched_at'] >= self.refresh_seconds:
+            requests.append(('newer', date.fromisoformat(last_bar[0]), None))
+        return requests
+
+    def _apply(self, ticker, kind, start, frame):
+        """Store the bars fetched for one planned request"""
+        if kind == 'full':
+            self._write(ticker, frame, start, start is None, replace=True)
+            return
+        if kind == 'older':
+            self._write(ticker, frame, start, start is None)
+            return
+
+        with self._connect() as conn:
+            coverage = self._coverage(conn, ticker)
+            last_bar = self._last_bar(conn, ticker)
+        covered_start, is_max = coverage['start'], coverage['is_max']
+        overlap = frame['Close'].get(pd.Timestamp(last_bar[0]))
+        if overlap is not None and abs(overlap / last_bar[1] - 1) > ADJUSTMENT_TOLERANCE:
+            logger.info(f"Price adjustment detected for {ticker}, refetching stored history")
+            self._write(ticker, self.fetch(ticker, covered_start, None), covered_start, is_max, replace=True)
+        else:
+            self._write(ticker, frame, covered_start, is_max)
+
+    def sync_many(self, tickers, period='1y'):
+        """
+        Fetch whatever part of a period the store does not have yet for many tickers
+
+        Tickers missing the same date range are downloaded together with one
+        multi-symbol request. Network errors are logged and the stored bars are
+        used as they are.
+
+        Args:
+            tickers (list): Ticker symbols
+            period (str, optional): Period that must be covered
+
+        Returns:
+            int: Number of bars fetched
+        """
+        tickers = sorted({ticker.upper() for ticker in tickers})
+        start = period_start(period)
+        fetched = 0
+        with ExitStack() as stack:
+            for ticker in tickers:
+                stack.enter_context(self._ticker_locks[ticker])
+
+            groups = defaultdict(list)
+            for ticker in tickers:
+                for kind, range_start, range_end in self._plan(ticker, start):
+                    groups[(range_start, range_end)].append((ticker, kind))
+
+            for (range_start, range_end), requests in groups.items():
+                symbols = [ticker for ticker, _ in requests]
+                try:
+                    if len(symbols) == 1:
+                        frames = {symbols[0]: self.fetch(symbols[0], range_start, range_end)}
+                    else:
+                        frames = self.fetch_many(symbols, range_start, range_end)
+                except Exception as e:
+                    logger.warning(f"Could not fetch bars for {', '.join(symbols)}, using stored data: {e}")
+                    continue
+
+                for ticker, kind in requests:
+                    frame = frames.get(ticker)
+                    if kind == 'full' and (frame is None or frame.empty):
+                        logger.warning(f"No bars available for {ticker}, recording an empty sync")
+                        self._write(ticker, normalize_history(None), range_start, range_start is None, replace=True)
+                        continue
+                    if frame is None:
+                        logger.warning(f"No bars returned for {ticker}, using stored data")
+                        continue
+                    try:
+                        self._apply(ticker, kind, range_start, frame)
+                        fetched += len(frame)
+                    except Exception as e:
+                        logger.warning(f"Could not store bars for {ticker}: {e}")
+        return fetched
+
+    def sync(self, ticker, period='1y'):
+        """
+        Fetch whatever part of a period the store does not have yet
+
+        Args:
+            ticker (str): Ticker symbol
+            period (str, optional): Period that must be covered
+
+        Returns:
+            int: Number of bars fetched
+        """
+        return self.sync_many([ticker], period)
+
+    def read(self, ticker, period='1y'):
+        """
+        Read stored bars for a period without touching the network
+
+        Returns:
+            pandas.DataFrame: OHLCV frame indexed by date (empty if nothing is stored)
+        """
+        ticker = ticker.upper()
+        query = "SELECT date, open, high, low, close, volume FROM daily_bars WHERE ticker = ?"
+        params = [ticker]
+        if period.endswith('d') and period[:-1].isdigit():
+            query += " ORDER BY date DESC LIMIT ?"
+            params.append(int(period[:-1]))
+        else:
+            start = period_start(period)
+            if start is not None:
+                query += " AND date >= ?"
+                params.append(start.isoformat())
+            query += " ORDER BY date"
+
+        with self._connect() as conn:
+            rows = conn.execute(query, params).fetchall()
+        if not rows:
+            return normalize_history(None)
+        if query.endswith("LIMIT ?"):
+            rows.reverse()
+
+        dates, *columns = zip(*rows)
+        values = np.array(columns, dtype=float).T
+        return pd.DataFrame(values, index=pd.DatetimeIndex(dates), columns=OHLCV_COLUMNS)
+
+    def history(self, ticker, period='1y'):
+        """
+        Daily bars for a period, fetching only what the store is missing
+
+        Args:
+            ticker (str): Ticker symbol
+            period (str, optional): yfinance-style period
+
+        Returns:
+            pandas.DataFrame: OHLCV frame in the layout of yfinance history
+        """
+        self.sync(ticker, period)
+        return self.read(ticker, period)
+
+    def history_many(self, tickers, period='1y'):
+        """
+        Daily bars of many tickers, downloading missing ranges in batches
+
+        Args:
+            tickers (list): Ticker symbols
+            period (str, optional): yfinance-style period
+
+        Returns:
+            dict: Ticker -> OHLCV frame (empty frame if no bars are available)
+        """
+        self.sync_many(tickers, period)
+        return {ticker.upper(): self.read(ticker, period) for ticker in tickers}
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_price_store():
+    """
+    Shared PriceStore for this process, created on first use
+
+    Returns:
+        PriceStore: Store at config.PRICE_STORE_PATH (a separate file for offline data providers)
+    """
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = PriceStore(provider_path(PRICE_STORE_PATH))
+        return _store
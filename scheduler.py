@@ -8,10 +8,18 @@ from datetime import datetime, timedelta
 
 import schedule
 
-from config import SCHEDULE_HOUR, SCHEDULE_MINUTE, TICKERS
+from config import (
+    SCHEDULE_HOUR, SCHEDULE_MINUTE, TICKERS, OUTBOX_RESUME_HOURS, ALERT_ENABLED, ALERT_INTERVAL_MINUTES,
+    ALERT_STATE_PATH, INDICATOR_STATE_PATH, SCREENER_ENABLED
+)
+from alert_service import AlertService
+from data_providers import provider_path
+from indicator_state import IndicatorStates
+from screener import format_screener_summary, get_screener
 from scraper import ETFScraper
-from telegram_sender import send_message, send_html_content, send_chart_analysis
-from stock_data import get_stock_data
+from outbox import Outbox, new_run_id
+from telegram_sender import send_message, build_run_items, deliver_outbox
+from stock_data import get_stock_data_batch, prefetch_stock_info
 
 logger = logging.getLogger(__name__)
 
@@ -28,6 +36,12 @@ class ETFScraperScheduler:
         """
         self.tickers = tickers or TICKERS
         self.scraper = None
+        self.outbox = Outbox()
+        self.alerts = AlertService(
+            self.tickers,
+            states=IndicatorStates(provider_path(INDICATOR_STATE_PATH)),
+            state_path=provider_path(ALERT_STATE_PATH)
+        ) if ALERT_ENABLED else None
         
     async def run_scraper(self):
         """
@@ -35,13 +49,22 @@ class ETFScraperScheduler:
         """
         logger.info(f"Starting scheduled scraping task at {datetime.now()}")
         
+        # 이전 실행에서 전송하지 못한 메시지가 있으면 먼저 이어서 전송 (실패해도 오늘 브리핑은 계속 진행)
+        pending_run = self.outbox.find_resumable_run(max_age_hours=OUTBOX_RESUME_HOURS)
+        if pending_run:
+            logger.info(f"미전송 메시지가 남은 실행 재개: {pending_run}")
+            if not await deliver_outbox(self.outbox, pending_run):
+                logger.warning(f"이전 실행의 메시지가 아웃박스에 남아 있습니다: {self.outbox.stats(pending_run)}")
+        
+        prefetch_stock_info(self.tickers)  # 만료된 메타데이터를 백그라운드에서 일괄 갱신
+        
         try:
             self.scraper = ETFScraper()
             
             try:
                 # Use a timeout for the entire scraping operation (2 minutes)
                 results = await asyncio.wait_for(
-                    self.scraper.scrape_all_tickers(self.tickers),
+                    self.scraper.scrape_all_briefings(self.tickers),
                     timeout=120
                 )
                 
@@ -49,8 +72,8 @@ class ETFScraperScheduler:
                 print("\n" + "="*50)
                 print(f"ETF DAILY BRIEFINGS - {datetime.now().strftime('%Y-%m-%d')}")
                 print("="*50)
-                for result in results:
-                    print(f"\n{result}")
+                for briefing in results:
+                    print(f"\n{briefing.to_text()}")
                     print("-"*50)
                     
                 logger.info(f"Completed scraping task for {len(self.tickers)} tickers")
@@ -58,31 +81,19 @@ class ETFScraperScheduler:
                 # 텔레그램으로 전송
                 try:
                     logger.info("텔레그램으로 메시지 전송 시작")
-                    today_date = datetime.now().strftime("%Y년 %m월 %d일")
                     
-                    # 헤더 메시지 전송
-                    header_message = f"📊 <b>ETF 데일리 브리핑 ({today_date})</b>\n\n"
-                    await send_message(header_message)
+                    run_id = new_run_id()
                     
-                    # 각 ETF/주식 브리핑 전송
-                    for result in results:
-                        # 티커 추출 (결과의 첫 부분은 항상 "TICKER:"로 시작)
-                        ticker = result.split(':')[0].strip()
-                        
-                        # HTML 콘텐츠 가져오기 (스크래핑된 결과)
-                        html_content = result.replace(f"{ticker}:", "")
-                        await send_html_content(ticker, html_content)
-                        
-                        # 차트 분석 데이터 가져오기 및 전송
-                        try:
-                            chart_data = get_stock_data(ticker)
-                            if chart_data:
-                                await send_chart_analysis(ticker, chart_data)
-                        except Exception as e:
-                            logger.error(f"차트 데이터 전송 실패 ({ticker}): {e}")
-                        
-                        # 각 티커 사이에 약간의 시간 간격 추가
-                        await asyncio.sleep(1)
+                    # 차트 분석 데이터 가져오기 (모든 티커의 주가를 한 번에 받아 지표 계산)
+                    chart_datas = get_stock_data_batch([briefing.ticker for briefing in results])
+                    
+                    # 채팅별 전송 모드(full/digest)에 맞춰 렌더링
+                    items = build_run_items(results, chart_datas)
+                    
+                    # 아웃박스에 저장 후 전송 (실패한 항목은 재시도 작업에서 이어서 전송)
+                    self.outbox.enqueue_run(run_id, items)
+                    if not await deliver_outbox(self.outbox, run_id):
+                        logger.warning(f"일부 메시지가 아웃박스에 남아 있습니다: {self.outbox.stats(run_id)}")
                         
                     logger.info("텔레그램 메시지 전송 완료")
                     
@@ -140,6 +151,37 @@ class ETFScraperScheduler:
                 self.scraper.close()
                 self.scraper = None
     
+    async def retry_outbox(self):
+        """
+        Retry delivery of messages left in the outbox by a failed run
+        """
+        pending_run = self.outbox.find_resumable_run(max_age_hours=OUTBOX_RESUME_HOURS)
+        if pending_run:
+            logger.info(f"Retrying outbox delivery for run {pending_run}")
+            await deliver_outbox(self.outbox, pending_run)
+    
+    async def poll_alerts(self):
+        """
+        Poll quotes and send MA200 crossing alerts
+        """
+        try:
+            sent = await self.alerts.poll()
+            if sent:
+                logger.info(f"Sent {sent} price alerts")
+        except Exception as e:
+            logger.error(f"Alert polling error: {e}")
+    
+    async def run_screener(self):
+        """
+        Run the market-wide MA200 screener and send its Telegram summary
+        """
+        try:
+            result = await asyncio.to_thread(get_screener().run_if_stale)
+            if not await send_message(format_screener_summary(result)):
+                logger.warning("Failed to send screener summary")
+        except Exception as e:
+            logger.error(f"Screener error: {e}")
+    
     def schedule_daily_run(self):
         """
         Schedule daily execution at the configured time
@@ -151,6 +193,23 @@ class ETFScraperScheduler:
             lambda: asyncio.run(self.run_scraper())
         )
         
+        # 아웃박스에 남은 메시지는 5분마다 재전송 시도
+        schedule.every(5).minutes.do(
+            lambda: asyncio.run(self.retry_outbox())
+        )
+        
+        # 가격 알림 (MA200, MA200+10%, 지정 가격 돌파)
+        if self.alerts:
+            schedule.every(ALERT_INTERVAL_MINUTES).minutes.do(
+                lambda: asyncio.run(self.poll_alerts())
+            )
+        
+        # 시장 전체 MA200 스크리너 요약
+        if SCREENER_ENABLED:
+            schedule.every().day.at(f"{SCHEDULE_HOUR:02d}:{SCHEDULE_MINUTE:02d}").do(
+                lambda: asyncio.run(self.run_screener())
+            )
+        
         # Also run immediately for the first time
         logger.info("Running initial scraping job")
         asyncio.run(self.run_scraper())
@@ -19,6 +19,7 @@ from bs4 import BeautifulSoup
 from chromedriver_py import binary_path  # Use chromedriver-py for binary path
 
 from config import BROWSER_USER_AGENT
+from briefing import Briefing
 
 logger = logging.getLogger(__name__)
 
@@ -82,6 +83,19 @@ class ETFScraper:
         Returns:
             str: Formatted briefing text
         """
+        briefing = await self.get_zum_briefing_data(ticker)
+        return briefing.to_text()
+    
+    async def get_zum_briefing_data(self, ticker):
+        """
+        Retrieve daily briefing for a specific ticker as a structured object
+        
+        Args:
+            ticker (str): Ticker symbol (ETF or Stock)
+            
+        Returns:
+            Briefing: Extracted briefing (with a notice if nothing could be extracted)
+        """
         # Determine if it's a stock ticker
         if ticker in ["BLK", "IVZ"]:
             url = f"https://invest.zum.com/stock/{ticker}/"
@@ -284,9 +298,9 @@ class ETFScraper:
                                 
                             # Format stock info
                             if stock_name and price and change:
-                                # Format stock header with new style
-                                stock_header = f"\n\n━━━ {stock_name} ━━━\n${price} ({change}%)"
-                                stocks_info.append(stock_header)
+                                # Remove any unwanted characters like 'C' before date
+                                stock_name = stock_name.replace("C2025년", "2025년")
+                                stocks_info.append({'name': stock_name, 'price': price, 'change': change})
                             
                             # Get news link if available
                             news_div = item.find("div", class_="styles_article__0oE8K")
@@ -313,12 +327,11 @@ class ETFScraper:
                                     if news_link and not news_link.startswith("http"):
                                         news_link = f"https://invest.zum.com{news_link}"
                                     
-                                    # Format news item
-                                    news_item = f"{news_title_text} - {news_source_text}"
-                                    if news_link:
-                                        news_item = f"{news_item}\n    {news_link}"
-                                    
-                                    news_items.append(news_item)
+                                    news_items.append({
+                                        'title': news_title_text,
+                                        'source': news_source_text,
+                                        'url': news_link
+                                    })
                                     
                         except Exception as e:
                             logger.warning(f"Error extracting stock info: {e}")
@@ -386,60 +399,39 @@ class ETFScraper:
                                     # Reassemble the text with proper formatting
                                     briefing = main_text + "\n\n관련 뉴스:\n\n" + news_text
                         
-                        # Add empty line before stock information
-                        if stocks_info:
-                            for stock in stocks_info:
-                                # Remove any unwanted characters like 'C' before date
-                                if "C2025년" in stock:
-                                    stock = stock.replace("C2025년", "2025년")
-                                briefing += f"\n\n{stock}"
-                        
-                        # Add empty line before news items
-                        if news_items:
-                            briefing += "\n\n관련 뉴스:"
-                            for news in news_items:
-                                briefing += f"\n\n{news}"
-                                
-                        # Add extracted links from JavaScript
-                        if news_links:
-                            # Add header for links if not already added
-                            if "관련 뉴스:" not in briefing:
-                                briefing += "\n\n관련 뉴스 링크:"
-                            elif not news_items:  # if "관련 뉴스:" already exists but no news items
-                                briefing += "\n\n관련 뉴스 링크:"
-                            else:  # if news items exist, add subheader
-                                briefing += "\n\n뉴스 링크:"
-                                
-                            # Add up to 3 links to avoid cluttering
-                            for i, link in enumerate(news_links[:3]):
-                                briefing += f"\n{link}"
+                        # Stock information, news items and up to 3 links (to avoid cluttering)
+                        # are kept as separate parts of the briefing
+                        briefing = Briefing(
+                            ticker,
+                            text=briefing,
+                            stocks=stocks_info,
+                            news=news_items,
+                            links=news_links[:3]
+                        )
                     else:
                         briefing = None
                 else:
                     briefing = None
             else:
-                briefing = ""
+                text = ""
                 paragraphs = briefing_section.find_all('p', recursive=False)
                 if paragraphs:
                     for i, p in enumerate(paragraphs, 1):
-                        briefing += f"\n{i}. {p.get_text(strip=True)}"
+                        text += f"\n{i}. {p.get_text(strip=True)}"
                 else:
-                    briefing = briefing_section.text.strip()
+                    text = briefing_section.text.strip()
+                briefing = Briefing(ticker, text=text) if text else None
             
             if briefing:
                 logger.info(f"Successfully extracted briefing for {ticker}")
-                # Remove duplicate ticker header if it exists in the briefing
-                if briefing.startswith(f"{ticker}:"):
-                    # Remove the duplicate ticker prefix
-                    briefing = briefing.replace(f"{ticker}:", "", 1).strip()
-                return f"{ticker}:\n{briefing}"
+                return briefing
             else:
                 logger.warning(f"No briefing found for {ticker}")
-                return f"{ticker}: 브리핑 없음"
+                return Briefing(ticker, notice="브리핑 없음")
                 
         except Exception as e:
             logger.error(f"Error scraping data for {ticker}: {e}")
-            return f"{ticker}: 오류 발생 - {str(e)}"
+            return Briefing(ticker, notice=f"오류 발생 - {str(e)}")
     
     async def scrape_all_tickers(self, tickers):
         """
@@ -451,6 +443,19 @@ class ETFScraper:
         Returns:
             list: Results for each ticker
         """
+        briefings = await self.scrape_all_briefings(tickers)
+        return [briefing.to_text() for briefing in briefings]
+    
+    async def scrape_all_briefings(self, tickers):
+        """
+        Scrape briefings for all tickers as structured objects
+        
+        Args:
+            tickers (list): List of ticker symbols
+            
+        Returns:
+            list: Briefing for each ticker
+        """
         results = []
         
         for ticker in tickers:
@@ -461,29 +466,29 @@ class ETFScraper:
                 # For problematic tickers, use a pre-defined message if they time out
                 if ticker in ["IGV", "SOXL"]:
                     try:
-                        result = await asyncio.wait_for(self.get_zum_briefing(ticker), timeout)
+                        result = await asyncio.wait_for(self.get_zum_briefing_data(ticker), timeout)
                         results.append(result)
                     except asyncio.TimeoutError:
                         logger.warning(f"Timeout occurred while scraping {ticker}")
                         
                         # For IGV, provide a fallback message about timeout
                         if ticker == "IGV":
-                            fallback = f"{ticker}:\n데일리 브리핑\n\nISHARES TRUST EXPANDED TECH-SOFTWARE SECTOR ETF에 대한 브리핑을 가져오는 데 시간이 초과되었습니다. 수동으로 확인해주세요: https://invest.zum.com/etf/{ticker}/"
-                            results.append(fallback)
+                            fallback = f"데일리 브리핑\n\nISHARES TRUST EXPANDED TECH-SOFTWARE SECTOR ETF에 대한 브리핑을 가져오는 데 시간이 초과되었습니다. 수동으로 확인해주세요: https://invest.zum.com/etf/{ticker}/"
+                            results.append(Briefing(ticker, text=fallback))
                         # For SOXL, provide a fallback message
                         elif ticker == "SOXL":
-                            fallback = f"{ticker}:\n데일리 브리핑\n\nDIREXION SHARES ETF TRUST DAILY SEMICONDUCTOR BULL 3X SHS에 대한 브리핑을 가져오는 데 시간이 초과되었습니다. 수동으로 확인해주세요: https://invest.zum.com/etf/{ticker}/"
-                            results.append(fallback)
+                            fallback = f"데일리 브리핑\n\nDIREXION SHARES ETF TRUST DAILY SEMICONDUCTOR BULL 3X SHS에 대한 브리핑을 가져오는 데 시간이 초과되었습니다. 수동으로 확인해주세요: https://invest.zum.com/etf/{ticker}/"
+                            results.append(Briefing(ticker, text=fallback))
                 else:
                     # For normal tickers, process as usual
-                    result = await self.get_zum_briefing(ticker)
+                    result = await self.get_zum_briefing_data(ticker)
                     results.append(result)
                 
                 # Add a small delay between requests to avoid overloading the server
                 await asyncio.sleep(2)
             except Exception as e:
                 logger.error(f"Failed to process ticker {ticker}: {e}")
-                results.append(f"{ticker}: 오류 발생 - {str(e)}")
+                results.append(Briefing(ticker, notice=f"오류 발생 - {str(e)}"))
                 
         return results
     
@@ -0,0 +1,419 @@
+"""
+Market-wide MA200 screener
+
+Downloads recent daily bars for a large symbol list in batches (one
+multi-symbol provider request per batch, several batches in flight), loads them
+into one PriceMatrix and evaluates the MA200 and MA200+10% conditions for all
+symbols at once with array operations on the tickers x days close block:
+
+    1. valid closes of every row are right-aligned with one stable argsort, so
+       the last 201 columns hold each symbol's last 201 bars whatever its
+       calendar or listing date
+    2. MA200 today and yesterday are column means over that window
+    3. distance, above flags and crossings are element-wise comparisons
+
+Results are ranked by distance from the MA200 and shown on the /screener page
+and in a Telegram summary. Every run reports its throughput in symbols per
+second for the download and compute stages.
+"""
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date, datetime, timedelta
+
+import numpy as np
+
+from config import (
+    SCREENER_BATCH_SIZE, SCREENER_LOOKBACK_DAYS, SCREENER_RESULT_TTL, SCREENER_SYMBOLS_FILE, SCREENER_TOP_N,
+    SCREENER_WORKERS, TICKERS
+)
+from data_providers import get_data_provider
+from price_matrix import PriceMatrix
+
+logger = logging.getLogger(__name__)
+
+MA_WINDOW = 200
+PLUS10 = 1.1
+
+# Symbols whose last bar is older than this (delisted, halted) are left out of the ranking
+STALE_DAYS = 7
+
+
+def load_symbols(path=SCREENER_SYMBOLS_FILE, provider=None):
+    """
+    Symbol list to screen
+
+    Args:
+        path (str, optional): Text file with one symbol per line ('#' starts a comment)
+        provider (DataProvider, optional): Provider whose universe is used when the file is missing
+
+    Returns:
+        list: Upper-case symbols without duplicates, in file order
+    """
+    if path and os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            symbols = [line.split('#', 1)[0].strip().upper() for line in f]
+        return list(dict.fromkeys(symbol for symbol in symbols if symbol))
+
+    provider = provider or get_data_provider()
+    if hasattr(provider, 'symbols'):
+        return provider.symbols()
+    return list(TICKERS)
+
+
+def right_align(values):
+    """
+    Move the valid values of every row to the right end, keeping their order
+
+    Args:
+        values (numpy.ndarray): rows x columns array with NaN for missing values
+
+    Returns:
+        numpy.ndarray: Same shape, NaN first, then each row's valid values
+    """
+    order = np.argsort(~np.isnan(values), axis=1, kind='stable')
+    return np.take_along_axis(values, order, axis=1)
+
+
+def screen_block(close):
+    """
+    MA200 conditions of many symbols at once
+
+    Args:
+        close (numpy.ndarray): symbols x days closes on a shared date index (NaN for missing days)
+
+    Returns:
+        dict: Name -> array with one value per symbol: close, prev_close, ma200,
+            prev_ma200, ma200_plus10, distance, distance_plus10, above_ma200,
+            above_ma200_plus10, cross_ma200 and cross_plus10 (+1 crossed up,
+            -1 crossed down, 0 otherwise). MA200 is NaN for symbols with fewer
+            than 200 bars, prev_ma200 with fewer than 201.
+    """
+    window = MA_WINDOW + 1
+    aligned = right_align(close)[:, -window:].astype(np.float64)
+    if aligned.shape[1] < window:
+        padding = np.full((aligned.shape[0], window - aligned.shape[1]), np.nan)
+        aligned = np.hstack([padding, aligned])
+
+    last = aligned[:, -1]
+    prev = aligned[:, -2]
+    ma200 = aligned[:, 1:].mean(axis=1)
+    prev_ma200 = aligned[:, :-1].mean(axis=1)
+    ma200_plus10 = ma200 * PLUS10
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        above = last > ma200
+        above_plus10 = last > ma200_plus10
+        prev_above = prev > prev_ma200
+        prev_above_plus10 = prev > prev_ma200 * PLUS10
+        distance = (last / ma200 - 1) * 100
+        distance_plus10 = (last / ma200_plus10 - 1) * 100
+
+    return {
+        'close': last,
+        'prev_close': prev,
+        'ma200': ma200,
+        'prev_ma200': prev_ma200,
+        'ma200_plus10': ma200_plus10,
+        'distance': distance,
+        'distance_plus10': distance_plus10,
+        'above_ma200': above,
+        'above_ma200_plus10': above_plus10,
+        'cross_ma200': above.astype(np.int8) - prev_above.astype(np.int8),
+        'cross_plus10': above_plus10.astype(np.int8) - prev_above_plus10.astype(np.int8),
+    }
+
+
+def last_valid_dates(matrix, close):
+    """Date of each row's last valid close"""
+    valid = ~np.isnan(close)
+    last = close.shape[1] - 1 - np.argmax(valid[:, ::-1], axis=1)
+    dates = matrix.dates[last]
+    dates[~valid.any(axis=1)] = np.datetime64('NaT')
+    return dates
+
+
+class MA200Screener:
+    """
+    Batched, concurrent MA200 screener over a large symbol list
+    """
+    def __init__(self, provider=None, batch_size=SCREENER_BATCH_SIZE, workers=SCREENER_WORKERS,
+                 lookback_days=SCREENER_LOOKBACK_DAYS):
+        """
+        Initialize the screener
+
+        Args:
+            provider (DataProvider, optional): Source of daily bars (defaults to the configured provider)
+            batch_size (int, optional): Symbols per provider request
+            workers (int, optional): Batches downloaded concurrently
+            lookback_days (int, optional): Calendar days of bars to download
+        """
+        self.provider = provider or get_data_provider()
+        self.batch_size = batch_size
+        self.workers = workers
+        self.lookback_days = lookback_days
+        self.last_result = None
+        self._run_lock = threading.Lock()
+        self._thread = None
+        self._thread_lock = threading.Lock()
+
+    def download(self, symbols):
+        """
+        Download recent bars of all symbols in concurrent batches
+
+        Args:
+            symbols (list): Symbols to download
+
+        Returns:
+            tuple: ({symbol: OHLCV frame}, number of failed batches)
+        """
+        start = date.today() - timedelta(days=self.lookback_days)
+        batches = [symbols[i:i + self.batch_size] for i in range(0, len(symbols), self.batch_size)]
+        histories = {}
+        failed = 0
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="screener") as executor:
+            futures = {executor.submit(self.provider.history_many, batch, start): batch for batch in batches}
+            for future in as_completed(futures):
+                batch = futures[future]
+                try:
+                    histories.update(future.result())
+                except Exception as e:
+                    failed += 1
+                    logger.error(f"Screener download failed for {len(batch)} symbols ({batch[0]}...): {e}")
+        return histories, failed
+
+    def screen(self, histories):
+        """
+        Evaluate and rank downloaded histories
+
+        Args:
+            histories (dict): Symbol -> OHLCV frame
+
+        Returns:
+            tuple: (ranked rows, {'stale': count, 'short': count})
+        """
+        matrix = PriceMatrix.from_histories(histories)
+        if not len(matrix):
+            return [], {'stale': 0, 'short': 0}
+
+        close = matrix.block(matrix.tickers)
+        values = screen_block(close)
+        last_dates = last_valid_dates(matrix, close)
+        stale = last_dates < matrix.dates[-1] - np.timedelta64(STALE_DAYS, 'D')
+        short = np.isnan(values['prev_ma200'])
+        keep = np.flatnonzero(~stale & ~short)
+
+        order = keep[np.argsort(-values['distance'][keep], kind='stable')]
+        tickers = np.array(matrix.tickers)[order]
+        # Prices and distances are rounded to cents/0.01% so float32 matrix noise stays out of the rows
+        columns = {
+            name: (np.round(array[order], 2) if array.dtype.kind == 'f' else array[order]).tolist()
+            for name, array in values.items()
+        }
+        columns['last_date'] = np.datetime_as_string(last_dates[order]).tolist()
+        rows = [
+            {'rank': i + 1, 'ticker': ticker, **{name: column[i] for name, column in columns.items()}}
+            for i, ticker in enumerate(tickers.tolist())
+        ]
+        return rows, {'stale': int((stale & ~short).sum()), 'short': int(short.sum())}
+
+    def run(self, symbols=None):
+        """
+        Screen a symbol list
+
+        Args:
+            symbols (list, optional): Symbols to screen. Defaults to load_symbols().
+
+        Returns:
+            dict: {'generated_at', 'rows' (ranked by distance from MA200), 'stats'}
+        """
+        with self._run_lock:
+            return self._run(symbols)
+
+    def _run(self, symbols=None):
+        symbols = [symbol.upper() for symbol in (symbols or load_symbols(provider=self.provider))]
+        started = time.perf_counter()
+        histories, failed = self.download(symbols)
+        downloaded = time.perf_counter()
+        rows, skipped = self.screen(histories)
+        finished = time.perf_counter()
+
+        download_seconds = downloaded - started
+        compute_seconds = finished - downloaded
+        total_seconds = finished - started
+        stats = {
+            'symbols': len(symbols),
+            'with_data': len(histories),
+            'screened': len(rows),
+            'stale': skipped['stale'],
+            'short_history': skipped['short'],
+            'failed_batches': failed,
+            'above_ma200': sum(row['above_ma200'] for row in rows),
+            'above_ma200_plus10': sum(row['above_ma200_plus10'] for row in rows),
+            'crossed_up': sum(row['cross_ma200'] > 0 for row in rows),
+            'crossed_down': sum(row['cross_ma200'] < 0 for row in rows),
+            'download_seconds': round(download_seconds, 3),
+            'compute_seconds': round(compute_seconds, 3),
+            'total_seconds': round(total_seconds, 3),
+            'download_rate': round(len(symbols) / download_seconds, 1) if download_seconds else None,
+            'compute_rate': round(len(histories) / compute_seconds, 1) if compute_seconds else None,
+            'symbols_per_second': round(len(symbols) / total_seconds, 1) if total_seconds else None,
+        }
+        logger.info(
+            f"Screened {stats['screened']}/{stats['symbols']} symbols in {total_seconds:.1f}s "
+            f"({stats['symbols_per_second']} symbols/s; download {stats['download_rate']}/s, "
+            f"compute {stats['compute_rate']}/s)"
+        )
+        self.last_result = {'generated_at': datetime.now().isoformat(timespec='seconds'), 'rows': rows,
+                            'stats': stats}
+        return self.last_result
+
+    def is_fresh(self, max_age=SCREENER_RESULT_TTL):
+        """Whether the last result is younger than max_age seconds"""
+        result = self.last_result
+        if result is None:
+            return False
+        age = (datetime.now() - datetime.fromisoformat(result['generated_at'])).total_seconds()
+        return age <= max_age
+
+    def run_if_stale(self, max_age=SCREENER_RESULT_TTL):
+        """
+        New run unless the last result is younger than max_age seconds
+
+        Freshness is checked again after taking the run lock, so callers that
+        waited for a run in progress reuse its result instead of running again.
+
+        Returns:
+            dict: Screener result
+        """
+        with self._run_lock:
+            if self.is_fresh(max_age):
+                return self.last_result
+            return self._run()
+
+    def refresh_in_background(self, max_age=SCREENER_RESULT_TTL):
+        """
+        Start run_if_stale() in a background thread unless one is already running
+
+        Returns:
+            bool: True if a thread was started
+        """
+        with self._thread_lock:
+            if self._thread is not None and self._thread.is_alive():
+                return False
+            self._thread = threading.Thread(target=self._refresh, args=(max_age,), name="screener", daemon=True)
+            self._thread.start()
+            return True
+
+    def _refresh(self, max_age):
+        try:
+            self.run_if_stale(max_age)
+        except Exception as e:
+            logger.error(f"Background screener run failed: {e}")
+
+    @property
+    def running(self):
+        """Whether a background run is in progress"""
+        return self._thread is not None and self._thread.is_alive()
+
+
+def filter_rows(rows, condition='all'):
+    """
+    Rows matching a screener condition
+
+    Args:
+        rows (list): Ranked rows
+        condition (str, optional): 'all', 'above', 'below', 'plus10', 'crossed_up' or 'crossed_down'
+
+    Returns:
+        list: Matching rows in rank order
+    """
+    tests = {
+        'all': lambda row: True,
+        'above': lambda row: row['above_ma200'],
+        'below': lambda row: not row['above_ma200'],
+        'plus10': lambda row: row['above_ma200_plus10'],
+        'crossed_up': lambda row: row['cross_ma200'] > 0,
+        'crossed_down': lambda row: row['cross_ma200'] < 0,
+    }
+    if condition not in tests:
+        raise ValueError(f"Unknown screener condition: {condition}")
+    return [row for row in rows if tests[condition](row)]
+
+
+def format_screener_summary(result, top=SCREENER_TOP_N):
+    """
+    Telegram summary of a screener run
+
+    Args:
+        result (dict): Result of MA200Screener.run()
+        top (int, optional): Symbols listed per section
+
+    Returns:
+        str: HTML message
+    """
+    stats = result['stats']
+    rows = result['rows']
+    screened = stats['screened'] or 1
+    lines = [
+        f"📊 <b>MA200 스크리너 ({result['generated_at'][:10]})</b>",
+        "",
+        f"대상 {stats['symbols']:,}개 중 {stats['screened']:,}개 분석",
+        f"200일선 위: <b>{stats['above_ma200']:,}</b>개 ({stats['above_ma200'] / screened:.0%})",
+        f"200일선 +10% 위: <b>{stats['above_ma200_plus10']:,}</b>개 ({stats['above_ma200_plus10'] / screened:.0%})",
+        f"오늘 상향 돌파 {stats['crossed_up']:,}개 / 하향 이탈 {stats['crossed_down']:,}개",
+    ]
+
+    sections = [
+        ("⬆️ 200일선 상향 돌파", filter_rows(rows, 'crossed_up')),
+        ("⬇️ 200일선 하향 이탈", filter_rows(rows, 'crossed_down')),
+        ("🏆 200일선 대비 상위", rows),
+    ]
+    for title, section in sections:
+        if not section:
+            continue
+        lines += ["", f"<b>{title}</b>"]
+        for row in section[:top]:
+            lines.append(f"{row['rank']}. {row['ticker']} ${row['close']:.2f} ({row['distance']:+.1f}%)")
+
+    lines += ["", f"처리 속도: {stats['symbols_per_second']}개/초 (총 {stats['total_seconds']:.1f}초)"]
+    return "\n".join(lines)
+
+
+_screener = None
+_screener_lock = threading.Lock()
+
+
+def get_screener():
+    """
+    Shared MA200Screener for this process, created on first use
+
+    Returns:
+        MA200Screener: Screener on the configured data provider
+    """
+    global _screener
+    with _screener_lock:
+        if _screener is None:
+            _screener = MA200Screener()
+        return _screener
+
+
+if __name__ == "__main__":
+    import argparse
+    import asyncio
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+    parser = argparse.ArgumentParser(description="시장 전체 MA200 스크리너")
+    parser.add_argument("--symbols", default=SCREENER_SYMBOLS_FILE, help="심볼 목록 파일")
+    parser.add_argument("--top", type=int, default=SCREENER_TOP_N)
+    parser.add_argument("--send", action="store_true", help="텔레그램으로 요약 전송")
+    args = parser.parse_args()
+
+    screener = get_screener()
+    summary = format_screener_summary(screener.run(load_symbols(args.symbols, screener.provider)), args.top)
+    print(summary)
+    if args.send:
+        from telegram_sender import send_message
+        asyncio.run(send_message(summary))
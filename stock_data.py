@@ -2,11 +2,19 @@
 Stock/ETF data retrieval functions for charts and metrics
 """
 import logging
-import yfinance as yf
+import os
+import threading
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 
+from config import CHART_HISTORY_PERIOD, PRICE_MATRIX_DIR
+from downsample import downsample_chart_data
+from indicators import compute_indicators_for, latest_values
+from metadata_cache import get_metadata_cache
+from price_matrix import PriceMatrix
+from price_store import get_price_store, period_start
+
 # Configure logging
 logging.basicConfig(
     level=logging.DEBUG,
@@ -18,72 +26,275 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Chart prices are served in cents; the price matrix holds them as float32
+PRICE_DECIMALS = 2
+
+
+# Shared float32 price matrix of every ticker loaded in this process
+_price_matrix = None
+_price_matrix_lock = threading.Lock()
+# Ticker -> history periods read into the matrix since its last download
+_loaded_periods = {}
+
+
+def get_price_matrix():
+    """
+    Price matrix shared by charts, indicators and the API
+
+    With config.PRICE_MATRIX_DIR set, the matrix saved there is memory-mapped
+    on first use.
+
+    Returns:
+        PriceMatrix: Shared matrix
+    """
+    global _price_matrix
+    with _price_matrix_lock:
+        if _price_matrix is None:
+            _price_matrix = PriceMatrix()
+            if PRICE_MATRIX_DIR and os.path.exists(os.path.join(PRICE_MATRIX_DIR, "tickers.json")):
+                try:
+                    _price_matrix = PriceMatrix.load(PRICE_MATRIX_DIR, mmap=True)
+                except (OSError, ValueError) as e:
+                    logger.warning(f"Could not load price matrix from {PRICE_MATRIX_DIR}: {e}")
+        return _price_matrix
+
+
+def save_price_matrix():
+    """Write the shared matrix to config.PRICE_MATRIX_DIR (if configured)"""
+    if PRICE_MATRIX_DIR:
+        try:
+            get_price_matrix().save(PRICE_MATRIX_DIR)
+        except OSError as e:
+            logger.warning(f"Could not save price matrix to {PRICE_MATRIX_DIR}: {e}")
+
+
+# 'YYYY-MM-DD' strings by days since the epoch, shared by all tickers and requests
+_date_strings = {}
+
+
+def format_dates(index):
+    """
+    Format a DatetimeIndex as 'YYYY-MM-DD' strings
+
+    Each trading day is formatted once per process and looked up by its day
+    number afterwards, which is several times faster than strftime per request.
+
+    Args:
+        index (pandas.DatetimeIndex): Dates
+
+    Returns:
+        list: Date strings
+    """
+    days = index.values.astype('datetime64[D]').astype(np.int64).tolist()
+    get = _date_strings.get
+    return [get(day) or _date_strings.setdefault(day, str(np.datetime64(day, 'D'))) for day in days]
+
+
+def nullable_list(values, decimals=None):
+    """
+    Convert a float array to a JSON-ready list with NaN mapped to None
+
+    The array is converted with one tolist() call; only the NaN positions
+    (usually the leading moving average warm-up) are patched afterwards.
+
+    Args:
+        values (numpy.ndarray): Float values
+        decimals (int, optional): Round to this many decimals first
+
+    Returns:
+        list: Python floats and None
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if decimals is not None:
+        values = np.round(values, decimals)
+    result = values.tolist()
+    for i in np.flatnonzero(np.isnan(values)).tolist():
+        result[i] = None
+    return result
+
+
+def format_chart_data(history):
+    """
+    Format a history with moving averages for the chart
+
+    Works on the underlying numpy arrays: dates come from the per-day string
+    cache and NaN values become None (null in JSON).
+
+    Args:
+        history (pandas.DataFrame): Frame from indicators.compute_indicators
+
+    Returns:
+        dict: Stock data in chart-friendly format with moving averages
+    """
+    dates = format_dates(history.index)
+    columns = {
+        key: history[column].to_numpy(dtype=np.float64)
+        for key, column in (('prices', 'Close'), ('ma50', 'MA50'), ('ma200', 'MA200'), ('ma200_plus10', 'MA200_Plus10'))
+    }
+
+    # Get current values - NaN 값은 None
+    current = {key: float(values[-1]) if not np.isnan(values[-1]) else None for key, values in columns.items()}
+    current_rounded = {key: round(value, PRICE_DECIMALS) if value is not None else None for key, value in current.items()}
+    current_price = current['prices']
+    current_ma200 = current['ma200']
+    current_ma200_plus10 = current['ma200_plus10']
+
+    # Check if price is above MA200 and MA200+10% (None 값 처리)
+    is_above_ma200 = current_price > current_ma200 if current_price is not None and current_ma200 is not None else False
+    is_above_ma200_plus10 = current_price > current_ma200_plus10 if current_price is not None and current_ma200_plus10 is not None else False
+
+    return {
+        'dates': dates,
+        'prices': nullable_list(columns['prices'], PRICE_DECIMALS),
+        'ma50': nullable_list(columns['ma50'], PRICE_DECIMALS),
+        'ma200': nullable_list(columns['ma200'], PRICE_DECIMALS),
+        'ma200_plus10': nullable_list(columns['ma200_plus10'], PRICE_DECIMALS),
+        'current_price': current_rounded['prices'],
+        'current_ma50': current_rounded['ma50'],
+        'current_ma200': current_rounded['ma200'],
+        'current_ma200_plus10': current_rounded['ma200_plus10'],
+        'is_above_ma200': is_above_ma200,
+        'is_above_ma200_plus10': is_above_ma200_plus10,
+        'indicators': latest_values(history)
+    }
+
+
+def history_period(period):
+    """
+    Period of history to load for a chart period
+
+    Every chart period is a slice of one frame per ticker covering
+    CHART_HISTORY_PERIOD, so switching periods does not download anything and
+    the moving averages are warmed up before the first visible day. Periods
+    reaching further back load the full history.
+
+    Args:
+        period (str): Requested chart period
+
+    Returns:
+        str: Period to load from the price store
+    """
+    if period == 'max' or period_start(period) < period_start(CHART_HISTORY_PERIOD):
+        return 'max'
+    return CHART_HISTORY_PERIOD
+
+
+def slice_period(frame, period):
+    """
+    Rows of a date-indexed frame that fall in a period
+
+    Args:
+        frame (pandas.DataFrame): Frame indexed by date
+        period (str): yfinance-style period ('5d' means the last 5 bars)
+
+    Returns:
+        pandas.DataFrame: Slice of the frame
+    """
+    if period.endswith('d') and period[:-1].isdigit():
+        return frame.iloc[-int(period[:-1]):]
+    start = period_start(period)
+    if start is None:
+        return frame
+    return frame.iloc[frame.index.searchsorted(pd.Timestamp(start)):]
+
+
+def load_price_matrix(tickers, period):
+    """
+    Bring the shared price matrix up to date for tickers
+
+    Missing bars are downloaded with one multi-symbol request into the price
+    store; only tickers the matrix does not hold for this period yet (or all
+    of them after a fetch) are read back from disk.
+
+    Args:
+        tickers (list): Upper-case ticker symbols
+        period (str): History period to hold (e.g. '5y', 'max')
 
-def get_stock_data(ticker, period="1y"):
+    Returns:
+        PriceMatrix: Shared matrix containing the tickers that have data
+    """
+    store = get_price_store()
+    fetched = store.sync_many(tickers, period)
+
+    matrix = get_price_matrix()
+    with _price_matrix_lock:
+        stale = [t for t in tickers if fetched or period not in _loaded_periods.get(t, ())]
+    if stale:
+        if matrix.upsert({ticker: store.read(ticker, period) for ticker in stale}):
+            save_price_matrix()
+        with _price_matrix_lock:
+            for ticker in stale:
+                _loaded_periods[ticker] = {period} if fetched else _loaded_periods.get(ticker, set()) | {period}
+    return matrix
+
+
+def get_stock_data_batch(tickers, period="1y", max_points=None):
+    """
+    Get historical stock data for many tickers at once
+
+    Missing bars of all tickers are downloaded with one multi-symbol request
+    and merged into the shared float32 price matrix, and the indicators of all
+    tickers are computed together on it over the full loaded history (and
+    memoized). The requested period is a slice of that
+    result, so moving averages are available from its first day.
+
+    Args:
+        tickers (list): Stock ticker symbols
+        period (str): Time period, default: 1y (1 year)
+        max_points (int, optional): Downsample each series to at most this many points with LTTB
+
+    Returns:
+        dict: Ticker -> stock data as returned by get_stock_data (None if not available)
+    """
+    results = {ticker: None for ticker in tickers}
+    try:
+        symbols = list(dict.fromkeys(ticker.upper() for ticker in tickers))
+        matrix = load_price_matrix(symbols, history_period(period))
+        frames = compute_indicators_for(matrix, symbols)
+        for ticker in tickers:
+            frame = frames.get(ticker.upper())
+            if frame is None:
+                continue
+            try:
+                visible = slice_period(frame, period)
+                if not visible.empty:
+                    results[ticker] = downsample_chart_data(format_chart_data(visible), max_points)
+            except Exception as e:
+                logger.error(f"Error formatting stock data for {ticker}: {e}")
+    except Exception as e:
+        logger.error(f"Error getting stock data for {', '.join(tickers)}: {e}")
+        return results
+
+    for ticker, data in results.items():
+        if data is None:
+            logger.error(f"Failed to get data for {ticker}")
+    return results
+
+
+def get_stock_data(ticker, period="1y", max_points=None):
     """
     Get historical stock data for a ticker
 
     Args:
         ticker (str): Stock ticker symbol
         period (str): Time period, default: 1y (1 year)
+        max_points (int, optional): Downsample the series to at most this many points with LTTB.
+            Moving averages and current values are always computed on the full history.
 
     Returns:
         dict: Stock data in chart-friendly format with moving averages
         None: If error occurs
     """
-    try:
-        # Get stock data
-        stock = yf.Ticker(ticker)
-        history = stock.history(period=period)
-
-        if history.empty:
-            logger.error(f"Failed to get data for {ticker}")
-            return None
-
-        # Calculate moving averages
-        history['MA50'] = history['Close'].rolling(window=50).mean()
-        history['MA200'] = history['Close'].rolling(window=200).mean()
-        history['MA200_Plus10'] = history['MA200'] * 1.1
-
-        # Format data for the chart - NaN 값을 None으로 변환하여 JSON 직렬화 가능하게 만듦
-        dates = history.index.strftime('%Y-%m-%d').tolist()
-        prices = [float(x) if not pd.isna(x) else None for x in history['Close'].tolist()]
-        ma50 = [float(x) if not pd.isna(x) else None for x in history['MA50'].tolist()]
-        ma200 = [float(x) if not pd.isna(x) else None for x in history['MA200'].tolist()]
-        ma200_plus10 = [float(x) if not pd.isna(x) else None for x in history['MA200_Plus10'].tolist()]
-
-        # Get current values - NaN 값 처리
-        current_price = float(prices[-1]) if prices[-1] is not None else None
-        current_ma50 = float(ma50[-1]) if ma50[-1] is not None else None
-        current_ma200 = float(ma200[-1]) if ma200[-1] is not None else None
-        current_ma200_plus10 = float(ma200_plus10[-1]) if ma200_plus10[-1] is not None else None
-
-        # Check if price is above MA200 and MA200+10% (None 값 처리)
-        is_above_ma200 = current_price > current_ma200 if current_price is not None and current_ma200 is not None else False
-        is_above_ma200_plus10 = current_price > current_ma200_plus10 if current_price is not None and current_ma200_plus10 is not None else False
-
-        return {
-            'dates': dates,
-            'prices': prices,
-            'ma50': ma50,
-            'ma200': ma200,
-            'ma200_plus10': ma200_plus10,
-            'current_price': current_price,
-            'current_ma50': current_ma50,  # 이미 None으로 변환됨
-            'current_ma200': current_ma200,  # 이미 None으로 변환됨
-            'current_ma200_plus10': current_ma200_plus10,  # 이미 None으로 변환됨
-            'is_above_ma200': is_above_ma200,
-            'is_above_ma200_plus10': is_above_ma200_plus10
-        }
-    except Exception as e:
-        logger.error(f"Error getting stock data for {ticker}: {e}")
-        return None
+    return get_stock_data_batch([ticker], period, max_points)[ticker]
 
 
 def get_stock_info(ticker):
     """
     Get basic info about a stock/ETF
 
+    Served from the persistent metadata cache; stale fields are refreshed in
+    the background.
+
     Args:
         ticker (str): Stock ticker symbol
 
@@ -92,21 +303,21 @@ def get_stock_info(ticker):
         None: If error occurs
     """
     try:
-        # Get stock info
-        stock = yf.Ticker(ticker)
-        info = stock.info
-
-        # Return basic info
-        return {
-            'name': info.get('shortName', ticker),
-            'sector': info.get('sector', 'N/A'),
-            'industry': info.get('industry', 'N/A'),
-            'market_cap': info.get('marketCap', 'N/A'),
-            'pe_ratio': info.get('trailingPE', 'N/A'),
-            'dividend_yield': info.get('dividendYield', 'N/A'),
-            'beta': info.get('beta', 'N/A'),
-            'description': info.get('longBusinessSummary', 'N/A')
-        }
+        return get_metadata_cache().get(ticker)
     except Exception as e:
         logger.error(f"Error getting stock info for {ticker}: {e}")
-        return None
\ No newline at end of file
+        return None
+
+
+def prefetch_stock_info(tickers, wait=False):
+    """
+    Refresh missing or stale metadata for many tickers at once
+
+    Args:
+        tickers (list): Stock ticker symbols
+        wait (bool, optional): Block until all refreshes are done
+    """
+    try:
+        get_metadata_cache().prefetch(tickers, wait=wait)
+    except Exception as e:
+        logger.error(f"Error prefetching stock info: {e}")
@@ -6,15 +6,16 @@ import logging
 import re
 import asyncio
 import aiohttp
-import io
-import matplotlib.pyplot as plt
-import matplotlib.dates as mdates
-import numpy as np
 from datetime import datetime
-from matplotlib.dates import DateFormatter, MonthLocator
-from PIL import Image, ImageDraw, ImageFont
-import textwrap
 import html
+import json
+
+from chart_renderer import render_stock_chart, render_charts, render_chart_grid
+from config import DELIVERY_MODE, CHAT_DELIVERY_MODES
+from image_output import image_format, optimize_image, MIMETYPES
+from message_splitter import split_message
+from outbox import OutboxSender
+from text_rasterizer import render_text_card
 
 # 로깅 설정
 logging.basicConfig(
@@ -31,31 +32,88 @@ logger = logging.getLogger(__name__)
 BOT_TOKEN = os.environ.get("TELEGRAM_BOT_TOKEN")
 CHAT_ID = os.environ.get("TELEGRAM_CHAT_ID")
 
+# 텔레그램 Bot API 주소 (로컬 테스트 서버를 쓸 때 TELEGRAM_API_URL로 변경)
+TELEGRAM_API_URL = os.environ.get("TELEGRAM_API_URL", "https://api.telegram.org").rstrip('/')
+
+# HTML → 텍스트 정리용 정규식 (모듈 로드 시 한 번만 컴파일)
+_BLANK_LINES_RE = re.compile(r'\n\s*\n')
+_MULTI_SPACE_RE = re.compile(r'\s{2,}')
+_CSS_RULE_RE = re.compile(r'[.#]?[a-zA-Z0-9_-]+\s*\{[^}]*\}')
+_STYLE_ATTR_RE = re.compile(r'style=.*?["\']')
+_MEDIA_QUERY_RE = re.compile(r'@media.*?\{.*?\}', re.DOTALL)
+_CSS_LINE_RE = re.compile(r'^[.#]?[a-zA-Z0-9_-]+\s*\{')
+_TAG_RE = re.compile(r'<[^>]*>')
+
+# 429 (요청 한도 초과) 응답 시 retry_after 만큼 기다린 뒤 재시도하는 최대 횟수
+MAX_RATE_LIMIT_RETRIES = 3
+
+
+def _api_url(method):
+    """텔레그램 Bot API 메서드 URL"""
+    return f"{TELEGRAM_API_URL}/bot{BOT_TOKEN}/{method}"
 
-async def send_message(message_text, parse_mode='HTML'):
+
+async def _post_telegram(session, method, json_payload=None, form_factory=None):
+    """
+    텔레그램 API 호출 - 429 응답이면 retry_after 만큼 기다렸다가 재시도
+    
+    Args:
+        session (aiohttp.ClientSession): HTTP 세션
+        method (str): API 메서드 이름 (예: 'sendMessage')
+        json_payload (dict, optional): JSON 요청 본문
+        form_factory (callable, optional): 요청마다 새 aiohttp.FormData를 만드는 함수
+        
+    Returns:
+        tuple: (상태 코드, 응답 JSON 또는 None, 응답 텍스트)
+    """
+    url = _api_url(method)
+    for attempt in range(MAX_RATE_LIMIT_RETRIES + 1):
+        if form_factory is not None:
+            request = session.post(url, data=form_factory())
+        else:
+            request = session.post(url, json=json_payload)
+        
+        async with request as response:
+            text = await response.text()
+            try:
+                result = json.loads(text)
+            except ValueError:
+                result = None
+            
+            if response.status == 429 and attempt < MAX_RATE_LIMIT_RETRIES:
+                retry_after = 1
+                if result:
+                    retry_after = result.get("parameters", {}).get("retry_after", 1)
+                logger.warning(f"텔레그램 요청 한도 초과 ({method}), {retry_after}초 후 재시도")
+                await asyncio.sleep(retry_after)
+                continue
+            
+            return response.status, result, text
+
+
+async def send_message(message_text, parse_mode='HTML', chat_id=None):
     """
     텔레그램으로 메시지 전송 - HTTP API 직접 사용
     
     Args:
         message_text (str): 전송할 메시지 텍스트
         parse_mode (str, optional): 메시지 파싱 모드 ('HTML', 'Markdown', None). 기본값: 'HTML'
+        chat_id (str, optional): 전송할 채팅 ID. 기본값: TELEGRAM_CHAT_ID 환경 변수
         
     Returns:
         bool: 성공 여부
     """
-    if not BOT_TOKEN or not CHAT_ID:
+    chat_id = chat_id or CHAT_ID
+    if not BOT_TOKEN or not chat_id:
         logger.error("텔레그램 봇 토큰 또는 채팅 ID가 설정되지 않았습니다.")
         return False
     
-    # 텔레그램 API URL
-    url = f"https://api.telegram.org/bot{BOT_TOKEN}/sendMessage"
-    
     # 요청 데이터 - 챗_ID 형변환 (숫자값으로 간주)
     try:
-        chat_id = int(CHAT_ID)
+        chat_id = int(chat_id)
     except ValueError:
         # 문자열로 그대로 사용 (채널명, 사용자명 등)
-        chat_id = CHAT_ID
+        pass
         
     payload = {
         "chat_id": chat_id,
@@ -68,229 +126,287 @@ async def send_message(message_text, parse_mode='HTML'):
     
     try:
         async with aiohttp.ClientSession() as session:
-            async with session.post(url, json=payload) as response:
-                if response.status == 200:
-                    result = await response.json()
-                    if result.get("ok"):
-                        logger.info(f"텔레그램 메시지 전송 성공 (채팅 ID: {CHAT_ID})")
-                        return True
-                    else:
-                        logger.error(f"텔레그램 API 오류: {result.get('description')}")
-                else:
-                    # 응답 내용 확인하여 로깅
-                    try:
-                        error_content = await response.text()
-                        logger.error(f"텔레그램 API 응답 오류. 상태 코드: {response.status}, 내용: {error_content}")
-                    except:
-                        logger.error(f"텔레그램 API 응답 오류. 상태 코드: {response.status}")
+            status, result, error_content = await _post_telegram(session, "sendMessage", payload)
+            if status == 200 and result and result.get("ok"):
+                logger.info(f"텔레그램 메시지 전송 성공 (채팅 ID: {chat_id})")
+                return True
+            elif status == 200 and result:
+                logger.error(f"텔레그램 API 오류: {result.get('description')}")
+            else:
+                # 응답 내용 확인하여 로깅
+                logger.error(f"텔레그램 API 응답 오류. 상태 코드: {status}, 내용: {error_content}")
+            
+            # HTML 파싱 오류(400)일 때만 텍스트 모드로 재시도
+            if parse_mode == 'HTML' and status == 400:
+                logger.info("HTML 파싱 모드 실패, 일반 텍스트로 재시도")
+                # HTML 태그 제거
+                clean_text = _TAG_RE.sub('', message_text)
                 
-                # HTML 모드에서 실패하면 텍스트 모드로 재시도
-                if parse_mode == 'HTML':
-                    logger.info("HTML 파싱 모드 실패, 일반 텍스트로 재시도")
-                    # HTML 태그 제거
-                    clean_text = re.sub(r'<[^>]*>', '', message_text)
-                    
-                    # 요청 데이터 업데이트
-                    payload = {
-                        "chat_id": chat_id,  # 이미 변환된 chat_id 사용
-                        "text": clean_text
-                    }
-                    
-                    async with session.post(url, json=payload) as retry_response:
-                        if retry_response.status == 200:
-                            retry_result = await retry_response.json()
-                            if retry_result.get("ok"):
-                                logger.info("텍스트 모드로 메시지 전송 성공")
-                                return True
-                        
-                        try:
-                            retry_error = await retry_response.text()
-                            logger.error(f"텍스트 모드 재시도도 실패. 응답: {retry_error}")
-                        except:
-                            logger.error("텍스트 모드 재시도도 실패")
-                return False
+                # 요청 데이터 업데이트
+                payload = {
+                    "chat_id": chat_id,  # 이미 변환된 chat_id 사용
+                    "text": clean_text
+                }
+                
+                status, result, retry_error = await _post_telegram(session, "sendMessage", payload)
+                if status == 200 and result and result.get("ok"):
+                    logger.info("텍스트 모드로 메시지 전송 성공")
+                    return True
+                
+                logger.error(f"텍스트 모드 재시도도 실패. 응답: {retry_error}")
+            return False
                 
     except Exception as e:
         logger.error(f"텔레그램 메시지 전송 중 예외 발생: {e}")
         return False
 
 
-async def send_html_content(ticker, html_content):
+def format_link(href, link_text):
     """
-    HTML 콘텐츠를 텔레그램 메시지로 변환하여 전송
+    텔레그램 HTML 모드용 링크 태그 생성 (링크 텍스트와 주소 이스케이프)
     
     Args:
-        ticker (str): 티커 심볼
-        html_content (str): HTML 내용
+        href (str): 링크 주소
+        link_text (str): 링크 텍스트
         
     Returns:
-        bool: 성공 여부
+        str: <a> 태그 문자열
     """
-    try:
-        # BeautifulSoup으로 HTML 처리
-        from bs4 import BeautifulSoup
-        import re
-        import html as html_module
-        
-        soup = BeautifulSoup(html_content, 'html.parser')
-        
-        # 브리핑 제목 구성 (티커 + 날짜)
-        current_date = datetime.now().strftime("%Y년 %m월 %d일")
-        header = f"📈 <b>{ticker} 데일리 브리핑</b> ({current_date})\n\n"
-        
-        # 링크 추출
-        links = []
-        content_section = None
+    return f"<a href='{html.escape(href, quote=True)}'>{html.escape(link_text, quote=False)}</a>"
+
+
+def build_links_messages(ticker, links):
+    """
+    뉴스 링크 목록을 텔레그램 메시지로 구성 (한도를 넘으면 여러 메시지로 분할)
+    
+    Args:
+        ticker (str): 티커 심볼
+        links (list): format_link로 만든 링크 태그 목록
         
-        # 주요 콘텐츠 영역 찾기
-        for class_name in ['etf-content', 'etf-briefing', 'daily-briefing', 'article', 'content']:
-            found = soup.find(class_=lambda x: x and isinstance(x, str) and class_name in x.lower())
-            if found:
-                content_section = found
-                break
-                
-        # 콘텐츠 영역이 없으면 전체 문서 사용
-        target = content_section if content_section else soup
+    Returns:
+        list: 전송할 메시지 목록
+    """
+    if not links:
+        return []
+    
+    links_text = f"🔗 <b>{ticker} 뉴스 링크</b>\n\n"
+    for i, link in enumerate(links):  # 모든 링크 표시
+        links_text += f"{i+1}. {link}\n\n"
+    
+    return split_message(links_text, continuation_prefix="(계속) ")
+
+
+def render_html_content(ticker, html_content):
+    """
+    HTML 콘텐츠를 텔레그램 메시지 목록으로 변환 (전송하지 않음)
+    
+    Args:
+        ticker (str): 티커 심볼
+        html_content (str): HTML 내용
         
-        # 링크 추출 및 처리
-        link_elements = target.find_all('a', href=True)
-        for a in link_elements:
-            href = a['href']
-            # 상대 경로 링크는 전체 URL로 변환
-            if href.startswith('/'):
-                href = "https://invest.zum.com" + href
-                
-            # 앵커 링크나 자바스크립트 링크는 건너뛰기
-            elif href.startswith('#') or href.startswith('javascript:'):
-                continue
-                
-            # docid 파라미터가 있는 링크 확인 (뉴스 링크)
-            if 'docid=' in href or 'doctype=news' in href:
-                # 이미 완전한 URL 형태인지 확인
-                if not href.startswith('http'):
-                    # 티커 타입에 따라 URL 경로 다르게 구성
-                    base_url = f"https://invest.zum.com/{'etf' if ticker not in ['BLK', 'IVZ'] else 'stock'}/{ticker}/"
-                    href = f"{base_url}{href}"
-                
-                # 파라미터 확인 및 추가
-                if 'doctype=news' not in href:
-                    if '?' in href:
-                        href += '&doctype=news'
-                    else:
-                        href += '?doctype=news'
-                        
-                if 'docid=' not in href:
-                    href += '&docid=5384592'
-                    
-                if 'isdomestic=' not in href:
-                    href += '&isdomestic=false'
-                    
-                if 'istrending=' not in href:
-                    href += '&istrending=false'
-                
-            # 실제 URL만 포함
-            if href.startswith('http'):
-                link_text = a.get_text(strip=True) or href
-                # 빈 텍스트면 더 깊이 탐색해서 텍스트 추출 시도
-                if not link_text or len(link_text) < 3:
-                    # 링크 내부 요소들에서 텍스트 더 탐색
-                    inner_text = []
-                    for elem in a.find_all(text=True):
-                        if elem.strip():
-                            inner_text.append(elem.strip())
-                    if inner_text:
-                        link_text = ' '.join(inner_text)
-                
-                # 너무 긴 링크 텍스트는 자르기
-                if len(link_text) > 100:
-                    link_text = link_text[:97] + "..."
+    Returns:
+        tuple: (본문 메시지 목록, 링크 메시지 목록)
+    """
+    # BeautifulSoup으로 HTML 처리
+    from bs4 import BeautifulSoup
+    
+    soup = BeautifulSoup(html_content, 'html.parser')
+    
+    # 브리핑 제목 구성 (티커 + 날짜)
+    current_date = datetime.now().strftime("%Y년 %m월 %d일")
+    header = f"📈 <b>{ticker} 데일리 브리핑</b> ({current_date})\n\n"
+    
+    # 링크 추출
+    links = []
+    content_section = None
+    
+    # 주요 콘텐츠 영역 찾기
+    for class_name in ['etf-content', 'etf-briefing', 'daily-briefing', 'article', 'content']:
+        found = soup.find(class_=lambda x: x and isinstance(x, str) and class_name in x.lower())
+        if found:
+            content_section = found
+            break
+            
+    # 콘텐츠 영역이 없으면 전체 문서 사용
+    target = content_section if content_section else soup
+    
+    # 링크 추출 및 처리
+    link_elements = target.find_all('a', href=True)
+    for a in link_elements:
+        href = a['href']
+        # 상대 경로 링크는 전체 URL로 변환
+        if href.startswith('/'):
+            href = "https://invest.zum.com" + href
+            
+        # 앵커 링크나 자바스크립트 링크는 건너뛰기
+        elif href.startswith('#') or href.startswith('javascript:'):
+            continue
+            
+        # docid 파라미터가 있는 링크 확인 (뉴스 링크)
+        if 'docid=' in href or 'doctype=news' in href:
+            # 이미 완전한 URL 형태인지 확인
+            if not href.startswith('http'):
+                # 티커 타입에 따라 URL 경로 다르게 구성
+                base_url = f"https://invest.zum.com/{'etf' if ticker not in ['BLK', 'IVZ'] else 'stock'}/{ticker}/"
+                href = f"{base_url}{href}"
+            
+            # 파라미터 확인 및 추가
+            if 'doctype=news' not in href:
+                if '?' in href:
+                    href += '&doctype=news'
+                else:
+                    href += '?doctype=news'
                     
-                # 브리핑 원문 링크 정보 저장
-                links.append(f"<a href='{href}'>{link_text}</a>")
+            if 'docid=' not in href:
+                href += '&docid=5384592'
                 
-                # 텍스트에서는 '원문 보기' 표시로 변경
-                a.replace_with(f"[{link_text}]")
-        
-        # 본문 내용 추출 및 정리
-        body_text = target.get_text()
-        
-        # HTML 엔티티 처리
-        body_text = html_module.unescape(body_text)
-        
-        # 불필요한 공백/개행 제거
-        body_text = re.sub(r'\n\s*\n', '\n\n', body_text)  # 여러 줄 공백 정리
-        body_text = re.sub(r'\s{2,}', ' ', body_text)      # 연속된 공백 정리
-        
-        # CSS/스타일 관련 텍스트 제거
-        body_text = re.sub(r'[.#]?[a-zA-Z0-9_-]+\s*\{[^}]*\}', '', body_text)
-        body_text = re.sub(r'style=.*?["\']', '', body_text)
-        body_text = re.sub(r'@media.*?\{.*?\}', '', body_text, flags=re.DOTALL)
-        
-        # 내용 정리 - 줄 단위로 처리
-        clean_lines = []
-        for line in body_text.split('\n'):
-            line = line.strip()
-            if not line:
-                continue
-                
-            # CSS 선택자나 웹 코드로 보이는 줄 제거
-            if re.match(r'^[.#]?[a-zA-Z0-9_-]+\s*\{', line) or ('{' in line and '}' in line):
-                continue
+            if 'isdomestic=' not in href:
+                href += '&isdomestic=false'
                 
-            # 중요한 정보가 있는 줄만 유지
-            if len(line) > 3 and not line.startswith(('.', '#', '{')):
-                clean_lines.append(line)
+            if 'istrending=' not in href:
+                href += '&istrending=false'
+            
+        # 실제 URL만 포함
+        if href.startswith('http'):
+            link_text = a.get_text(strip=True) or href
+            # 빈 텍스트면 더 깊이 탐색해서 텍스트 추출 시도
+            if not link_text or len(link_text) < 3:
+                # 링크 내부 요소들에서 텍스트 더 탐색
+                inner_text = []
+                for elem in a.find_all(text=True):
+                    if elem.strip():
+                        inner_text.append(elem.strip())
+                if inner_text:
+                    link_text = ' '.join(inner_text)
+            
+            # 너무 긴 링크 텍스트는 자르기
+            if len(link_text) > 100:
+                link_text = link_text[:97] + "..."
                 
-        # 정리된 텍스트 구성
-        body_text = '\n'.join(clean_lines)
-        
-        # 전체 텍스트 만들기
-        full_message = header + body_text
-        
-        # 너무 길면 여러 메시지로 분할 (텔레그램 메시지 최대 길이: 약 4096자)
-        MAX_LENGTH = 3000  # 여유있게 설정
-        
-        # 메시지 청크로 분할
-        messages = []
-        remaining_text = full_message
+            # 브리핑 원문 링크 정보 저장
+            links.append(format_link(href, link_text))
+            
+            # 텍스트에서는 '원문 보기' 표시로 변경
+            a.replace_with(f"[{link_text}]")
+    
+    # 본문 내용 추출 및 정리
+    body_text = target.get_text()
+    
+    # HTML 엔티티 처리
+    body_text = html.unescape(body_text)
+    
+    # 불필요한 공백/개행 제거
+    body_text = _BLANK_LINES_RE.sub('\n\n', body_text)  # 여러 줄 공백 정리
+    body_text = _MULTI_SPACE_RE.sub(' ', body_text)      # 연속된 공백 정리
+    
+    # CSS/스타일 관련 텍스트 제거
+    body_text = _CSS_RULE_RE.sub('', body_text)
+    body_text = _STYLE_ATTR_RE.sub('', body_text)
+    body_text = _MEDIA_QUERY_RE.sub('', body_text)
+    
+    # 내용 정리 - 줄 단위로 처리
+    clean_lines = []
+    for line in body_text.split('\n'):
+        line = line.strip()
+        if not line:
+            continue
+            
+        # CSS 선택자나 웹 코드로 보이는 줄 제거
+        if _CSS_LINE_RE.match(line) or ('{' in line and '}' in line):
+            continue
+            
+        # 중요한 정보가 있는 줄만 유지
+        if len(line) > 3 and not line.startswith(('.', '#', '{')):
+            clean_lines.append(line)
+            
+    # 정리된 텍스트 구성
+    body_text = '\n'.join(clean_lines)
+    
+    # HTML 모드 전송 시 파싱 오류가 나지 않도록 본문 이스케이프
+    body_text = html.escape(body_text, quote=False)
+    
+    # 전체 텍스트 만들기
+    full_message = header + body_text
+    
+    # 텔레그램 한도(4096, UTF-16 기준)까지 문단 단위로 채워서 분할
+    messages = split_message(full_message, continuation_prefix="(계속) ")
+    
+    return messages, build_links_messages(ticker, links)
+
+
+def render_briefing(briefing):
+    """
+    스크래퍼가 만든 Briefing 객체를 텔레그램 HTML 메시지로 변환
+    
+    HTML을 다시 파싱하지 않고 구조화된 필드를 한 번에 순회하며 메시지를 구성함.
+    
+    Args:
+        briefing (Briefing): 스크래핑된 브리핑
         
-        # 첫 번째 메시지에는 헤더 포함
-        first_chunk = remaining_text[:MAX_LENGTH]
-        messages.append(first_chunk)
-        remaining_text = remaining_text[MAX_LENGTH:]
+    Returns:
+        tuple: (본문 메시지 목록, 링크 메시지 목록)
+    """
+    ticker = briefing.ticker
+    current_date = datetime.now().strftime("%Y년 %m월 %d일")
+    parts = [f"📈 <b>{ticker} 데일리 브리핑</b> ({current_date})"]
+    
+    if briefing.notice:
+        parts.append(f"\n\n{html.escape(briefing.notice, quote=False)}")
+    
+    # 본문: 빈 줄은 문단 구분으로 하나만 유지, 제목 줄("데일리 브리핑")은 헤더와 중복이라 생략
+    blank = True
+    for line in briefing.text.split('\n'):
+        line = line.strip()
+        if not line or line == "데일리 브리핑":
+            blank = True
+            continue
+        parts.append(f"\n\n{html.escape(line, quote=False)}" if blank else f"\n{html.escape(line, quote=False)}")
+        blank = False
+    
+    # 구성 종목
+    for stock in briefing.stocks:
+        parts.append(
+            f"\n\n━━━ <b>{html.escape(stock['name'], quote=False)}</b> ━━━\n"
+            f"${html.escape(stock['price'], quote=False)} ({html.escape(stock['change'], quote=False)}%)"
+        )
+    
+    # 관련 뉴스 (제목에 링크 연결)
+    if briefing.news:
+        parts.append("\n\n<b>관련 뉴스</b>")
+        for item in briefing.news:
+            title = format_link(item['url'], item['title']) if item.get('url') else html.escape(item['title'], quote=False)
+            parts.append(f"\n\n• {title} - {html.escape(item['source'], quote=False)}")
+    
+    messages = split_message(''.join(parts), continuation_prefix="(계속) ")
+    links = [format_link(url, url) for url in briefing.links]
+    return messages, build_links_messages(ticker, links)
+
+
+async def send_html_content(ticker, html_content):
+    """
+    HTML 콘텐츠를 텔레그램 메시지로 변환하여 전송
+    
+    Args:
+        ticker (str): 티커 심볼
+        html_content (str): HTML 내용
         
-        # 나머지 텍스트가 있으면 계속 분할
-        while remaining_text:
-            chunk = remaining_text[:MAX_LENGTH]
-            remaining_text = remaining_text[MAX_LENGTH:]
-            messages.append(chunk)
+    Returns:
+        bool: 성공 여부
+    """
+    try:
+        messages, links_messages = render_html_content(ticker, html_content)
             
         # 메시지 전송
         success = True
         for i, message in enumerate(messages):
-            # 첫 번째 메시지가 아니라면, 계속 표시
-            if i > 0:
-                message = "(계속) " + message
-                
             result = await send_message(message)
             if not result:
                 success = False
                 logger.error(f"메시지 {i+1}/{len(messages)} 전송 실패")
         
         # 링크가 있으면 별도 메시지로 전송
-        if links:
-            links_text = f"🔗 <b>{ticker} 뉴스 링크</b>\n\n"
-            for i, link in enumerate(links):  # 모든 링크 표시
-                links_text += f"{i+1}. {link}\n\n"
-                
-            # 링크 메시지가 너무 길면 분할
-            if len(links_text) > 4000:
-                # 최대 5개만 포함
-                links_text = f"🔗 <b>{ticker} 뉴스 링크</b> (최신 5개)\n\n"
-                for i, link in enumerate(links[:5]):
-                    links_text += f"{i+1}. {link}\n\n"
-            
-            await send_message(links_text)
+        for links_message in links_messages:
+            await send_message(links_message)
                 
         return success
         
@@ -299,7 +415,7 @@ async def send_html_content(ticker, html_content):
         return False
 
 
-async def send_photo(photo_bytes, caption=None, parse_mode=None):
+async def send_photo(photo_bytes, caption=None, parse_mode=None, chat_id=None):
     """
     텔레그램으로 이미지 전송
     
@@ -307,61 +423,80 @@ async def send_photo(photo_bytes, caption=None, parse_mode=None):
         photo_bytes (bytes): 이미지 바이트 데이터
         caption (str, optional): 이미지 설명
         parse_mode (str, optional): 캡션 파싱 모드 ('HTML', 'Markdown', None)
+        chat_id (str, optional): 전송할 채팅 ID. 기본값: TELEGRAM_CHAT_ID 환경 변수
         
     Returns:
         bool: 성공 여부
     """
-    if not BOT_TOKEN or not CHAT_ID:
+    chat_id = chat_id or CHAT_ID
+    if not BOT_TOKEN or not chat_id:
         logger.error("텔레그램 봇 토큰 또는 채팅 ID가 설정되지 않았습니다.")
         return False
     
-    # 텔레그램 API URL
-    url = f"https://api.telegram.org/bot{BOT_TOKEN}/sendPhoto"
-    
     # 요청 데이터 - 챗_ID 형변환 (숫자값으로 간주)
     try:
-        chat_id = int(CHAT_ID)
+        chat_id = int(chat_id)
     except ValueError:
         # 문자열로 그대로 사용 (채널명, 사용자명 등)
-        chat_id = CHAT_ID
+        pass
+    
+    def build_form():
+        form = aiohttp.FormData()
+        form.add_field('chat_id', str(chat_id))
+        fmt = image_format(photo_bytes) or 'png'
+        form.add_field('photo', photo_bytes, filename=f"chart.{'jpg' if fmt == 'jpeg' else fmt}",
+                       content_type=MIMETYPES.get(fmt, 'image/png'))
+        
+        if caption:
+            form.add_field('caption', caption)
+        
+        if parse_mode:
+            form.add_field('parse_mode', parse_mode)
+        return form
     
     try:
         async with aiohttp.ClientSession() as session:
-            form = aiohttp.FormData()
-            form.add_field('chat_id', str(chat_id))
-            form.add_field('photo', photo_bytes, filename='chart.png', content_type='image/png')
-            
-            if caption:
-                form.add_field('caption', caption)
-            
-            if parse_mode:
-                form.add_field('parse_mode', parse_mode)
-            
-            async with session.post(url, data=form) as response:
-                if response.status == 200:
-                    result = await response.json()
-                    if result.get("ok"):
-                        logger.info(f"텔레그램 이미지 전송 성공 (채팅 ID: {CHAT_ID})")
-                        return True
-                    else:
-                        logger.error(f"텔레그램 API 오류: {result.get('description')}")
-                else:
-                    # 응답 내용 확인하여 로깅
-                    try:
-                        error_content = await response.text()
-                        logger.error(f"텔레그램 API 응답 오류. 상태 코드: {response.status}, 내용: {error_content}")
-                    except:
-                        logger.error(f"텔레그램 API 응답 오류. 상태 코드: {response.status}")
-                return False
+            status, result, error_content = await _post_telegram(session, "sendPhoto", form_factory=build_form)
+            if status == 200 and result and result.get("ok"):
+                logger.info(f"텔레그램 이미지 전송 성공 (채팅 ID: {chat_id})")
+                return True
+            elif status == 200 and result:
+                logger.error(f"텔레그램 API 오류: {result.get('description')}")
+            else:
+                # 응답 내용 확인하여 로깅
+                logger.error(f"텔레그램 API 응답 오류. 상태 코드: {status}, 내용: {error_content}")
+            return False
     except Exception as e:
         logger.error(f"텔레그램 이미지 전송 중 예외 발생: {e}")
         return False
 
 
+def prepare_photo(image_bytes):
+    """
+    텔레그램 업로드용으로 이미지를 재인코딩 (config.IMAGE_OUTPUT_PROFILES['telegram'] 용량 예산 적용)
+    
+    Args:
+        image_bytes (bytes): 렌더링된 이미지 (PNG)
+        
+    Returns:
+        bytes: 업로드할 이미지 바이트 (None이면 None)
+    """
+    if not image_bytes:
+        return image_bytes
+    try:
+        return optimize_image(image_bytes, 'telegram').data
+    except Exception as e:
+        logger.warning(f"이미지 최적화 실패, 원본 전송: {e}")
+        return image_bytes
+
+
 def create_stock_chart(ticker, data):
     """
     Create stock/ETF chart image
     
+    Rendering is done by chart_renderer on a standalone Figure, so this is safe to
+    call from several threads at once.
+    
     Args:
         ticker (str): Ticker symbol
         data (dict): Chart data
@@ -369,81 +504,83 @@ def create_stock_chart(ticker, data):
     Returns:
         bytes: Image bytes data
     """
-    try:
-        # Prepare data
-        dates = [datetime.strptime(d, '%Y-%m-%d') for d in data.get('dates', [])]
-        prices = data.get('prices', [])
-        ma50 = data.get('ma50', [])
-        ma200 = data.get('ma200', [])
-        ma200_plus10 = data.get('ma200_plus10', [])
-        
-        # Set figure and background
-        plt.figure(figsize=(10, 6), facecolor='black')
-        plt.style.use('dark_background')
-        
-        # Set axes background
-        ax = plt.gca()
-        ax.set_facecolor('black')
-        
-        # Price graph
-        plt.plot(dates, prices, color='#00BFFF', linewidth=2, label='Price')
-        
-        # Moving averages
-        valid_ma50 = [(d, p) for d, p in zip(dates, ma50) if p is not None]
-        if valid_ma50:
-            ma50_dates, ma50_values = zip(*valid_ma50)
-            plt.plot(ma50_dates, ma50_values, color='#FFD700', linewidth=1.5, label='50-day MA')
-        
-        valid_ma200 = [(d, p) for d, p in zip(dates, ma200) if p is not None]
-        if valid_ma200:
-            ma200_dates, ma200_values = zip(*valid_ma200)
-            plt.plot(ma200_dates, ma200_values, color='#FF4500', linewidth=1.5, label='200-day MA')
-            
-        # Add 200-day MA +10% line
-        valid_ma200_plus10 = [(d, p) for d, p in zip(dates, ma200_plus10) if p is not None]
-        if valid_ma200_plus10:
-            ma200_plus10_dates, ma200_plus10_values = zip(*valid_ma200_plus10)
-            plt.plot(ma200_plus10_dates, ma200_plus10_values, color='#FF69B4', linewidth=1.5, linestyle='--', label='200-day MA +10%')
-        
-        # Graph style settings
-        plt.grid(True, alpha=0.3)
-        plt.title(f"{ticker} Price Chart (1Y)", fontsize=16, pad=10)
-        plt.ylabel("Price (USD)", fontsize=12)
-        
-        # X축 날짜 형식
-        plt.gca().xaxis.set_major_locator(mdates.MonthLocator())
-        plt.gca().xaxis.set_major_formatter(mdates.DateFormatter('%Y-%m'))
-        plt.xticks(rotation=45, fontsize=10, color='white')
-        plt.yticks(fontsize=10, color='white')
-        
-        # 축 가시성 향상
-        plt.gca().spines['left'].set_visible(True)
-        plt.gca().spines['left'].set_color('gray')
-        plt.gca().spines['bottom'].set_visible(True)
-        plt.gca().spines['bottom'].set_color('gray')
-        
-        # 눈금 표시 확실하게
-        plt.gca().tick_params(axis='x', colors='gray', length=5)
-        plt.gca().tick_params(axis='y', colors='gray', length=5)
-        
-        # 범례 가시성 향상
-        plt.legend(frameon=True, framealpha=0.8, fontsize=10)
-        
-        # 차트 주변 여백 확보
-        plt.tight_layout(pad=2.0)
-        
-        # 이미지를 바이트로 변환
-        img_buf = io.BytesIO()
-        plt.savefig(img_buf, format='png', dpi=100)
-        img_buf.seek(0)
-        img_bytes = img_buf.getvalue()
-        plt.close()
-        
-        return img_bytes
-    except Exception as e:
-        logger.error(f"차트 이미지 생성 실패: {e}")
-        plt.close()  # 에러 발생해도 figure 닫기
-        return None
+    return render_stock_chart(ticker, data)
+
+
+def render_run_charts(briefings, chart_datas):
+    """
+    실행에 포함된 모든 티커의 차트를 프로세스 풀에서 병렬로 한 번씩 렌더링
+    
+    Args:
+        briefings (list): Briefing 목록
+        chart_datas (dict): 티커별 get_stock_data 결과
+        
+    Returns:
+        dict: 티커별 차트 이미지 바이트 (렌더링 실패 시 None)
+    """
+    items = [(b.ticker, chart_datas[b.ticker]) for b in briefings if chart_datas.get(b.ticker)]
+    return dict(zip([ticker for ticker, _ in items], render_charts(items)))
+
+
+def render_chart_analysis(ticker, data, chart_bytes=None):
+    """
+    차트 분석 메시지와 차트 이미지를 생성 (전송하지 않음)
+    
+    Args:
+        ticker (str): 티커 심볼
+        data (dict): 차트 데이터
+        chart_bytes (bytes, optional): 미리 렌더링된 차트 이미지 (없으면 여기서 렌더링)
+        
+    Returns:
+        dict: 'message' (분석 메시지), 'chart' (업로드용 이미지 바이트 또는 None), 'caption' (이미지 캡션)
+    """
+    # 현재 가격과 이동평균선 정보
+    current_price = data.get('current_price', 0)
+    ma200 = data.get('current_ma200')
+    ma200_plus10 = data.get('current_ma200_plus10')
+    
+    # 메시지 생성
+    message = f"📈 <b>{ticker} 차트 분석</b>\n\n"
+    message += f"현재 가격: <b>${current_price:.2f}</b>\n"
+    
+    if ma200:
+        message += f"200일 이동평균: <b>${ma200:.2f}</b>\n"
+        # 가격이 MA200 위/아래 표시
+        if data.get('is_above_ma200', False):
+            message += "✅ 현재 가격이 200일 이동평균선 <b>위</b>에 있습니다.\n"
+        else:
+            message += "⚠️ 현재 가격이 200일 이동평균선 <b>아래</b>에 있습니다.\n"
+    
+    if ma200_plus10:
+        message += f"200일 이동평균 +10%: <b>${ma200_plus10:.2f}</b>\n"
+        # 가격이 MA200+10% 위/아래 표시
+        if data.get('is_above_ma200_plus10', False):
+            message += "🔥 현재 가격이 200일 이동평균 +10% <b>위</b>에 있습니다.\n"
+        else:
+            message += "📉 현재 가격이 200일 이동평균 +10% <b>아래</b>에 있습니다.\n"
+    
+    # 보조 지표 (get_stock_data가 계산한 마지막 일봉 기준 값)
+    indicators = data.get('indicators') or {}
+    indicator_lines = []
+    if indicators.get('rsi14') is not None:
+        indicator_lines.append(f"RSI(14): <b>{indicators['rsi14']:.1f}</b>")
+    if indicators.get('macd') is not None and indicators.get('macd_signal') is not None:
+        trend = "상승" if indicators['macd'] > indicators['macd_signal'] else "하락"
+        indicator_lines.append(f"MACD: <b>{indicators['macd']:.2f}</b> (시그널 {indicators['macd_signal']:.2f}, {trend} 우위)")
+    if indicators.get('bb_upper') is not None and indicators.get('bb_lower') is not None:
+        indicator_lines.append(f"볼린저 밴드: ${indicators['bb_lower']:.2f} ~ ${indicators['bb_upper']:.2f}")
+    if indicators.get('atr14') is not None:
+        indicator_lines.append(f"ATR(14): ${indicators['atr14']:.2f}")
+    if indicators.get('dist52whigh') is not None:
+        indicator_lines.append(f"52주 고가 대비: {indicators['dist52whigh']:+.1f}% / 저가 대비: {indicators['dist52wlow']:+.1f}%")
+    if indicator_lines:
+        message += "\n" + "\n".join(indicator_lines) + "\n"
+    
+    return {
+        'message': message,
+        'chart': prepare_photo(chart_bytes or create_stock_chart(ticker, data)),
+        'caption': f"{ticker} 1년 주가 차트"
+    }
 
 
 async def send_chart_analysis(ticker, data):
@@ -458,40 +595,14 @@ async def send_chart_analysis(ticker, data):
         bool: 성공 여부
     """
     try:
-        # 현재 가격과 이동평균선 정보
-        current_price = data.get('current_price', 0)
-        ma200 = data.get('current_ma200')
-        ma200_plus10 = data.get('current_ma200_plus10')
-        
-        # 메시지 생성
-        message = f"📈 <b>{ticker} 차트 분석</b>\n\n"
-        message += f"현재 가격: <b>${current_price:.2f}</b>\n"
-        
-        if ma200:
-            message += f"200일 이동평균: <b>${ma200:.2f}</b>\n"
-            # 가격이 MA200 위/아래 표시
-            if data.get('is_above_ma200', False):
-                message += "✅ 현재 가격이 200일 이동평균선 <b>위</b>에 있습니다.\n"
-            else:
-                message += "⚠️ 현재 가격이 200일 이동평균선 <b>아래</b>에 있습니다.\n"
-        
-        if ma200_plus10:
-            message += f"200일 이동평균 +10%: <b>${ma200_plus10:.2f}</b>\n"
-            # 가격이 MA200+10% 위/아래 표시
-            if data.get('is_above_ma200_plus10', False):
-                message += "🔥 현재 가격이 200일 이동평균 +10% <b>위</b>에 있습니다.\n"
-            else:
-                message += "📉 현재 가격이 200일 이동평균 +10% <b>아래</b>에 있습니다.\n"
+        analysis = render_chart_analysis(ticker, data)
         
         # 텍스트 메시지 먼저 전송
-        text_success = await send_message(message)
-        
-        # 차트 이미지 생성 및 전송
-        chart_bytes = create_stock_chart(ticker, data)
-        if chart_bytes:
-            # 차트 설명 캡션
-            caption = f"{ticker} 1년 주가 차트"
-            image_success = await send_photo(chart_bytes, caption)
+        text_success = await send_message(analysis['message'])
+        
+        # 차트 이미지 전송
+        if analysis['chart']:
+            image_success = await send_photo(analysis['chart'], analysis['caption'])
             return text_success and image_success
         
         return text_success
@@ -500,6 +611,221 @@ async def send_chart_analysis(ticker, data):
         return False
 
 
+def build_outbox_items(briefing, chart_data=None, chart_bytes=None):
+    """
+    티커 하나의 브리핑, 링크, 차트 분석을 아웃박스 항목으로 렌더링
+    
+    Args:
+        briefing (Briefing): 스크래핑된 브리핑
+        chart_data (dict, optional): get_stock_data 결과
+        chart_bytes (bytes, optional): 미리 렌더링된 차트 이미지
+        
+    Returns:
+        list: Outbox.enqueue_run에 넘길 항목 목록
+    """
+    ticker = briefing.ticker
+    try:
+        messages, links_messages = render_briefing(briefing)
+    except Exception as e:
+        # 한 티커의 렌더링 실패가 다른 티커의 전송을 막지 않도록 짧은 안내만 보냄
+        logger.error(f"브리핑 렌더링 실패 ({ticker}): {e}")
+        messages = [f"⚠️ <b>{ticker}</b> 브리핑을 표시하지 못했습니다. 수동으로 확인해주세요."]
+        links_messages = []
+    items = [
+        {'key': f"{ticker}:body:{i}", 'kind': 'message', 'text': message, 'parse_mode': 'HTML'}
+        for i, message in enumerate(messages)
+    ]
+    items.extend(
+        {'key': f"{ticker}:links:{i}", 'kind': 'message', 'text': message, 'parse_mode': 'HTML'}
+        for i, message in enumerate(links_messages)
+    )
+    
+    if chart_data:
+        try:
+            analysis = render_chart_analysis(ticker, chart_data, chart_bytes)
+            items.append({'key': f"{ticker}:analysis", 'kind': 'message',
+                          'text': analysis['message'], 'parse_mode': 'HTML'})
+            if analysis['chart']:
+                items.append({'key': f"{ticker}:chart", 'kind': 'photo',
+                              'text': analysis['caption'], 'payload': analysis['chart']})
+        except Exception as e:
+            logger.error(f"차트 분석 렌더링 실패 ({ticker}): {e}")
+    
+    return items
+
+
+def summarize_briefing(briefing, max_length=160):
+    """
+    다이제스트용으로 브리핑 본문의 핵심 문장 한 줄 추출
+    
+    Args:
+        briefing (Briefing): 스크래핑된 브리핑
+        max_length (int, optional): 최대 글자 수
+        
+    Returns:
+        str: 핵심 문장 (없으면 빈 문자열)
+    """
+    if briefing.notice:
+        return briefing.notice
+    for line in briefing.text.split('\n'):
+        line = line.strip()
+        if line and line != "데일리 브리핑":
+            return line if len(line) <= max_length else line[:max_length - 3] + "..."
+    return ""
+
+
+def render_digest(briefings, chart_datas):
+    """
+    모든 티커의 핵심 문장과 MA200 상태를 최소 개수의 메시지로 묶은 다이제스트 생성
+    
+    Args:
+        briefings (list): Briefing 목록
+        chart_datas (dict): 티커별 get_stock_data 결과 (없는 티커는 생략 가능)
+        
+    Returns:
+        list: 전송할 메시지 목록
+    """
+    current_date = datetime.now().strftime("%Y년 %m월 %d일")
+    parts = [f"📊 <b>ETF 데일리 다이제스트 ({current_date})</b>"]
+    
+    for briefing in briefings:
+        ticker = briefing.ticker
+        data = chart_datas.get(ticker) or {}
+        
+        line = f"\n\n<b>{ticker}</b>"
+        if data.get('current_price') is not None:
+            line += f" ${data['current_price']:.2f}"
+        if data.get('current_ma200') is not None:
+            line += " · ✅ MA200 위" if data.get('is_above_ma200') else " · ⚠️ MA200 아래"
+        if data.get('current_ma200_plus10') is not None:
+            line += " · 🔥 +10% 위" if data.get('is_above_ma200_plus10') else " · 📉 +10% 아래"
+        parts.append(line)
+        
+        summary = summarize_briefing(briefing)
+        if summary:
+            parts.append(f"\n{html.escape(summary, quote=False)}")
+    
+    return split_message(''.join(parts), continuation_prefix="(계속) ")
+
+
+def create_chart_grid(ticker_datas):
+    """
+    모든 티커의 차트를 한 figure에 격자(small multiples)로 그린 이미지 1장 생성
+    
+    Args:
+        ticker_datas (list): (티커, get_stock_data 결과) 목록
+        
+    Returns:
+        bytes: PNG 이미지 바이트 데이터
+        None: 그릴 차트가 없을 때
+    """
+    return render_chart_grid(ticker_datas)
+
+
+def build_digest_items(briefings, chart_datas):
+    """
+    다이제스트 모드 아웃박스 항목 생성 (요약 메시지 + 차트 격자 이미지 1장)
+    
+    Args:
+        briefings (list): Briefing 목록
+        chart_datas (dict): 티커별 get_stock_data 결과
+        
+    Returns:
+        list: Outbox.enqueue_run에 넘길 항목 목록
+    """
+    items = [
+        {'key': f"digest:{i}", 'kind': 'message', 'text': message, 'parse_mode': 'HTML'}
+        for i, message in enumerate(render_digest(briefings, chart_datas))
+    ]
+    
+    try:
+        grid = create_chart_grid([(b.ticker, chart_datas[b.ticker]) for b in briefings if chart_datas.get(b.ticker)])
+        if grid:
+            items.append({'key': "digest:charts", 'kind': 'photo', 'text': "주가 차트 요약 (1년)",
+                          'payload': prepare_photo(grid)})
+    except Exception as e:
+        logger.error(f"차트 격자 이미지 생성 실패: {e}")
+    
+    return items
+
+
+def get_delivery_targets():
+    """
+    전송 대상 채팅과 채팅별 전송 모드 목록
+    
+    기본 채팅(TELEGRAM_CHAT_ID)은 config.CHAT_DELIVERY_MODES에 없으면 config.DELIVERY_MODE를
+    사용하고, CHAT_DELIVERY_MODES에만 있는 채팅도 추가 전송 대상이 됨.
+    
+    Returns:
+        list: (채팅 ID, 'full' 또는 'digest') 목록
+    """
+    targets = []
+    if CHAT_ID:
+        targets.append((CHAT_ID, CHAT_DELIVERY_MODES.get(str(CHAT_ID), DELIVERY_MODE)))
+    for chat_id, mode in CHAT_DELIVERY_MODES.items():
+        if str(chat_id) != str(CHAT_ID):
+            targets.append((str(chat_id), mode))
+    return targets
+
+
+def build_run_items(briefings, chart_datas):
+    """
+    한 번의 실행에서 보낼 모든 아웃박스 항목을 채팅별 전송 모드에 맞춰 생성
+    
+    full 모드 차트는 프로세스 풀에서 한 번에 병렬 렌더링하고 (다이제스트는 격자 이미지 1장),
+    모드별 렌더링은 한 번만 하고 채팅마다 chat_id와 키만 바꿔 붙임.
+    
+    Args:
+        briefings (list): Briefing 목록
+        chart_datas (dict): 티커별 get_stock_data 결과
+        
+    Returns:
+        list: Outbox.enqueue_run에 넘길 항목 목록
+        
+    Raises:
+        ValueError: 전송 대상 채팅이 하나도 없을 때 (아무것도 보내지 않고 성공으로 기록되지 않도록)
+    """
+    targets = get_delivery_targets()
+    if not targets:
+        logger.error("전송 대상 채팅이 없습니다. TELEGRAM_CHAT_ID 또는 config.CHAT_DELIVERY_MODES를 설정하세요.")
+        raise ValueError("No Telegram delivery targets configured")
+    charts = render_run_charts(briefings, chart_datas) if any(mode != "digest" for _, mode in targets) else {}
+    
+    rendered = {}
+    items = []
+    for chat_id, mode in targets:
+        if mode not in rendered:
+            if mode == "digest":
+                rendered[mode] = build_digest_items(briefings, chart_datas)
+            else:
+                today_date = datetime.now().strftime("%Y년 %m월 %d일")
+                header_message = f"📊 <b>ETF 데일리 브리핑 ({today_date})</b>\n\n"
+                mode_items = [{'key': 'header', 'kind': 'message', 'text': header_message, 'parse_mode': 'HTML'}]
+                for briefing in briefings:
+                    mode_items.extend(build_outbox_items(briefing, chart_datas.get(briefing.ticker),
+                                                         charts.get(briefing.ticker)))
+                rendered[mode] = mode_items
+        
+        for item in rendered[mode]:
+            items.append(dict(item, key=f"{chat_id}:{item['key']}", chat_id=chat_id))
+    return items
+
+
+async def deliver_outbox(outbox, run_id=None):
+    """
+    아웃박스에 쌓인 메시지를 순서대로 전송
+    
+    Args:
+        outbox (Outbox): 전송할 아웃박스
+        run_id (str, optional): 특정 실행의 항목만 전송
+        
+    Returns:
+        bool: 모든 항목 전송 성공 여부
+    """
+    sender = OutboxSender(outbox, send_message, send_photo)
+    return await sender.drain(run_id)
+
+
 # 텔레그램 봇 상태 확인
 async def check_telegram_status():
     """
@@ -510,7 +836,7 @@ async def check_telegram_status():
         return False
         
     # 텔레그램 API URL
-    url = f"https://api.telegram.org/bot{BOT_TOKEN}/getMe"
+    url = _api_url("getMe")
     
     try:
         async with aiohttp.ClientSession() as session:
@@ -621,7 +947,7 @@ def create_text_image(ticker, content):
             if href.startswith('http'):
                 link_text = a.get_text(strip=True) or href
                 # 브리핑 원문 링크 정보 저장
-                links.append(f"<a href='{href}'>{link_text}</a>")
+                links.append(format_link(href, link_text))
                 
                 # 링크는 [원문 보기]로 대체 (텍스트에서는 제거)
                 a.replace_with("[원문 보기]")
@@ -633,82 +959,19 @@ def create_text_image(ticker, content):
         cleaned_content = html.unescape(cleaned_content)
         
         # 여러 줄 개행 정리
-        cleaned_content = re.sub(r'\n\s*\n', '\n\n', cleaned_content)
-        
-        # 사용자 예시에 맞는 이미지 생성
-        # 이미지 설정
-        width = 1000
-        line_count = len(cleaned_content.split('\n'))
-        height = max(500, 100 + line_count * 25)  # 기본 높이 500px, 줄 수에 따라 증가
-        
-        # matplotlib으로 이미지 생성 (한글 폰트 문제 우회)
-        import matplotlib.pyplot as plt
-        import matplotlib.patches as patches
-        
-        # 도표 크기 및 배경 설정
-        fig, ax = plt.subplots(figsize=(width/100, height/100), dpi=100)
-        
-        # 배경색 설정 - 진한 남색 (RGB 값을 0-1 범위로 변환)
-        background_color = (20/255, 24/255, 40/255)  # 어두운 남색
-        fig.patch.set_facecolor(background_color)
-        ax.set_facecolor(background_color)
-        
-        # 테두리 색상
-        border_color = (100/255, 140/255, 240/255)  # 테두리 색상
-        header_color = (66/255, 133/255, 244/255)  # 파란색
-        text_color = (240/255, 240/255, 245/255)  # 흰색에 가까운 색
-        
-        # 축 제거
-        ax.axis('off')
-        
-        # 테두리 추가
-        rect = patches.Rectangle((0, 0), 1, 1, linewidth=2, edgecolor=border_color, facecolor='none', 
-                               transform=ax.transAxes)
-        ax.add_patch(rect)
-        
-        # 티커 심볼 (좌상단)
-        ax.text(0.03, 0.95, ticker, fontsize=20, color=header_color, weight='bold', 
-               transform=ax.transAxes)
+        cleaned_content = _BLANK_LINES_RE.sub('\n\n', cleaned_content)
         
         # 날짜 (우상단)
         current_date = datetime.now().strftime("%Y-%m-%d")
         date_text = f"데일리 브리핑 ({current_date})"
-        ax.text(0.97, 0.95, date_text, fontsize=14, color=header_color, 
-               horizontalalignment='right', transform=ax.transAxes)
-        
-        # 구분선
-        ax.axhline(y=0.92, xmin=0.03, xmax=0.97, color=header_color, linewidth=1)
-        
-        # 본문 내용 - 줄바꿈 처리된 텍스트
-        # 내용이 깨지지 않도록 텍스트 대신 영문/숫자 요약 표시
-        filtered_content = []
-        for line in cleaned_content.split('\n'):
-            # 한글이 포함된 줄은 기본 메시지로 대체
-            if any(ord(char) >= 0xAC00 and ord(char) <= 0xD7A3 for char in line):
-                # 영문과 숫자 및 기본 구두점만 유지
-                english_only = ''.join([c if ord(c) < 128 else ' ' for c in line])
-                filtered_content.append(english_only)
-            else:
-                filtered_content.append(line)
-                
-        display_text = '\n'.join(filtered_content)
-        
-        # 본문 텍스트 표시
-        ax.text(0.03, 0.85, display_text, fontsize=12, color=text_color, 
-               verticalalignment='top', linespacing=1.5, transform=ax.transAxes)
         
-        # 이미지를 바이트로 변환
-        img_buf = io.BytesIO()
-        plt.tight_layout()
-        plt.savefig(img_buf, format='png', dpi=100)
-        img_buf.seek(0)
-        plt.close()
+        # PIL 텍스트 렌더러로 이미지 생성 (한글 폰트가 있으면 한글 그대로, 높이는 줄바꿈 결과에 맞춤)
+        image_bytes = render_text_card(ticker, date_text, cleaned_content.strip())
         
-        # 로깅 추가
-        logger.info(f"차트 이미지 생성 완료: 크기 {width}x{height}")
+        logger.info(f"브리핑 이미지 생성 완료: {len(image_bytes)} bytes")
         
         return {
-            'image': img_buf.getvalue(),
+            'image': image_bytes,
             'links': links
         }
         
@@ -737,7 +1000,7 @@ async def send_briefing_as_image(ticker, html_content):
             # 일반 텍스트 방식으로 폴백
             return await send_html_content(ticker, html_content)
             
-        image_bytes = result['image']
+        image_bytes = prepare_photo(result['image'])
         links = result.get('links', [])
         
         # 이미지 캡션 (현재 날짜 포함)
@@ -749,18 +1012,8 @@ async def send_briefing_as_image(ticker, html_content):
         
         # 링크가 있으면 별도 메시지로 전송
         if links and image_success:
-            links_text = f"🔗 <b>{ticker} 뉴스 링크</b>\n\n"
-            for i, link in enumerate(links):  # 모든 링크 표시
-                links_text += f"{i+1}. {link}\n\n"
-                
-            # 링크 메시지가 너무 길면 분할
-            if len(links_text) > 4000:
-                # 최대 5개만 포함
-                links_text = f"🔗 <b>{ticker} 뉴스 링크</b> (최신 5개)\n\n"
-                for i, link in enumerate(links[:5]):
-                    links_text += f"{i+1}. {link}\n\n"
-            
-            await send_message(links_text)
+            for links_message in build_links_messages(ticker, links):
+                await send_message(links_message)
             
         return image_success
         
@@ -0,0 +1,102 @@
+"""
+MA200 알림 테스트 - 상태 변화 감지, 재알림 제한(쿨다운), 지정 가격, 전송 실패 후 재시도 확인
+"""
+import asyncio
+from datetime import date, timedelta
+
+import pytest
+
+from alert_service import AlertService
+from indicator_state import IndicatorStates
+
+START = date(2024, 1, 1)
+T = 1_700_000_000  # 폴링 시각 기준 (초)
+
+
+class Market:
+    """티커 하나의 일봉을 하루씩 추가하는 도우미"""
+    def __init__(self, states, ticker='SOXL', close=100.0, days=200):
+        self.states = states
+        self.ticker = ticker
+        self.day = days
+        states.seed(ticker, [START + timedelta(days=i) for i in range(days)], [close] * days)
+
+    def close(self, price):
+        self.states.update(self.ticker, START + timedelta(days=self.day), price)
+        self.day += 1
+        return {self.ticker: self.states.get(self.ticker)}
+
+
+@pytest.fixture
+def states():
+    return IndicatorStates(path=None)
+
+
+def service(states, send=None, thresholds=None, cooldown_minutes=60):
+    return AlertService(tickers=['SOXL'], states=states, thresholds=thresholds or {}, state_path=None,
+                        cooldown_minutes=cooldown_minutes, fetch=lambda tickers: {}, send=send)
+
+
+def test_only_transitions_alert(states):
+    market = Market(states)
+    alerts = service(states)
+    assert alerts.evaluate(market.close(99.0), now=T + 1000) == []  # 처음 본 티커는 기록만
+
+    assert alerts.evaluate(market.close(98.0), now=T + 2000) == []  # 변화 없음
+    due = alerts.evaluate(market.close(105.0), now=T + 3000)
+    assert [(ticker, transitions) for ticker, _, transitions in due] == [('SOXL', {'ma200': True})]
+
+
+def test_cooldown_suppresses_and_reports_persisting_crossing(states):
+    market = Market(states)
+    alerts = service(states, cooldown_minutes=60)
+    alerts.evaluate(market.close(99.0), now=T + 1000)
+    due = alerts.evaluate(market.close(105.0), now=T + 2000)
+    alerts.mark_alerted('SOXL', due[0][1], now=T + 2000)
+
+    # 쿨다운 중에는 이탈해도 알리지 않음
+    assert alerts.evaluate(market.close(95.0), now=T + 2600) == []
+    # 쿨다운이 끝난 뒤에도 이탈이 이어지면 알림
+    due = alerts.evaluate(market.close(94.0), now=T + 5600)
+    assert due[0][2] == {'ma200': False}
+
+
+def test_whipsaw_within_cooldown_is_silent(states):
+    market = Market(states)
+    alerts = service(states, cooldown_minutes=60)
+    alerts.evaluate(market.close(99.0), now=T + 1000)
+    alerts.mark_alerted('SOXL', alerts.evaluate(market.close(105.0), now=T + 2000)[0][1], now=T + 2000)
+
+    alerts.evaluate(market.close(95.0), now=T + 2100)
+    assert alerts.evaluate(market.close(106.0), now=T + 5600) == []
+
+
+def test_custom_thresholds(states):
+    market = Market(states)
+    alerts = service(states, thresholds={'SOXL': [100.5, 120]})
+    alerts.evaluate(market.close(99.0), now=T + 1000)
+
+    due = alerts.evaluate(market.close(101.0), now=T + 2000)
+    assert due[0][2] == {'ma200': True, 'price:100.5': True}
+
+
+def test_failed_send_is_retried_on_next_poll(states):
+    """전송에 실패한 알림은 기록되지 않고 다음 폴링에서 다시 전송"""
+    market = Market(states)
+    results = [False, True]
+    sent = []
+
+    async def send(text):
+        sent.append(text)
+        return results.pop(0)
+
+    alerts = service(states, send=send)
+    alerts.evaluate(market.close(99.0), now=T + 1000)
+    market.close(105.0)
+
+    assert asyncio.run(alerts.poll()) == 0
+    assert alerts.alerted['SOXL']['flags']['ma200'] is False
+    assert asyncio.run(alerts.poll()) == 1
+    assert len(sent) == 2
+    assert alerts.alerted['SOXL']['flags']['ma200'] is True
+    assert asyncio.run(alerts.poll()) == 0
@@ -0,0 +1,78 @@
+"""
+교차 분석 테스트 - 상관계수/베타가 np.cov 결과와 일치하는지, 일봉 단위 갱신이 일괄 계산과 같은지 확인
+"""
+import numpy as np
+import pytest
+
+from analytics import CrossAnalytics, RollingCovariance, relative_strength, rolling_covariance
+
+TICKERS = ['SOXL', 'BRKU', 'IGV']
+WINDOW = 20
+
+
+@pytest.fixture
+def market():
+    rng = np.random.default_rng(0)
+    returns = rng.normal(0, 0.02, (120, 3))
+    returns[:, 0] = 3 * returns[:, 1] + rng.normal(0, 0.005, 120)  # 3배 레버리지 상품
+    closes = 100 * np.cumprod(1 + returns, axis=0)
+    dates = np.datetime64('2024-01-01') + np.arange(120)
+    return dates, closes
+
+
+def test_rolling_covariance_matches_np_cov():
+    returns = np.random.default_rng(1).normal(0, 0.02, (60, 4))
+    covariance = rolling_covariance(returns, WINDOW)
+    assert covariance.shape == (60 - WINDOW + 1, 4, 4)
+    for end in (WINDOW, 37, 60):
+        np.testing.assert_allclose(covariance[end - WINDOW], np.cov(returns[end - WINDOW:end], rowvar=False),
+                                   rtol=1e-9, atol=1e-15)
+
+    rolling = RollingCovariance.from_returns(WINDOW, returns)
+    np.testing.assert_allclose(rolling.covariance, covariance[-1], rtol=1e-9, atol=1e-15)
+
+
+def test_correlation_and_beta_match_np_cov(market):
+    dates, closes = market
+    analytics = CrossAnalytics.from_closes(TICKERS, dates, closes, window=WINDOW, rs_days=10)
+    returns = closes[1:] / closes[:-1] - 1
+    window = returns[-WINDOW:]
+    covariance = np.cov(window, rowvar=False)
+
+    matrices = analytics.matrices()
+    np.testing.assert_allclose(matrices['correlation'], np.corrcoef(window, rowvar=False), rtol=1e-9)
+    # beta[i, j]: j 대비 i의 베타
+    np.testing.assert_allclose(matrices['beta'][0, 1], covariance[0, 1] / covariance[1, 1], rtol=1e-9)
+    assert matrices['beta'][0, 1] == pytest.approx(3, abs=0.2)
+    np.testing.assert_allclose(matrices['relative_strength'], relative_strength(closes, 10))
+    assert len(analytics.series_dates) == len(analytics.correlation) == len(closes) - WINDOW
+
+
+def test_incremental_update_matches_from_closes(market):
+    """처음 60일로 만든 뒤 하루씩 갱신한 결과가 전체 기간 일괄 계산과 같음"""
+    dates, closes = market
+    full = CrossAnalytics.from_closes(TICKERS, dates, closes, window=WINDOW, rs_days=10)
+
+    incremental = CrossAnalytics.from_closes(TICKERS, dates[:60], closes[:60], window=WINDOW, rs_days=10)
+    for bar_date, bar_closes in zip(dates[60:], closes[60:]):
+        incremental.update(bar_date, bar_closes)
+
+    assert incremental.last_date == full.last_date
+    np.testing.assert_array_equal(incremental.dates, full.dates)
+    np.testing.assert_array_equal(incremental.closes, full.closes)
+    np.testing.assert_array_equal(incremental.series_dates, full.series_dates)
+    np.testing.assert_allclose(incremental.correlation, full.correlation, rtol=1e-9, atol=1e-12)
+    np.testing.assert_allclose(incremental.beta, full.beta, rtol=1e-9, atol=1e-12)
+    assert incremental.pair_series('SOXL', 'BRKU', days=30) == full.pair_series('SOXL', 'BRKU', days=30)
+
+
+def test_update_from_empty_state(market):
+    dates, closes = market
+    analytics = CrossAnalytics(TICKERS, window=WINDOW, rs_days=10)
+    assert analytics.matrices() == {'correlation': None, 'beta': None, 'relative_strength': None}
+
+    for bar_date, bar_closes in zip(dates, closes):
+        analytics.update(bar_date, bar_closes)
+    full = CrossAnalytics.from_closes(TICKERS, dates, closes, window=WINDOW, rs_days=10)
+    np.testing.assert_array_equal(analytics.series_dates, full.series_dates)
+    np.testing.assert_allclose(analytics.beta, full.beta, rtol=1e-9, atol=1e-12)
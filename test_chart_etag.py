@@ -0,0 +1,46 @@
+"""
+차트 ETag 테스트 - 같은 날짜라도 마지막 종가가 바뀌면 캐시 키와 ETag가 바뀌는지 확인
+"""
+import pytest
+
+import app as app_module
+
+
+def chart_data(last_close):
+    return {
+        'dates': ['2025-01-02', '2025-01-03'],
+        'prices': [20.03, last_close],
+        'ma50': [None, None],
+        'ma200': [None, None],
+        'ma200_plus10': [None, None],
+        'current_price': last_close,
+    }
+
+
+def test_chart_etag_changes_with_last_close():
+    first = app_module.get_chart_etag('SOXL', '1y', chart_data(20.5), ('png',))
+    assert first == app_module.get_chart_etag('SOXL', '1y', chart_data(20.5), ('png',))
+    assert first != app_module.get_chart_etag('SOXL', '1y', chart_data(20.51), ('png',))
+
+
+@pytest.fixture
+def client(monkeypatch):
+    closes = {'last': 20.5}
+    monkeypatch.setattr(app_module, 'get_chart_data', lambda ticker, period: chart_data(closes['last']))
+    monkeypatch.setattr(app_module, 'get_cached_chart', lambda *args: b'\x89PNG')
+    app_module.app.testing = True
+    with app_module.app.test_client() as client:
+        yield client, closes
+
+
+def test_chart_data_image_revalidates_after_intraday_change(client):
+    """장중 종가가 바뀌면 이전 ETag로 재검증해도 304가 아니라 새 데이터를 반환"""
+    client, closes = client
+    response = client.get('/chart-data-image/SOXL')
+    etag = response.headers['ETag']
+    assert client.get('/chart-data-image/SOXL', headers={'If-None-Match': etag}).status_code == 304
+
+    closes['last'] = 20.75
+    response = client.get('/chart-data-image/SOXL', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
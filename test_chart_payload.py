@@ -0,0 +1,68 @@
+"""
+압축 차트 페이로드 테스트 - compact 형식 인코딩/디코딩 왕복과 응답 압축 확인
+"""
+import gzip
+import json
+
+from chart_payload import COMPACT_FORMAT, compress, decode_compact, dumps, encode_compact
+
+
+def sample_data():
+    dates = ['2024-01-02', '2024-01-03', '2024-01-05', '2024-01-08', '2024-01-09']
+    return {
+        'dates': dates,
+        'prices': [20.03, 20.5, None, 21.07, 19.99],
+        'ma50': [None, None, 20.26, 20.53, 20.4],
+        'ma200': [None, None, None, None, None],
+        'ma200_plus10': [None, None, None, None, None],
+        'current_price': 19.99,
+        'current_ma50': 20.4,
+        'current_ma200': None,
+        'current_ma200_plus10': None,
+        'is_above_ma200': False,
+        'is_above_ma200_plus10': False,
+        'indicators': {'rsi14': 48.1234},
+    }
+
+
+def test_compact_round_trip():
+    data = sample_data()
+    payload = encode_compact(data)
+    assert payload['format'] == COMPACT_FORMAT
+    assert payload['start'] == '2024-01-02'
+    assert payload['gaps'] == [1, 2, 3, 1]
+
+    decoded = decode_compact(json.loads(dumps(payload)))
+    assert decoded == data
+
+
+def test_leading_gap_is_a_count_and_interior_gap_is_null():
+    payload = encode_compact(sample_data())
+    assert payload['ma50'] == {'skip': 2, 'cents': [2026, 2053, 2040]}
+    assert payload['prices'] == {'skip': 0, 'cents': [2003, 2050, None, 2107, 1999]}
+    assert payload['ma200'] == {'skip': 5, 'cents': []}
+
+
+def test_prices_are_rounded_to_cents():
+    data = sample_data()
+    data['prices'] = [20.030000686645508, 20.504999, None, 21.07, 19.99]
+    data['current_price'] = 19.990000247955322
+    decoded = decode_compact(encode_compact(data))
+    assert decoded['prices'] == [20.03, 20.5, None, 21.07, 19.99]
+    assert decoded['current_price'] == 19.99
+
+
+def test_empty_series_round_trip():
+    data = {'dates': [], 'prices': []}
+    assert decode_compact(encode_compact(data)) == data
+
+
+def test_compress_respects_accept_encoding_and_size():
+    small = b'{"a":1}'
+    assert compress(small, 'gzip') == (small, None)
+
+    body = dumps(sample_data()) * 50
+    compressed, encoding = compress(body, 'gzip, deflate')
+    assert encoding == 'gzip'
+    assert gzip.decompress(compressed) == body
+    assert compress(body, 'identity') == (body, None)
@@ -0,0 +1,80 @@
+"""
+LTTB 다운샘플링 테스트 - 양 끝점 유지, 점 개수 한도, 이동평균 초기 구간(None), 작은 입력 확인
+"""
+import numpy as np
+import pandas as pd
+
+from downsample import downsample_chart_data, lttb_indices
+
+
+def chart_data(days, seed=0):
+    rng = np.random.default_rng(seed)
+    close = pd.Series(np.exp(rng.normal(0, 0.02, days).cumsum()) * 100)
+
+    def to_list(series):
+        return [None if np.isnan(x) else float(x) for x in series]
+
+    ma200 = close.rolling(200).mean()
+    return {
+        'dates': pd.bdate_range("2015-01-01", periods=days).strftime('%Y-%m-%d').tolist(),
+        'prices': to_list(close),
+        'ma50': to_list(close.rolling(50).mean()),
+        'ma200': to_list(ma200),
+        'ma200_plus10': to_list(ma200 * 1.1),
+        'current_price': float(close.iloc[-1]),
+        'is_above_ma200': True,
+    }
+
+
+def test_indices_keep_endpoints_and_respect_max_points():
+    y = np.random.default_rng(1).normal(size=1000).cumsum()
+    indices = lttb_indices(y, 100)
+    assert len(indices) == 100
+    assert indices[0] == 0 and indices[-1] == 999
+    assert np.all(np.diff(indices) > 0)
+
+
+def test_indices_keep_the_extremes():
+    y = np.zeros(500)
+    y[137], y[311] = 10.0, -10.0
+    indices = lttb_indices(y, 50)
+    assert 137 in indices and 311 in indices
+
+
+def test_nan_values_are_skipped_when_a_bucket_has_data():
+    """값이 있는 구간에서는 NaN 점을 고르지 않음"""
+    y = np.random.default_rng(2).normal(size=600).cumsum()
+    y[:200] = np.nan  # 이동평균 초기 구간
+    y[300:400:2] = np.nan  # 중간에 드문드문 빠진 값
+    indices = lttb_indices(y, 60)
+    assert len(indices) == 60
+    assert not np.isnan(y[indices[indices >= 200]]).any()
+
+
+def test_chart_data_series_stay_aligned_with_warm_up_gaps():
+    data = chart_data(2520)
+    reduced = downsample_chart_data(data, 300)
+
+    for key in ('dates', 'prices', 'ma50', 'ma200', 'ma200_plus10'):
+        assert len(reduced[key]) == 300
+    assert reduced['dates'][0] == data['dates'][0]
+    assert reduced['dates'][-1] == data['dates'][-1]
+    assert reduced['prices'][-1] == data['prices'][-1]
+
+    positions = {date: i for i, date in enumerate(data['dates'])}
+    for i, date in enumerate(reduced['dates']):
+        original = positions[date]
+        assert reduced['ma200'][i] == data['ma200'][original]
+    # 200일선 초기 구간은 None 그대로, 이후 구간은 값이 있음
+    assert reduced['ma200'][0] is None
+    assert reduced['ma200'][-1] is not None
+    assert reduced['current_price'] == data['current_price']
+    assert reduced['is_above_ma200'] is True
+
+
+def test_short_series_is_returned_unchanged():
+    data = chart_data(250)
+    assert downsample_chart_data(data, 250) is data
+    assert downsample_chart_data(data, 1000) is data
+    assert downsample_chart_data(data, None) is data
+    np.testing.assert_array_equal(lttb_indices(np.arange(10.0), 10), np.arange(10))
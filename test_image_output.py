@@ -0,0 +1,74 @@
+"""
+이미지 출력 단계 테스트 - 용량 한도 안의 원본 유지, 한도 초과 시 재인코딩, 허용 형식 확인
+"""
+import io
+
+import numpy as np
+import pytest
+from PIL import Image
+
+import image_output
+from image_output import image_format, optimize_image
+
+
+def png_bytes(width, height, noise=False):
+    if noise:
+        pixels = np.random.default_rng(0).integers(0, 256, (height, width, 3), dtype=np.uint8)
+    else:
+        pixels = np.zeros((height, width, 3), dtype=np.uint8)
+        pixels[:, :, 2] = 120
+        pixels[height // 3:height // 2, :, 0] = 200
+    buf = io.BytesIO()
+    Image.fromarray(pixels).save(buf, format='PNG', compress_level=0)
+    return buf.getvalue()
+
+
+@pytest.fixture
+def profile(monkeypatch):
+    def set_profile(strategies, max_bytes):
+        monkeypatch.setitem(image_output.IMAGE_OUTPUT_PROFILES, 'test',
+                            {'strategies': strategies, 'max_bytes': max_bytes, 'compress_level': 6})
+    return set_profile
+
+
+def test_image_within_budget_is_returned_unchanged(profile):
+    data = png_bytes(100, 80)
+    profile(['png-palette', 'jpeg'], len(data))
+    result = optimize_image(data, 'test')
+    assert result.data is data
+    assert result.strategy == 'original'
+    assert result.encode_ms == 0.0
+
+
+def test_image_over_budget_is_reencoded_to_fit(profile):
+    data = png_bytes(400, 300)
+    profile(['png-palette', 'jpeg'], len(data) // 10)
+    result = optimize_image(data, 'test')
+    assert result.strategy == 'png-palette'
+    assert len(result.data) <= len(data) // 10
+    assert image_format(result.data) == 'png'
+    assert Image.open(io.BytesIO(result.data)).size == (400, 300)
+
+
+def test_lossy_fallback_and_smallest_result_when_nothing_fits(profile):
+    data = png_bytes(200, 200, noise=True)
+    profile(['png-palette', 'jpeg'], 1)
+    result = optimize_image(data, 'test')
+    assert result.strategy == 'jpeg:50'
+    assert result.format == 'jpeg'
+    assert len(result.data) < len(data)
+
+
+def test_original_in_a_format_the_receiver_rejects_is_reencoded(profile):
+    data = png_bytes(100, 80)
+    profile(['webp'], len(data))
+    result = optimize_image(data, 'test', allowed_formats=('webp',))
+    assert result.format == 'webp'
+
+
+def test_disallowed_strategies_are_skipped(profile):
+    data = png_bytes(200, 200, noise=True)
+    profile(['webp', 'png-palette'], 1)
+    result = optimize_image(data, 'test', allowed_formats=('png',))
+    assert result.format == 'png'
+    assert result.strategy == 'png-palette'
@@ -0,0 +1,74 @@
+"""
+증분 이동평균 상태 테스트 - 링 버퍼 평균을 pandas rolling().mean()과 비교
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from indicator_state import MA200_BAND, IndicatorState, IndicatorStates, RunningMean
+
+
+def random_closes(days=600, seed=7):
+    rng = np.random.default_rng(seed)
+    return 50 * np.exp(np.cumsum(rng.normal(0.0005, 0.02, days)))
+
+
+@pytest.mark.parametrize("window", [5, 50, 200])
+def test_running_mean_matches_rolling_mean(window):
+    closes = random_closes()
+    expected = pd.Series(closes).rolling(window).mean().to_numpy()
+    mean = RunningMean(window)
+    for i, close in enumerate(closes):
+        mean.push(close)
+        if i < window - 1:
+            assert mean.value is None
+        else:
+            assert mean.value == pytest.approx(expected[i], rel=1e-12)
+
+
+def test_replace_last_matches_rolling_mean_of_replaced_series():
+    closes = random_closes(300)
+    mean = RunningMean(50)
+    for close in closes:
+        mean.push(close)
+    mean.replace_last(closes[-1] * 1.05)
+    mean.replace_last(closes[-1] * 0.97)
+
+    replaced = closes.copy()
+    replaced[-1] = closes[-1] * 0.97
+    assert mean.value == pytest.approx(pd.Series(replaced).rolling(50).mean().iloc[-1], rel=1e-12)
+
+
+def test_indicator_state_matches_full_recompute():
+    """일봉 추가와 당일 시세 갱신 후에도 전체 재계산 결과와 같음"""
+    closes = random_closes(400)
+    dates = pd.bdate_range("2023-01-02", periods=len(closes)).date
+    state = IndicatorState.from_closes("SOXL", dates[:300], closes[:300])
+    for bar_date, close in zip(dates[300:], closes[300:]):
+        state.update(bar_date, close * 1.01)  # 장중 시세
+        state.update(bar_date, close)  # 같은 날 종가로 대체
+    state.update(dates[100], 1.0)  # 과거 날짜는 무시
+
+    series = pd.Series(closes)
+    ma200 = series.rolling(200).mean().iloc[-1]
+    assert state.last_close == closes[-1]
+    assert state.ma50 == pytest.approx(series.rolling(50).mean().iloc[-1], rel=1e-12)
+    assert state.ma200 == pytest.approx(ma200, rel=1e-12)
+    assert state.ma200_plus10 == pytest.approx(ma200 * MA200_BAND, rel=1e-12)
+    assert state.is_above_ma200 == (closes[-1] > ma200)
+
+
+def test_checkpoint_round_trip(tmp_path):
+    closes = random_closes(250)
+    dates = pd.bdate_range("2023-01-02", periods=len(closes)).date
+    path = str(tmp_path / "state.json")
+
+    states = IndicatorStates(path)
+    seeded = states.seed("soxl", dates, closes)
+    states.checkpoint()
+
+    restored = IndicatorStates(path).get("SOXL")
+    assert restored.last_date == seeded.last_date
+    assert restored.last_close == pytest.approx(seeded.last_close)
+    assert restored.ma50 == pytest.approx(seeded.ma50, rel=1e-12)
+    assert restored.ma200 == pytest.approx(seeded.ma200, rel=1e-12)
@@ -0,0 +1,73 @@
+"""
+메시지 분할 테스트 - UTF-16 길이 한도와 청크 경계의 HTML 태그 균형 확인
+"""
+import re
+
+from message_splitter import split_message, utf16_len, visible_len
+
+
+def test_utf16_len_counts_surrogate_pairs():
+    """이모지는 UTF-16 코드 유닛 2개로 계산"""
+    assert utf16_len("abc") == 3
+    assert utf16_len("한글") == 2
+    assert utf16_len("📈") == 2
+
+
+def test_visible_len_ignores_tags_and_unescapes_entities():
+    assert visible_len("<b>SOXL</b> &amp; BLK") == len("SOXL & BLK")
+    assert visible_len("<b>SOXL</b>", parse_mode=None) == len("<b>SOXL</b>")
+
+
+def test_short_message_is_not_split():
+    assert split_message("<b>짧은 메시지</b>") == ["<b>짧은 메시지</b>"]
+    assert split_message("   ") == []
+
+
+def test_chunks_stay_within_utf16_limit():
+    """이모지가 섞인 문단도 UTF-16 기준 한도를 넘지 않음"""
+    paragraph = "📈 상승 " * 30
+    text = "\n\n".join([paragraph] * 20)
+    limit = 200
+    chunks = split_message(text, limit=limit)
+    assert len(chunks) > 1
+    assert all(visible_len(chunk) <= limit for chunk in chunks)
+    assert "".join(chunk.replace(" ", "").replace("\n", "") for chunk in chunks) == \
+        text.replace(" ", "").replace("\n", "")
+
+
+def test_continuation_prefix_counts_against_limit():
+    text = "\n".join(f"{i}번째 줄입니다." for i in range(100))
+    limit = 100
+    chunks = split_message(text, limit=limit, continuation_prefix="(계속) ")
+    assert len(chunks) > 1
+    assert not chunks[0].startswith("(계속) ")
+    assert all(chunk.startswith("(계속) ") for chunk in chunks[1:])
+    assert all(visible_len(chunk) <= limit for chunk in chunks)
+
+
+def test_tags_are_closed_and_reopened_across_chunks():
+    """청크 경계에서 열린 태그는 닫고 다음 청크에서 다시 염"""
+    body = "\n".join(f"{i}번째 항목 설명" for i in range(60))
+    text = f'<b>요약</b>\n<i><a href="https://example.com">{body}</a></i>'
+    chunks = split_message(text, limit=120)
+    assert len(chunks) > 2
+    for chunk in chunks:
+        tags = re.findall(r'<\s*(/?)\s*([a-z]+)[^>]*>', chunk)
+        stack = []
+        for closing, name in tags:
+            if closing:
+                assert stack and stack[-1] == name
+                stack.pop()
+            else:
+                stack.append(name)
+        assert stack == []
+    assert chunks[1].startswith('<i><a href="https://example.com">')
+    assert all(visible_len(chunk) <= 120 for chunk in chunks)
+
+
+def test_long_word_is_hard_split_without_breaking_entities():
+    text = "&amp;" * 50 + "x" * 300
+    chunks = split_message(text, limit=64)
+    assert all(visible_len(chunk) <= 64 for chunk in chunks)
+    assert all(not re.search(r'&[a-z]*$', chunk) for chunk in chunks)
+    assert "".join(chunks) == text
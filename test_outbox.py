@@ -0,0 +1,119 @@
+"""
+텔레그램 아웃박스 테스트 - 전송 순서, 만료된 점유 회수, 중단된 실행 재개 확인
+"""
+import asyncio
+import time
+
+import pytest
+
+import outbox as outbox_module
+from outbox import BLOCKED, PENDING, SENDING, SENT, Outbox, OutboxSender, new_run_id
+
+
+@pytest.fixture
+def box(tmp_path):
+    return Outbox(str(tmp_path / "outbox.db"))
+
+
+def enqueue(box, run_id, count):
+    items = [{'key': f"msg{i}", 'kind': 'message', 'text': f"message {i}", 'parse_mode': 'HTML'}
+             for i in range(count)]
+    return box.enqueue_run(run_id, items)
+
+
+class FakeTelegram:
+    """전송된 메시지를 기록하고 지정한 순번에서 실패하는 가짜 전송 함수"""
+    def __init__(self, fail_at=()):
+        self.sent = []
+        self.fail_at = set(fail_at)
+        self.calls = 0
+
+    async def send_message(self, text, parse_mode=None, chat_id=None):
+        self.calls += 1
+        if self.calls in self.fail_at:
+            return False
+        self.sent.append(text)
+        return True
+
+    async def send_photo(self, photo, caption=None, parse_mode=None, chat_id=None):
+        self.sent.append(caption)
+        return True
+
+
+def sender(box, telegram):
+    return OutboxSender(box, telegram.send_message, telegram.send_photo, interval=0)
+
+
+def test_enqueue_is_idempotent(box):
+    assert enqueue(box, "run1", 3) == 3
+    assert enqueue(box, "run1", 3) == 0
+    assert box.stats("run1") == {PENDING: 3}
+
+
+def test_drain_delivers_in_order(box):
+    enqueue(box, "run1", 5)
+    telegram = FakeTelegram()
+    assert asyncio.run(sender(box, telegram).drain("run1"))
+    assert telegram.sent == [f"message {i}" for i in range(5)]
+    assert box.stats("run1") == {SENT: 5}
+
+
+def test_failed_item_stops_the_drain_and_resumes_in_order(box):
+    """실패한 항목 뒤의 메시지는 먼저 보내지 않고, 다음 실행에서 이어서 전송"""
+    enqueue(box, "run1", 4)
+    telegram = FakeTelegram(fail_at={3})
+    assert not asyncio.run(sender(box, telegram).drain("run1"))
+    assert telegram.sent == ["message 0", "message 1"]
+    assert box.find_resumable_run() == "run1"
+
+    assert asyncio.run(sender(box, telegram).drain(box.find_resumable_run()))
+    assert telegram.sent == [f"message {i}" for i in range(4)]
+    assert box.find_resumable_run() is None
+
+
+def test_live_lease_blocks_later_items(box):
+    """다른 전송자가 점유 중인 항목이 있으면 뒤의 항목을 보내지 않음"""
+    enqueue(box, "run1", 3)
+    claimed = box.claim_next("run1", worker_id="crashed")
+    assert claimed['state'] == SENDING
+
+    assert box.claim_next("run1", worker_id="other") is BLOCKED
+    telegram = FakeTelegram()
+    assert not asyncio.run(sender(box, telegram).drain("run1"))
+    assert telegram.sent == []
+
+
+def test_expired_lease_is_reclaimed(box, monkeypatch):
+    enqueue(box, "run1", 2)
+    first = box.claim_next("run1", worker_id="crashed")
+    monkeypatch.setattr(outbox_module, "OUTBOX_LEASE_SECONDS", 0)
+    time.sleep(0.01)
+
+    reclaimed = box.claim_next("run1", worker_id="other")
+    assert reclaimed['id'] == first['id']
+    assert reclaimed['claimed_by'] == "other"
+    assert reclaimed['attempts'] == 2
+
+    box.mark_sent(reclaimed['id'])
+    telegram = FakeTelegram()
+    assert asyncio.run(sender(box, telegram).drain("run1"))
+    assert telegram.sent == ["message 1"]
+
+
+def test_item_is_given_up_after_max_attempts(box):
+    enqueue(box, "run1", 2)
+    item = box.claim_next("run1")
+    assert not box.mark_failed(item['id'], "error", max_attempts=2)
+    item = box.claim_next("run1")
+    assert box.mark_failed(item['id'], "error", max_attempts=2)
+    assert box.claim_next("run1")['text'] == "message 1"
+
+
+def test_runs_started_in_the_same_second_do_not_collide(box):
+    """같은 초에 시작한 두 실행의 항목이 합쳐지거나 버려지지 않음"""
+    first, second = new_run_id(), new_run_id()
+    assert first != second
+    assert enqueue(box, first, 2) == 2
+    assert enqueue(box, second, 2) == 2
+    assert box.stats(first) == {PENDING: 2}
+    assert box.stats(second) == {PENDING: 2}
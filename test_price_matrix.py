@@ -0,0 +1,84 @@
+"""
+가격 행렬 테스트 - upsert 병합, 수정주가 교체, 저장/메모리 매핑 확인
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from price_matrix import PriceMatrix
+
+
+def history(start, days, close=100.0, step=1.0, volume=50_000_000):
+    dates = pd.bdate_range(start, periods=days)
+    closes = close + step * np.arange(days)
+    return pd.DataFrame({
+        'Open': closes - 0.5,
+        'High': closes + 1,
+        'Low': closes - 1,
+        'Close': closes,
+        'Volume': np.full(days, volume, dtype=float) + np.arange(days),
+    }, index=dates)
+
+
+def test_upsert_shorter_period_keeps_longer_history():
+    """짧은 기간을 다시 넣어도 이미 불러온 긴 기간을 자르지 않음"""
+    full = history("2024-01-01", 60)
+    matrix = PriceMatrix.from_histories({'SOXL': full})
+    assert matrix.upsert({'SOXL': full.iloc[-10:]}) == 0
+    np.testing.assert_allclose(matrix.row('SOXL'), full['Close'].to_numpy())
+
+
+def test_upsert_merges_new_bars_and_tickers():
+    first = history("2024-01-01", 30)
+    matrix = PriceMatrix.from_histories({'SOXL': first})
+
+    later = history("2024-01-01", 40)
+    other = history("2024-01-15", 20, close=10.0)
+    assert matrix.upsert({'SOXL': later, 'BLK': other}) == 2
+
+    assert len(matrix.dates) == 40
+    np.testing.assert_allclose(matrix.row('SOXL'), later['Close'].to_numpy())
+    np.testing.assert_allclose(matrix.row('BLK'), other['Close'].to_numpy())
+    first_col, _ = matrix.span('BLK')
+    assert matrix.dates[first_col] == np.datetime64('2024-01-15')
+    assert np.isnan(matrix.block(['BLK'])[0, :first_col]).all()
+    pd.testing.assert_frame_equal(matrix.frame('BLK'), other, check_dtype=False, check_index_type=False,
+                                  check_freq=False)
+
+
+def test_adjusted_history_replaces_the_row():
+    """겹치는 첫 종가가 다르면(분할/배당 수정) 기존 행을 통째로 교체"""
+    original = history("2024-01-01", 50)
+    matrix = PriceMatrix.from_histories({'SOXL': original})
+
+    adjusted = history("2024-01-22", 35, close=original['Close'].iloc[15] / 2, step=0.5)
+    assert matrix.upsert({'SOXL': adjusted}) == 1
+
+    first_col, _ = matrix.span('SOXL')
+    assert matrix.dates[first_col] == np.datetime64('2024-01-22')
+    np.testing.assert_allclose(matrix.row('SOXL'), adjusted['Close'].to_numpy())
+    assert not matrix.has_gaps('SOXL')
+
+
+def test_volume_is_exact_above_float32_range():
+    volume = 2 ** 24 * 10 + 1
+    matrix = PriceMatrix.from_histories({'SOXL': history("2024-01-01", 5, volume=volume)})
+    assert matrix.row('SOXL', 'volume')[0] == volume
+    assert matrix.row('SOXL').dtype == np.float32
+
+
+@pytest.mark.parametrize("mmap", [True, False])
+def test_save_and_load(tmp_path, mmap):
+    histories = {'SOXL': history("2024-01-01", 30), 'BLK': history("2024-01-10", 10, close=800.0)}
+    matrix = PriceMatrix.from_histories(histories)
+    matrix.save(str(tmp_path))
+
+    loaded = PriceMatrix.load(str(tmp_path), mmap=mmap)
+    assert loaded.tickers == matrix.tickers
+    for ticker in histories:
+        assert loaded.span(ticker) == matrix.span(ticker)
+        for field in ('close', 'volume'):
+            np.testing.assert_array_equal(loaded.row(ticker, field), matrix.row(ticker, field))
+
+    loaded.upsert({'SOXL': history("2024-01-01", 35)})
+    assert len(loaded.row('SOXL')) == 35
@@ -0,0 +1,102 @@
+"""
+가격 저장소 테스트 - 빠진 구간만 내려받는 증분 조회와 데이터 없는 티커 기록 확인
+"""
+from datetime import date
+
+import pandas as pd
+import pytest
+
+from data_providers import SyntheticProvider
+from price_store import PriceStore
+
+
+class CountingProvider:
+    """SyntheticProvider 호출을 기록하고, UNKNOWN 티커에는 데이터를 주지 않음"""
+    def __init__(self):
+        self.provider = SyntheticProvider(years=3)
+        self.calls = []
+
+    def history(self, ticker, start=None, end=None):
+        self.calls.append((ticker, start, end))
+        if ticker == 'UNKNOWN':
+            return pd.DataFrame(columns=['Open', 'High', 'Low', 'Close', 'Volume'], dtype=float)
+        return self.provider.history(ticker, start, end)
+
+    def history_many(self, tickers, start=None, end=None):
+        frames = {ticker: self.history(ticker, start, end) for ticker in tickers}
+        return {ticker: frame for ticker, frame in frames.items() if not frame.empty}
+
+
+@pytest.fixture
+def provider():
+    return CountingProvider()
+
+
+def make_store(tmp_path, provider, refresh_seconds=3600):
+    return PriceStore(str(tmp_path / "prices.db"), fetch=provider.history, fetch_many=provider.history_many,
+                      refresh_seconds=refresh_seconds)
+
+
+def test_second_read_within_refresh_interval_uses_the_store(tmp_path, provider):
+    store = make_store(tmp_path, provider)
+    first = store.history('SOXL', '1y')
+    assert len(provider.calls) == 1
+
+    second = store.history('SOXL', '6mo')
+    assert len(provider.calls) == 1
+    assert second.index[-1] == first.index[-1]
+    assert len(second) < len(first)
+
+
+def test_longer_period_fetches_only_older_bars(tmp_path, provider):
+    store = make_store(tmp_path, provider)
+    store.history('SOXL', '1y')
+    covered_start = provider.calls[0][1]
+
+    history = store.history('SOXL', '2y')
+    ticker, start, end = provider.calls[-1]
+    assert len(provider.calls) == 2
+    assert start < covered_start and end == covered_start
+    assert not history.index.duplicated().any()
+
+
+def test_refresh_fetches_from_the_last_stored_day(tmp_path, provider):
+    store = make_store(tmp_path, provider, refresh_seconds=0)
+    history = store.history('SOXL', '1y')
+    store.history('SOXL', '1y')
+
+    ticker, start, end = provider.calls[-1]
+    assert len(provider.calls) == 2
+    assert start == history.index[-1].date()
+    assert end is None
+
+
+def test_batch_sync_groups_tickers_missing_the_same_range(tmp_path, provider):
+    store = make_store(tmp_path, provider)
+    histories = store.history_many(['SOXL', 'BLK', 'IVZ'], '1y')
+    assert all(not frame.empty for frame in histories.values())
+    assert {start for _, start, _ in provider.calls} == {provider.calls[0][1]}
+
+    store.history_many(['SOXL', 'BLK', 'IVZ'], '1y')
+    assert len(provider.calls) == 3
+
+
+def test_ticker_without_bars_is_not_refetched_on_every_call(tmp_path, provider):
+    """데이터가 없는 티커도 조회 시각을 기록해 새로고침 간격 안에서는 다시 요청하지 않음"""
+    store = make_store(tmp_path, provider)
+    assert store.history('UNKNOWN', '1y').empty
+    assert store.history_many(['UNKNOWN', 'SOXL'], '1y')['UNKNOWN'].empty
+    assert [ticker for ticker, _, _ in provider.calls] == ['UNKNOWN', 'SOXL']
+
+    expired = make_store(tmp_path, provider, refresh_seconds=0)
+    expired.history('UNKNOWN', '1y')
+    assert [ticker for ticker, _, _ in provider.calls].count('UNKNOWN') == 2
+
+
+def test_max_history_covers_shorter_periods(tmp_path, provider):
+    store = make_store(tmp_path, provider)
+    store.history('SOXL', 'max')
+    assert provider.calls[0][1] is None
+    store.history('SOXL', '10y')
+    assert len(provider.calls) == 1
+    assert store.read('SOXL', 'max').index[0].date() <= date.today()
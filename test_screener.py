@@ -0,0 +1,110 @@
+"""
+MA200 스크리너 테스트 - 오른쪽 정렬 이동평균, 돌파 판정, 짧은 이력/오래된 데이터 제외 확인
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_providers import SyntheticProvider
+from screener import MA200Screener, filter_rows, right_align, screen_block
+
+DATES = pd.bdate_range(end="2024-06-28", periods=260)
+
+
+def history(closes, dates=DATES):
+    closes = np.asarray(closes, dtype=float)
+    dates = dates[-len(closes):]
+    return pd.DataFrame({'Open': closes, 'High': closes, 'Low': closes, 'Close': closes,
+                         'Volume': np.full(len(closes), 1000.0)}, index=dates)
+
+
+def flat_then(*last, days=260, price=100.0):
+    return np.concatenate([np.full(days - len(last), price), last])
+
+
+def test_right_align_keeps_order_of_valid_values():
+    values = np.array([[1.0, np.nan, 2.0, 3.0],
+                       [np.nan, np.nan, 4.0, np.nan]])
+    aligned = right_align(values)
+    np.testing.assert_array_equal(aligned[0], [np.nan, 1.0, 2.0, 3.0])
+    np.testing.assert_array_equal(aligned[1], [np.nan, np.nan, np.nan, 4.0])
+
+
+def test_block_moving_average_uses_each_rows_last_valid_bars():
+    """행마다 상장일과 휴장일이 달라도 자기 마지막 200개 종가로 이동평균 계산"""
+    rng = np.random.default_rng(0)
+    close = rng.uniform(50, 150, (3, 300))
+    close[1, ::7] = np.nan  # 중간중간 빠진 날
+    close[2, :120] = np.nan  # 180일만 있는 종목
+
+    values = screen_block(close)
+    for i in range(2):
+        valid = close[i][~np.isnan(close[i])]
+        assert values['close'][i] == valid[-1]
+        assert values['prev_close'][i] == valid[-2]
+        assert values['ma200'][i] == pytest.approx(valid[-200:].mean())
+        assert values['prev_ma200'][i] == pytest.approx(valid[-201:-1].mean())
+    assert np.isnan(values['ma200'][2]) and np.isnan(values['prev_ma200'][2])
+
+
+def test_block_crossings():
+    close = np.vstack([
+        flat_then(120.0),  # 오늘 200일선 상향 돌파
+        flat_then(105.0, 80.0),  # 오늘 하향 이탈
+        flat_then(130.0, 131.0),  # 어제부터 +10% 위, 돌파 아님
+        flat_then(105.0, 112.0),  # 200일선 위는 유지, +10% 선만 돌파
+    ])
+    values = screen_block(close)
+    np.testing.assert_array_equal(values['cross_ma200'], [1, -1, 0, 0])
+    np.testing.assert_array_equal(values['cross_plus10'], [1, 0, 0, 1])
+    np.testing.assert_array_equal(values['above_ma200'], [True, False, True, True])
+    np.testing.assert_array_equal(values['above_ma200_plus10'], [True, False, True, True])
+    assert values['ma200'][0] == pytest.approx(100.1)
+    assert values['distance'][0] == pytest.approx((120 / 100.1 - 1) * 100)
+
+
+def test_screen_ranks_rows_and_skips_short_and_stale_histories():
+    stale_dates = pd.bdate_range(end=DATES[-1] - pd.Timedelta(days=30), periods=260)
+    histories = {
+        'UP': history(flat_then(120.0)),
+        'DOWN': history(flat_then(105.0, 80.0)),
+        'FLAT': history(flat_then(100.0)),
+        'SHORT': history(np.full(150, 200.0)),
+        'STALE': history(flat_then(150.0), stale_dates),
+    }
+    rows, skipped = MA200Screener(provider=SyntheticProvider()).screen(histories)
+
+    assert [row['ticker'] for row in rows] == ['UP', 'FLAT', 'DOWN']
+    assert [row['rank'] for row in rows] == [1, 2, 3]
+    assert skipped == {'stale': 1, 'short': 1}
+
+    up = rows[0]
+    assert up['close'] == 120.0 and up['prev_close'] == 100.0
+    assert up['ma200'] == 100.1
+    assert up['distance'] == round((120 / 100.1 - 1) * 100, 2)
+    assert up['cross_ma200'] == 1 and rows[2]['cross_ma200'] == -1
+    assert up['last_date'] == "2024-06-28"
+
+    assert [row['ticker'] for row in filter_rows(rows, 'crossed_up')] == ['UP']
+    assert [row['ticker'] for row in filter_rows(rows, 'below')] == ['FLAT', 'DOWN']
+    with pytest.raises(ValueError):
+        filter_rows(rows, 'unknown')
+
+
+def test_run_matches_rolling_mean_per_symbol():
+    provider = SyntheticProvider(tickers=20, years=2)
+    screener = MA200Screener(provider=provider, batch_size=7, workers=3, lookback_days=400)
+    result = screener.run(provider.symbols())
+
+    assert result['stats']['symbols'] == 20
+    assert result['stats']['screened'] == 20
+    assert result['stats']['failed_batches'] == 0
+    distances = [row['distance'] for row in result['rows']]
+    assert distances == sorted(distances, reverse=True)
+
+    for row in result['rows']:
+        close = provider.history(row['ticker'])['Close'].astype(np.float32).astype(float)
+        ma200 = close.rolling(200).mean()
+        assert row['close'] == pytest.approx(close.iloc[-1], abs=0.01)
+        assert row['ma200'] == pytest.approx(ma200.iloc[-1], abs=0.01)
+        assert row['above_ma200'] == bool(close.iloc[-1] > ma200.iloc[-1])
@@ -0,0 +1,194 @@
+"""
+Pillow-based text rasterizer for briefing images
+
+Draws text-only images directly with ImageDraw instead of building a
+matplotlib figure. The CJK font is resolved once from config.TEXT_IMAGE_FONTS,
+each font size is loaded once, and per-character advance widths are cached per
+size so wrapping long briefings by pixel width is a dictionary lookup per
+character.
+"""
+import io
+import logging
+import os
+import re
+from functools import lru_cache
+
+from PIL import Image, ImageDraw, ImageFont
+
+from config import TEXT_IMAGE_FONTS
+
+logger = logging.getLogger(__name__)
+
+# Card colors (same as the matplotlib briefing image)
+BACKGROUND_COLOR = (20, 24, 40)
+BORDER_COLOR = (100, 140, 240)
+HEADER_COLOR = (66, 133, 244)
+TEXT_COLOR = (240, 240, 245)
+
+# Layout in pixels
+MARGIN = 30
+HEADER_SIZE = 28
+TITLE_SIZE = 20
+BODY_SIZE = 17
+LINE_HEIGHT = 25
+BODY_TOP = 90
+
+_HANGUL_RE = re.compile('[가-힣]')
+
+# Fallback when no configured font can be loaded (no Hangul glyphs)
+_FALLBACK_FONT = "DejaVuSans.ttf"
+
+
+@lru_cache(maxsize=1)
+def resolve_font():
+    """
+    Find the first loadable font in config.TEXT_IMAGE_FONTS
+
+    Entries that are missing or not valid font files (such as the placeholder
+    malgun.ttf in the repository) are skipped.
+
+    Returns:
+        tuple: (font path, whether it is a CJK font with Hangul glyphs)
+    """
+    for path in TEXT_IMAGE_FONTS:
+        if not os.path.isfile(path):
+            continue
+        try:
+            ImageFont.truetype(path, BODY_SIZE)
+        except OSError:
+            logger.debug(f"Skipping unusable font file: {path}")
+            continue
+        logger.info(f"Text images use font {path}")
+        return path, True
+
+    # Pillow finds DejaVu through matplotlib's bundled fonts if not installed system-wide
+    import matplotlib
+    fallback = os.path.join(matplotlib.get_data_path(), 'fonts', 'ttf', _FALLBACK_FONT)
+    logger.warning("No CJK font found in TEXT_IMAGE_FONTS; Korean text will be replaced in text images")
+    return fallback, False
+
+
+@lru_cache(maxsize=16)
+def get_font(size):
+    """Load the resolved font at a pixel size (once per size)"""
+    return ImageFont.truetype(resolve_font()[0], size)
+
+
+@lru_cache(maxsize=65536)
+def char_width(size, char):
+    """Cached advance width of one character at a font size"""
+    return get_font(size).getlength(char)
+
+
+def text_width(text, size):
+    """Approximate pixel width of text from cached character advances (no kerning)"""
+    return sum(char_width(size, c) for c in text)
+
+
+def wrap_line(line, size, max_width):
+    """
+    Wrap one line of text to max_width pixels
+
+    Breaks at spaces where possible; words wider than a line (long URLs, Korean
+    runs without spaces) are broken between characters.
+
+    Returns:
+        list: Wrapped lines (an empty line stays one empty line)
+    """
+    if not line:
+        return [""]
+
+    lines = []
+    current, current_width = "", 0.0
+    space = char_width(size, " ")
+    for word in line.split(" "):
+        width = text_width(word, size)
+        extra = width + (space if current else 0)
+        if current and current_width + extra <= max_width:
+            current += " " + word
+            current_width += extra
+            continue
+        if current:
+            lines.append(current)
+        current, current_width = "", 0.0
+
+        # Break words that cannot fit on a line of their own
+        while width > max_width:
+            taken, taken_width = 0, 0.0
+            for char in word:
+                w = char_width(size, char)
+                if taken and taken_width + w > max_width:
+                    break
+                taken += 1
+                taken_width += w
+            lines.append(word[:taken])
+            word = word[taken:]
+            width -= taken_width
+        current, current_width = word, width
+
+    lines.append(current)
+    return lines
+
+
+def wrap_text(text, size, max_width):
+    """
+    Wrap multi-line text to max_width pixels
+
+    Returns:
+        list: Wrapped lines
+    """
+    wrapped = []
+    for line in text.split("\n"):
+        wrapped.extend(wrap_line(line.rstrip(), size, max_width))
+    return wrapped
+
+
+def supports_hangul():
+    """Whether the resolved font can draw Korean text"""
+    return resolve_font()[1]
+
+
+def strip_hangul(text):
+    """Replace Hangul syllables with spaces (for fonts without Korean glyphs)"""
+    return _HANGUL_RE.sub(" ", text)
+
+
+def render_text_card(ticker, title, text, width=1000, min_height=500):
+    """
+    Render text onto a framed dark-blue card
+
+    Args:
+        ticker (str): Ticker symbol shown top-left
+        title (str): Title shown top-right
+        text (str): Body text, wrapped to the card width
+        width (int, optional): Image width in pixels
+        min_height (int, optional): Minimum image height in pixels
+
+    Returns:
+        bytes: PNG image bytes
+    """
+    if not supports_hangul():
+        title, text = strip_hangul(title), strip_hangul(text)
+
+    lines = wrap_text(text, BODY_SIZE, width - 2 * MARGIN)
+    height = max(min_height, BODY_TOP + len(lines) * LINE_HEIGHT + MARGIN)
+
+    image = Image.new("RGB", (width, height), BACKGROUND_COLOR)
+    draw = ImageDraw.Draw(image)
+    draw.rectangle((0, 0, width - 1, height - 1), outline=BORDER_COLOR, width=2)
+
+    draw.text((MARGIN, 24), ticker, font=get_font(HEADER_SIZE), fill=HEADER_COLOR,
+              stroke_width=1, stroke_fill=HEADER_COLOR)
+    draw.text((width - MARGIN, 30), title, font=get_font(TITLE_SIZE), fill=HEADER_COLOR, anchor="ra")
+    draw.line((MARGIN, 70, width - MARGIN, 70), fill=HEADER_COLOR, width=1)
+
+    body_font = get_font(BODY_SIZE)
+    y = BODY_TOP
+    for line in lines:
+        if line:
+            draw.text((MARGIN, y), line, font=body_font, fill=TEXT_COLOR)
+        y += LINE_HEIGHT
+
+    buf = io.BytesIO()
+    image.save(buf, format="PNG", compress_level=6)
+    return buf.getvalue()